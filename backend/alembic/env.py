@@ -25,7 +25,7 @@ sys.path.append(os.getcwd())
 load_dotenv()
 
 from app.core.database import Base
-import app.models.base  # Import models to register them
+import app.models  # Import models to register them
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,62 @@
+"""add_document_summary_embeddings
+
+Revision ID: 7c1e4b9a2d10
+Revises: 5518a9a5282f
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4b9a2d10'
+down_revision: Union[str, Sequence[str], None] = '5518a9a5282f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('summary_embedding', pgvector.sqlalchemy.vector.VECTOR(dim=768), nullable=True))
+    op.create_table('document_pages',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('page_number', sa.Integer(), nullable=False),
+    sa.Column('embedding', pgvector.sqlalchemy.vector.VECTOR(dim=768), nullable=True),
+    sa.Column('document_id', sa.String(), nullable=False),
+    sa.Column('tenant_id', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_document_pages_document_id'), 'document_pages', ['document_id'], unique=False)
+
+    # Backfill dos documentos já processados (centróides dos chunks)
+    op.execute("""
+        UPDATE documents d
+        SET summary_embedding = c.centroid
+        FROM (
+            SELECT document_id, avg(embedding) AS centroid
+            FROM document_chunks
+            WHERE embedding IS NOT NULL
+            GROUP BY document_id
+        ) c
+        WHERE c.document_id = d.id
+    """)
+    op.execute("""
+        INSERT INTO document_pages (id, document_id, tenant_id, page_number, embedding)
+        SELECT gen_random_uuid()::text, document_id, tenant_id, page_number, avg(embedding)
+        FROM document_chunks
+        WHERE embedding IS NOT NULL AND page_number IS NOT NULL
+        GROUP BY document_id, tenant_id, page_number
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_document_pages_document_id'), table_name='document_pages')
+    op.drop_table('document_pages')
+    op.drop_column('documents', 'summary_embedding')
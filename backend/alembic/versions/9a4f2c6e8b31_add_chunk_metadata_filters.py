@@ -0,0 +1,57 @@
+"""add_chunk_metadata_filters
+
+Revision ID: 9a4f2c6e8b31
+Revises: 7c1e4b9a2d10
+Create Date: 2026-10-19 11:02:17.540913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f2c6e8b31'
+down_revision: Union[str, Sequence[str], None] = '7c1e4b9a2d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('document_type', sa.String(), server_default='outro', nullable=False))
+    op.add_column('document_chunks', sa.Column('document_type', sa.String(), nullable=True))
+    op.add_column('document_chunks', sa.Column('document_date', sa.DateTime(timezone=True), nullable=True))
+
+    # Backfill dos metadados denormalizados
+    op.execute("""
+        UPDATE document_chunks dc
+        SET document_type = d.document_type,
+            document_date = d.upload_date
+        FROM documents d
+        WHERE d.id = dc.document_id
+    """)
+
+    op.create_index('ix_document_chunks_tenant_id_document_type', 'document_chunks', ['tenant_id', 'document_type'], unique=False)
+    op.create_index('ix_document_chunks_tenant_id_document_date', 'document_chunks', ['tenant_id', 'document_date'], unique=False)
+    op.create_index('ix_document_chunks_document_id_page_number', 'document_chunks', ['document_id', 'page_number'], unique=False)
+    op.create_index(
+        'ix_document_chunks_embedding_hnsw',
+        'document_chunks',
+        ['embedding'],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_ops={'embedding': 'vector_cosine_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_chunks_embedding_hnsw', table_name='document_chunks')
+    op.drop_index('ix_document_chunks_document_id_page_number', table_name='document_chunks')
+    op.drop_index('ix_document_chunks_tenant_id_document_date', table_name='document_chunks')
+    op.drop_index('ix_document_chunks_tenant_id_document_type', table_name='document_chunks')
+    op.drop_column('document_chunks', 'document_date')
+    op.drop_column('document_chunks', 'document_type')
+    op.drop_column('documents', 'document_type')
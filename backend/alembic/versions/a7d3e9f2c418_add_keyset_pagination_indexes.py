@@ -0,0 +1,56 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: a7d3e9f2c418
+Revises: f3b9c1d6e527
+Create Date: 2026-10-19 18:52:14.730682
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9f2c418'
+down_revision: Union[str, Sequence[str], None] = 'f3b9c1d6e527'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.add_column('units', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.add_column('common_areas', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+
+    # (tenant_id, created_at, id) substitui os índices só de tenant_id
+    op.create_index('ix_users_tenant_id_created_at_id', 'users', ['tenant_id', 'created_at', 'id'], unique=False)
+    op.drop_index(op.f('ix_units_tenant_id'), table_name='units')
+    op.create_index('ix_units_tenant_id_created_at_id', 'units', ['tenant_id', 'created_at', 'id'], unique=False)
+    op.drop_index(op.f('ix_common_areas_tenant_id'), table_name='common_areas')
+    op.create_index('ix_common_areas_tenant_id_created_at_id', 'common_areas', ['tenant_id', 'created_at', 'id'], unique=False)
+    op.drop_index(op.f('ix_reservations_tenant_id'), table_name='reservations')
+    op.create_index('ix_reservations_tenant_id_created_at_id', 'reservations', ['tenant_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_reservations_tenant_id_start_time', 'reservations', ['tenant_id', 'start_time'], unique=False)
+    op.create_index('ix_notifications_user_id_created_at_id', 'notifications', ['user_id', 'created_at', 'id'], unique=False)
+    op.drop_index(op.f('ix_documents_tenant_id'), table_name='documents')
+    op.create_index('ix_documents_tenant_id_upload_date_id', 'documents', ['tenant_id', 'upload_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_tenant_id_upload_date_id', table_name='documents')
+    op.create_index(op.f('ix_documents_tenant_id'), 'documents', ['tenant_id'], unique=False)
+    op.drop_index('ix_notifications_user_id_created_at_id', table_name='notifications')
+    op.drop_index('ix_reservations_tenant_id_start_time', table_name='reservations')
+    op.drop_index('ix_reservations_tenant_id_created_at_id', table_name='reservations')
+    op.create_index(op.f('ix_reservations_tenant_id'), 'reservations', ['tenant_id'], unique=False)
+    op.drop_index('ix_common_areas_tenant_id_created_at_id', table_name='common_areas')
+    op.create_index(op.f('ix_common_areas_tenant_id'), 'common_areas', ['tenant_id'], unique=False)
+    op.drop_index('ix_units_tenant_id_created_at_id', table_name='units')
+    op.create_index(op.f('ix_units_tenant_id'), 'units', ['tenant_id'], unique=False)
+    op.drop_index('ix_users_tenant_id_created_at_id', table_name='users')
+    op.drop_column('common_areas', 'created_at')
+    op.drop_column('units', 'created_at')
+    op.drop_column('users', 'created_at')
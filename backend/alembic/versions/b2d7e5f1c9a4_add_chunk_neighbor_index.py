@@ -0,0 +1,28 @@
+"""add_chunk_neighbor_index
+
+Revision ID: b2d7e5f1c9a4
+Revises: 9a4f2c6e8b31
+Create Date: 2026-10-19 14:36:52.118407
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2d7e5f1c9a4'
+down_revision: Union[str, Sequence[str], None] = '9a4f2c6e8b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_document_chunks_document_id_chunk_index', 'document_chunks', ['document_id', 'chunk_index'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_chunks_document_id_chunk_index', table_name='document_chunks')
@@ -0,0 +1,30 @@
+"""add_reservation_series_id
+
+Revision ID: b6c2e8f4a179
+Revises: a7d3e9f2c418
+Create Date: 2026-10-19 21:07:41.318904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6c2e8f4a179'
+down_revision: Union[str, Sequence[str], None] = 'a7d3e9f2c418'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reservations', sa.Column('series_id', sa.String(), nullable=True))
+    op.create_index(op.f('ix_reservations_series_id'), 'reservations', ['series_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_reservations_series_id'), table_name='reservations')
+    op.drop_column('reservations', 'series_id')
@@ -0,0 +1,44 @@
+"""add_embedding_v2_columns
+
+Revision ID: c5a1d8e3f702
+Revises: b2d7e5f1c9a4
+Create Date: 2026-10-19 16:05:11.902334
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a1d8e3f702'
+down_revision: Union[str, Sequence[str], None] = 'b2d7e5f1c9a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tenants', sa.Column('embedding_version', sa.String(), nullable=True))
+    op.add_column('documents', sa.Column('summary_embedding_v2', pgvector.sqlalchemy.vector.VECTOR(dim=768), nullable=True))
+    op.add_column('document_pages', sa.Column('embedding_v2', pgvector.sqlalchemy.vector.VECTOR(dim=768), nullable=True))
+    op.add_column('document_chunks', sa.Column('embedding_v2', pgvector.sqlalchemy.vector.VECTOR(dim=768), nullable=True))
+    op.create_index(
+        'ix_document_chunks_embedding_v2_hnsw',
+        'document_chunks',
+        ['embedding_v2'],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_ops={'embedding_v2': 'vector_cosine_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_chunks_embedding_v2_hnsw', table_name='document_chunks')
+    op.drop_column('document_chunks', 'embedding_v2')
+    op.drop_column('document_pages', 'embedding_v2')
+    op.drop_column('documents', 'summary_embedding_v2')
+    op.drop_column('tenants', 'embedding_version')
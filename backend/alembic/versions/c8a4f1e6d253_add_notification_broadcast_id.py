@@ -0,0 +1,30 @@
+"""add_notification_broadcast_id
+
+Revision ID: c8a4f1e6d253
+Revises: b6c2e8f4a179
+Create Date: 2026-10-19 22:16:05.274813
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8a4f1e6d253'
+down_revision: Union[str, Sequence[str], None] = 'b6c2e8f4a179'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notifications', sa.Column('broadcast_id', sa.String(), nullable=True))
+    op.create_index(op.f('ix_notifications_broadcast_id'), 'notifications', ['broadcast_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_notifications_broadcast_id'), table_name='notifications')
+    op.drop_column('notifications', 'broadcast_id')
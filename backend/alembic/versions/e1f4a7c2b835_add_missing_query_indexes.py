@@ -0,0 +1,46 @@
+"""add_missing_query_indexes
+
+Revision ID: e1f4a7c2b835
+Revises: d8e2b6a4f913
+Create Date: 2026-10-19 17:48:03.271946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f4a7c2b835'
+down_revision: Union[str, Sequence[str], None] = 'd8e2b6a4f913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_users_unit_id'), 'users', ['unit_id'], unique=False)
+    op.create_index('ix_users_tenant_id_role', 'users', ['tenant_id', 'role'], unique=False)
+    op.create_index(op.f('ix_units_tenant_id'), 'units', ['tenant_id'], unique=False)
+    op.create_index(op.f('ix_common_areas_tenant_id'), 'common_areas', ['tenant_id'], unique=False)
+    op.create_index(op.f('ix_reservations_tenant_id'), 'reservations', ['tenant_id'], unique=False)
+    op.create_index('ix_reservations_common_area_id_start_time_end_time', 'reservations', ['common_area_id', 'start_time', 'end_time'], unique=False)
+    op.create_index('ix_reservations_unit_id_start_time', 'reservations', ['unit_id', 'start_time'], unique=False)
+    op.create_index(op.f('ix_notifications_tenant_id'), 'notifications', ['tenant_id'], unique=False)
+    op.create_index('ix_notifications_user_id_is_read_created_at', 'notifications', ['user_id', 'is_read', 'created_at'], unique=False)
+    op.create_index(op.f('ix_documents_tenant_id'), 'documents', ['tenant_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_documents_tenant_id'), table_name='documents')
+    op.drop_index('ix_notifications_user_id_is_read_created_at', table_name='notifications')
+    op.drop_index(op.f('ix_notifications_tenant_id'), table_name='notifications')
+    op.drop_index('ix_reservations_unit_id_start_time', table_name='reservations')
+    op.drop_index('ix_reservations_common_area_id_start_time_end_time', table_name='reservations')
+    op.drop_index(op.f('ix_reservations_tenant_id'), table_name='reservations')
+    op.drop_index(op.f('ix_common_areas_tenant_id'), table_name='common_areas')
+    op.drop_index(op.f('ix_units_tenant_id'), table_name='units')
+    op.drop_index('ix_users_tenant_id_role', table_name='users')
+    op.drop_index(op.f('ix_users_unit_id'), table_name='users')
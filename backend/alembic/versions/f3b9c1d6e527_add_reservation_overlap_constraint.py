@@ -0,0 +1,47 @@
+"""add_reservation_overlap_constraint
+
+Revision ID: f3b9c1d6e527
+Revises: e1f4a7c2b835
+Create Date: 2026-10-19 18:20:37.604119
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9c1d6e527'
+down_revision: Union[str, Sequence[str], None] = 'e1f4a7c2b835'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Igualdade de VARCHAR em índice GiST (common_area_id WITH =)
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column('reservations', sa.Column(
+        'period',
+        postgresql.TSTZRANGE(),
+        sa.Computed("tstzrange(start_time, end_time, '[)')", persisted=True),
+        nullable=True
+    ))
+    # Falha se já houver reservas confirmadas sobrepostas: cancelar as
+    # duplicadas antes de aplicar a migração
+    op.create_exclude_constraint(
+        'ex_reservations_common_area_period',
+        'reservations',
+        ('common_area_id', '='),
+        ('period', '&&'),
+        using='gist',
+        where=sa.text("status = 'confirmed'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ex_reservations_common_area_period', 'reservations', type_='exclude')
+    op.drop_column('reservations', 'period')
@@ -2,7 +2,7 @@ from fastapi import APIRouter
 
 api_router = APIRouter()
 
-from app.api.routes import auth, common_areas, reservations, notifications, imports, register, onboarding, units, users, documents, ai
+from app.api.routes import auth, common_areas, reservations, notifications, imports, register, onboarding, units, users, documents, ai, dashboard
 
 api_router.include_router(onboarding.router, prefix="/public", tags=["public"])  # No auth required
 api_router.include_router(register.router, prefix="/public", tags=["public"])  # No auth required
@@ -15,4 +15,5 @@ api_router.include_router(notifications.router, prefix="/notifications", tags=["
 api_router.include_router(imports.router, prefix="/import", tags=["import"])
 api_router.include_router(documents.router, prefix="/documents", tags=["documents"])
 api_router.include_router(ai.router, prefix="/ai", tags=["ai"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
 
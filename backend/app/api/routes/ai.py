@@ -1,13 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+import time
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.metrics import track_stage
 from app.dependencies.auth import get_current_user, require_admin
 from app.models.base import User
-from app.schemas.document import ChatRequest, ChatResponse
+from app.schemas.document import (
+    ChatRequest,
+    ChatResponse,
+    QuestionSuggestion,
+    BatchChatRequest,
+    BatchChatResult,
+    BatchChatResponse,
+    FAQItem,
+    TenantUsageResponse,
+)
 from app.services.rag_service import RAGService
 from app.services.cache_service import CacheService
-from app.middleware.rate_limit import check_rate_limit, get_user_request_count
+from app.services.conversation_service import ConversationService
+from app.services.faq_service import FAQService
+from app.services.suggest_service import SuggestService
+from app.services.llm_resilience import LLMUnavailableError
+from app.services.llm_scheduler import BACKGROUND
+from app.services.usage_service import UsageService, set_usage_user
+from app.middleware.rate_limit import check_ai_budget, check_rate_limit, get_user_request_count
 
 router = APIRouter()
 rag_service = RAGService()
@@ -26,45 +44,109 @@ async def chat_with_ai(
     
     Rate limit: 50 requisições por dia por usuário
     Cache: Respostas cacheadas por 1 hora
+    Conversa: envie o session_id retornado para perguntas de acompanhamento
     """
     
     # Verificar rate limit
-    await check_rate_limit(http_request, current_user.id, limit=50)
+    with track_stage("rate_limit", current_user.tenant_id):
+        await check_rate_limit(http_request, current_user.id, limit=50)
+    set_usage_user(current_user.id)
     
+    filters = request.filters.model_dump(exclude_none=True) if request.filters else None
+
+    if request.session_id:
+        session = ConversationService.get_session(
+            request.session_id,
+            current_user.tenant_id,
+            current_user.id
+        )
+        if not session:
+            raise HTTPException(status_code=404, detail="Conversation session not found or expired")
+    else:
+        session = ConversationService.create_session(current_user.tenant_id, current_user.id)
+
+    # Respostas com histórico dependem da conversa e não usam o cache
+    use_cache = not session["turns"]
+
     # Verificar cache
-    cached_response = CacheService.get_cached_response(
-        request.question, 
-        current_user.tenant_id
-    )
+    cached_response = None
+    if use_cache:
+        with track_stage("cache_lookup", current_user.tenant_id):
+            version = CacheService.get_document_set_version(current_user.tenant_id)
+            cached_response = CacheService.get_cached_response(
+                request.question, 
+                current_user.tenant_id,
+                filters,
+                version
+            )
     
     if cached_response:
+        if not filters:
+            SuggestService.record_question(request.question, current_user.tenant_id)
+
+        ConversationService.add_turn(
+            session,
+            request.question,
+            cached_response["answer"],
+            cached_response.get("chunk_ids", []),
+            filters
+        )
+        ConversationService.save_session(session)
+
         return ChatResponse(
             answer=cached_response["answer"],
-            sources=cached_response["sources"]
+            sources=cached_response["sources"],
+            session_id=session["id"]
         )
 
+    # Respostas do cache não consomem tokens; as demais contam no orçamento
+    await check_ai_budget(current_user.tenant_id)
+
     # Processar pergunta se não estiver em cache
     try:
         result = await rag_service.chat(
             db=db,
             question=request.question,
             tenant_id=current_user.tenant_id,
-            max_chunks=request.max_chunks
+            max_chunks=request.max_chunks,
+            filters=filters,
+            session=session
         )
         
-        # Salvar em cache (1 hora)
-        CacheService.cache_response(
+        # Salvar em cache (1 hora); respostas degradadas não são cacheadas
+        if use_cache and not result.get("degraded"):
+            cached = CacheService.cache_response(
+                request.question,
+                current_user.tenant_id,
+                result,
+                ttl=3600,
+                filters=filters,
+                version=version
+            )
+            if cached and not filters:
+                SuggestService.record_question(request.question, current_user.tenant_id)
+
+        ConversationService.add_turn(
+            session,
             request.question,
-            current_user.tenant_id,
-            result,
-            ttl=3600
+            result["answer"],
+            result.get("chunk_ids", []),
+            filters
         )
+        ConversationService.save_session(session)
 
         return ChatResponse(
             answer=result["answer"],
-            sources=result["sources"]
+            sources=result["sources"],
+            degraded=result.get("degraded", False),
+            session_id=session["id"]
         )
 
+    except LLMUnavailableError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"AI assistant temporarily unavailable: {str(e)}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -72,6 +154,96 @@ async def chat_with_ai(
         )
 
 
+@router.get("/suggest", response_model=list[QuestionSuggestion])
+async def suggest_questions(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(5, ge=1, le=10),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Sugere perguntas já respondidas do condomínio enquanto o morador digita.
+    Só retorna perguntas com resposta em cache: enviar a sugestão para
+    /ai/chat responde direto do cache, sem chamar o Gemini.
+    """
+    return SuggestService.suggest(q, current_user.tenant_id, limit)
+
+
+@router.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch(
+    request: BatchChatRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Responde várias perguntas em lote (Admin only).
+    Usado por ferramentas administrativas e pela avaliação do RAG.
+    
+    Perguntas em cache são respondidas direto do cache; as demais têm os
+    embeddings gerados em uma única chamada e as buscas em uma única query.
+    """
+    start = time.perf_counter()
+    results: list[BatchChatResult | None] = [None] * len(request.questions)
+    pending = []
+    version = CacheService.get_document_set_version(current_user.tenant_id)
+
+    for idx, question in enumerate(request.questions):
+        with track_stage("cache_lookup", current_user.tenant_id):
+            cached_response = CacheService.get_cached_response(
+                question,
+                current_user.tenant_id,
+                version=version
+            )
+        if cached_response:
+            results[idx] = BatchChatResult(
+                question=question,
+                answer=cached_response["answer"],
+                sources=cached_response["sources"],
+                cached=True
+            )
+        else:
+            pending.append(idx)
+
+    if pending:
+        await check_ai_budget(current_user.tenant_id)
+        set_usage_user(current_user.id)
+
+        try:
+            answered = await rag_service.chat_batch(
+                db=db,
+                questions=[request.questions[idx] for idx in pending],
+                tenant_id=current_user.tenant_id,
+                max_chunks=request.max_chunks,
+                max_concurrency=request.max_concurrency,
+                priority=BACKGROUND  # Lotes administrativos não disputam com o chat
+            )
+        except LLMUnavailableError as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"AI assistant temporarily unavailable: {str(e)}"
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error processing questions: {str(e)}"
+            )
+
+        for idx, result in zip(pending, answered):
+            if not result.get("error") and not result.get("degraded"):
+                CacheService.cache_response(
+                    result["question"],
+                    current_user.tenant_id,
+                    {"answer": result["answer"], "sources": result["sources"]},
+                    ttl=3600,
+                    version=version
+                )
+            results[idx] = BatchChatResult(**result)
+
+    return BatchChatResponse(
+        results=results,
+        total_ms=round((time.perf_counter() - start) * 1000, 2)
+    )
+
+
 @router.get("/usage")
 async def get_usage_stats(
     current_user: User = Depends(get_current_user)
@@ -82,6 +254,24 @@ async def get_usage_stats(
     return get_user_request_count(current_user.id)
 
 
+@router.get("/usage/tenant", response_model=TenantUsageResponse)
+async def get_tenant_usage(
+    days: int = Query(30, ge=1, le=31),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Consumo de tokens e custo estimado do condomínio (Admin only)
+    Mês corrente e orçamento, série diária e consumo por usuário
+    """
+    try:
+        return UsageService.get_tenant_usage(current_user.tenant_id, days)
+    except Exception as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"AI usage temporarily unavailable: {str(e)}"
+        )
+
+
 @router.get("/cache/stats")
 async def get_cache_stats(
     current_user: User = Depends(get_current_user)
@@ -100,8 +290,43 @@ async def invalidate_cache(
     Invalida todo o cache (Admin only)
     Útil quando novos documentos são adicionados
     """
-    deleted = CacheService.invalidate_cache(current_user.tenant_id)
+    version, deleted = CacheService.invalidate_cache(current_user.tenant_id)
     return {
         "message": f"Cache invalidated successfully",
-        "deleted_entries": deleted
+        "deleted_entries": deleted,
+        "document_set_version": version
     }
+
+
+@router.get("/faq", response_model=list[FAQItem])
+async def get_faq(
+    current_user: User = Depends(require_admin)
+):
+    """
+    Lista de perguntas frequentes do condomínio (Admin only)
+    Mesmo formato de tests/rag_evaluation/test_dataset.json
+    """
+    return FAQService.get_faq(current_user.tenant_id)
+
+
+@router.put("/faq", response_model=list[FAQItem])
+async def update_faq(
+    items: list[FAQItem],
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(require_admin)
+):
+    """
+    Substitui a lista de perguntas frequentes (Admin only)
+    As respostas são pré-calculadas em background e vão para o cache
+    """
+    if len(items) > settings.FAQ_MAX_QUESTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"FAQ can have at most {settings.FAQ_MAX_QUESTIONS} questions"
+        )
+
+    faq = [item.model_dump() for item in items]
+    FAQService.set_faq(current_user.tenant_id, faq)
+    background_tasks.add_task(FAQService.precompute_answers, current_user.tenant_id)
+
+    return faq
@@ -1,26 +1,35 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.dependencies.auth import get_current_user
+from app.dependencies.pagination import KeysetPage
 from app.models.base import CommonArea, User
-from app.schemas.common_area import CommonAreaCreate, CommonAreaUpdate, CommonAreaResponse
+from app.schemas.common_area import AvailabilityResponse, CommonAreaCreate, CommonAreaUpdate, CommonAreaResponse
+from app.services.availability_service import AvailabilityService
 
 router = APIRouter()
 
 @router.get("/", response_model=List[CommonAreaResponse])
 async def list_common_areas(
+    response: Response,
+    page: KeysetPage = Depends(),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all common areas for the current tenant"""
+    """List common areas for the current tenant (newest first, paginated)"""
     result = await db.execute(
-        select(CommonArea).where(CommonArea.tenant_id == current_user.tenant_id)
+        page.apply(
+            select(CommonArea).where(CommonArea.tenant_id == current_user.tenant_id),
+            CommonArea.created_at,
+            CommonArea.id
+        )
     )
-    areas = result.scalars().all()
-    return areas
+    return page.finish(result.scalars().all(), response)
 
 @router.post("/", response_model=CommonAreaResponse, status_code=status.HTTP_201_CREATED)
 async def create_common_area(
@@ -59,6 +68,47 @@ async def get_common_area(
         raise HTTPException(status_code=404, detail="Common area not found")
     return area
 
+@router.get("/{area_id}/availability", response_model=AvailabilityResponse)
+async def get_common_area_availability(
+    area_id: str,
+    date_from: date = Query(..., alias="from", description="First day (local date)"),
+    date_to: date = Query(..., alias="to", description="Last day, inclusive (local date)"),
+    slot: Optional[int] = Query(None, ge=5, le=1440, description="Split free time into slots of this many minutes"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Free time of a common area per day, from its opening hours and the
+    confirmed reservations. Days are cached and invalidated on booking.
+    Misses are computed on the primary: a lagging replica would cache a
+    just-booked slot as free for AVAILABILITY_CACHE_TTL.
+    """
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (date_to - date_from).days >= settings.AVAILABILITY_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Availability range is limited to {settings.AVAILABILITY_MAX_DAYS} days"
+        )
+
+    result = await db.execute(
+        select(CommonArea).where(
+            CommonArea.id == area_id,
+            CommonArea.tenant_id == current_user.tenant_id
+        )
+    )
+    area = result.scalars().first()
+    if not area:
+        raise HTTPException(status_code=404, detail="Common area not found")
+
+    days = await AvailabilityService.get_availability(db, area, date_from, date_to, slot)
+    return {
+        "common_area_id": area.id,
+        "timezone": settings.RESERVATION_TIMEZONE,
+        "slot_minutes": slot,
+        "days": days,
+    }
+
 @router.put("/{area_id}", response_model=CommonAreaResponse)
 async def update_common_area(
     area_id: str,
@@ -87,6 +137,7 @@ async def update_common_area(
         setattr(area, key, value)
     
     await db.commit()
+    AvailabilityService.invalidate_area(area.id)
     await db.refresh(area)
     return area
 
@@ -115,4 +166,5 @@ async def delete_common_area(
     
     await db.delete(area)
     await db.commit()
+    AvailabilityService.invalidate_area(area_id)
     return None
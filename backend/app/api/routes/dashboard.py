@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.database import get_read_db
+from app.dependencies.auth import require_admin
+from app.models.base import CommonArea, Reservation, User
+from app.schemas.dashboard import DashboardMetrics
+
+router = APIRouter()
+
+RECENT_USERS_DAYS = 7
+
+
+def metrics_queries(tenant_id: str, now: datetime) -> list:
+    """Aggregate counts for the admin dashboard, one query per table"""
+    recent = now - timedelta(days=RECENT_USERS_DAYS)
+    return [
+        select(
+            func.count().label("total_users"),
+            func.count().filter(User.role == "resident").label("total_residents"),
+            func.count().filter(User.role == "staff").label("total_staff"),
+            func.count().filter(User.role == "admin").label("total_admins"),
+            func.count().filter(User.created_at > recent).label("recent_users"),
+        ).where(User.tenant_id == tenant_id),
+        select(
+            func.count().label("total_reservations"),
+            func.count().filter(
+                Reservation.status.in_(["confirmed", "in-progress"])
+            ).label("active_reservations"),
+        ).where(Reservation.tenant_id == tenant_id),
+        select(
+            func.count().label("total_areas"),
+        ).where(CommonArea.tenant_id == tenant_id),
+    ]
+
+
+@router.get("/metrics", response_model=DashboardMetrics)
+async def get_dashboard_metrics(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Tenant totals for the admin dashboard (admin only).
+    Counted in the database: the list endpoints are paginated.
+    """
+    metrics = {}
+    for query in metrics_queries(current_user.tenant_id, datetime.now(timezone.utc)):
+        result = await db.execute(query)
+        metrics.update(result.one()._mapping)
+    return DashboardMetrics(**metrics)
@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Response
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 import os
 import shutil
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.dependencies.auth import get_current_user, require_admin
+from app.dependencies.pagination import KeysetPage
 from app.models.base import User
 from app.models.document import Document
-from app.schemas.document import DocumentUploadResponse, DocumentListResponse, DocumentResponse
+from app.schemas.document import DocumentUploadResponse, DocumentListResponse, DocumentResponse, DocumentType
 from app.services.document_service import DocumentProcessor
+from app.services.faq_service import FAQService
+from app.services.usage_service import set_usage_user
+from app.middleware.rate_limit import check_ai_budget
 
 router = APIRouter()
 processor = DocumentProcessor()
@@ -22,6 +27,7 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 async def upload_document(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    document_type: DocumentType = Form("outro"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
@@ -31,11 +37,16 @@ async def upload_document(
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
 
+    # Os embeddings da ingestão contam no orçamento de IA do condomínio
+    await check_ai_budget(current_user.tenant_id)
+    set_usage_user(current_user.id)
+
     # Criar registro no banco
     document = Document(
         filename=file.filename,
         file_type="pdf",
         file_size=0,  # Será atualizado
+        document_type=document_type,
         tenant_id=current_user.tenant_id,
         uploaded_by=current_user.id,
         status="uploading"
@@ -55,8 +66,10 @@ async def upload_document(
         document.file_size = file_size
         await db.commit()
 
-        # Processar em background
+        # Processar em background; se o processamento falhar, as
+        # respostas das perguntas frequentes não são pré-calculadas
         background_tasks.add_task(processor.process_document, db, document, file_path)
+        background_tasks.add_task(FAQService.precompute_answers, current_user.tenant_id)
 
         return DocumentUploadResponse(
             id=document.id,
@@ -73,25 +86,36 @@ async def upload_document(
 
 @router.get("/", response_model=DocumentListResponse)
 async def list_documents(
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    page: KeysetPage = Depends(),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Listar documentos do condomínio"""
+    """Listar documentos do condomínio (mais recentes primeiro, paginado por cursor)"""
     result = await db.execute(
-        select(Document).where(Document.tenant_id == current_user.tenant_id)
+        page.apply(
+            select(Document).where(Document.tenant_id == current_user.tenant_id),
+            Document.upload_date,
+            Document.id
+        )
+    )
+    documents = page.finish(result.scalars().all(), response, created_attr="upload_date")
+
+    # total continua sendo o de documentos do condomínio, não o da página
+    total = await db.scalar(
+        select(func.count()).select_from(Document).where(Document.tenant_id == current_user.tenant_id)
     )
-    documents = result.scalars().all()
 
     return DocumentListResponse(
         documents=documents,
-        total=len(documents)
+        total=total
     )
 
 
 @router.get("/{document_id}", response_model=DocumentResponse)
 async def get_document(
     document_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Obter detalhes de um documento específico"""
@@ -1,30 +1,65 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.dependencies.auth import get_current_user
+from app.dependencies.pagination import KeysetPage
 from app.models.base import Notification, User
-from app.schemas.notification import NotificationCreate, NotificationResponse
+from app.schemas.notification import (
+    MarkAllReadResponse,
+    NotificationBroadcastResponse,
+    NotificationCreate,
+    NotificationResponse,
+    UnreadCountResponse,
+)
+from app.services.notification_service import (
+    create_broadcast,
+    get_visible_broadcast,
+    UnreadCounter,
+    inbox_query,
+    mark_all_read,
+    send_notifications,
+    set_broadcast_state,
+)
 
 router = APIRouter()
 
 @router.get("/", response_model=List[NotificationResponse])
 async def list_notifications(
+    response: Response,
     unread: bool = None,
+    page: KeysetPage = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List notifications for the current user (newest first, paginated), optionally filter by unread.
+    Personal notifications and the tenant broadcasts addressed to the user are merged.
+    """
+    result = await db.execute(inbox_query(current_user, page, unread))
+    return page.finish(result.all(), response)
+
+@router.get("/unread-count", response_model=UnreadCountResponse)
+async def get_unread_count(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all notifications for the current user, optionally filter by unread"""
-    query = select(Notification).where(Notification.user_id == current_user.id)
-    
-    if unread is not None:
-        query = query.where(Notification.is_read == (not unread))
-    
-    result = await db.execute(query)
-    notifications = result.scalars().all()
-    return notifications
+    """
+    Number of unread notifications for the app badge (cached).
+    Misses are recounted on the primary: the count is cached for
+    UNREAD_COUNT_TTL, so a lagging replica would pin a stale badge.
+    """
+    return {"unread": await UnreadCounter.get(db, current_user)}
+
+@router.put("/read-all", response_model=MarkAllReadResponse)
+async def mark_all_notifications_as_read(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Mark every notification of the current user as read in a single statement"""
+    return {"updated": await mark_all_read(db, current_user)}
 
 @router.put("/{notification_id}/read", response_model=NotificationResponse)
 async def mark_notification_as_read(
@@ -42,10 +77,15 @@ async def mark_notification_as_read(
     notification = result.scalars().first()
     
     if not notification:
-        raise HTTPException(status_code=404, detail="Notification not found")
+        broadcast = await get_visible_broadcast(db, current_user, notification_id)
+        if not broadcast:
+            raise HTTPException(status_code=404, detail="Notification not found")
+        return await set_broadcast_state(db, broadcast, current_user.id, read_at=True)
     
-    notification.is_read = True
-    await db.commit()
+    if not notification.is_read:
+        notification.is_read = True
+        await db.commit()
+        UnreadCounter.decrement(current_user.tenant_id, current_user.id)
     await db.refresh(notification)
     return notification
 
@@ -65,21 +105,31 @@ async def delete_notification(
     notification = result.scalars().first()
     
     if not notification:
-        raise HTTPException(status_code=404, detail="Notification not found")
+        broadcast = await get_visible_broadcast(db, current_user, notification_id)
+        if not broadcast:
+            raise HTTPException(status_code=404, detail="Notification not found")
+        await set_broadcast_state(db, broadcast, current_user.id, deleted_at=True)
+        return None
     
+    was_unread = not notification.is_read
     await db.delete(notification)
     await db.commit()
+    if was_unread:
+        UnreadCounter.decrement(current_user.tenant_id, current_user.id)
     return None
 
-@router.post("/", response_model=List[NotificationResponse], status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=NotificationBroadcastResponse, status_code=status.HTTP_201_CREATED)
 async def create_notification(
     notification: NotificationCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Create notifications (admin only).
     Can send to specific users, all residents of specific units, or all residents.
+    A notice to all residents is stored once as a broadcast; large per-user
+    sends are delivered in background (`queued` in the response).
     """
     if current_user.role != "admin":
         raise HTTPException(
@@ -87,51 +137,39 @@ async def create_notification(
             detail="Only admins can create notifications"
         )
     
-    target_user_ids = set()
-    
-    # Collect target user IDs based on criteria
-    if notification.send_to_all:
-        # Send to all residents in tenant
-        result = await db.execute(
-            select(User).where(
-                User.tenant_id == current_user.tenant_id,
-                User.role == "resident"
-            )
-        )
-        users = result.scalars().all()
-        target_user_ids.update([u.id for u in users])
-    
-    if notification.user_ids:
-        # Add specific user IDs
-        target_user_ids.update(notification.user_ids)
-    
-    if notification.unit_ids:
-        # Add all residents of specified units
-        result = await db.execute(
-            select(User).where(
-                User.unit_id.in_(notification.unit_ids),
-                User.tenant_id == current_user.tenant_id
-            )
-        )
-        users = result.scalars().all()
-        target_user_ids.update([u.id for u in users])
-    
-    # Create notifications for all target users
-    created_notifications = []
-    for user_id in target_user_ids:
-        db_notification = Notification(
+    if not notification.send_to_all:
+        sent = await send_notifications(
+            db=db,
+            tenant_id=current_user.tenant_id,
             title=notification.title,
             message=notification.message,
-            user_id=user_id,
-            tenant_id=current_user.tenant_id
+            user_ids=notification.user_ids,
+            unit_ids=notification.unit_ids,
+            background_tasks=background_tasks
         )
-        db.add(db_notification)
-        created_notifications.append(db_notification)
-    
-    await db.commit()
-    
-    # Refresh all notifications
-    for notif in created_notifications:
-        await db.refresh(notif)
-    
-    return created_notifications
+        return sent._asdict()
+
+    sent = await create_broadcast(
+        db=db,
+        tenant_id=current_user.tenant_id,
+        title=notification.title,
+        message=notification.message,
+        audience_role="resident",
+        created_by=current_user.id
+    )
+    # Other explicitly targeted users (non-residents) get a personal copy
+    extra = await send_notifications(
+        db=db,
+        tenant_id=current_user.tenant_id,
+        title=notification.title,
+        message=notification.message,
+        user_ids=notification.user_ids,
+        unit_ids=notification.unit_ids,
+        exclude_roles=["resident"],
+        background_tasks=background_tasks
+    )
+    return {
+        "broadcast_id": sent.broadcast_id,
+        "recipients": sent.recipients + extra.recipients,
+        "queued": extra.queued,
+    }
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.core.database import get_db
+from app.core.database import get_db, stick_to_primary
 from app.core.security import get_password_hash, create_access_token
 from app.core.config import settings
 from app.models.base import Tenant, User
@@ -68,6 +68,9 @@ async def tenant_onboarding(
     await db.commit()
     await db.refresh(new_tenant)
     await db.refresh(new_admin)
+    # No token in this request, so the commit did not stick anyone: the
+    # admin's first requests must not hit a replica without the new row
+    stick_to_primary(new_admin.id)
     
     # Generate access token for immediate login
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
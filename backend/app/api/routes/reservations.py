@@ -1,27 +1,61 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timezone
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import update
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.dependencies.auth import get_current_user
-from app.models.base import Reservation, User
-from app.schemas.reservation import ReservationCreate, ReservationResponse
-from app.services.reservation_service import check_reservation_conflict, check_unit_limit
+from app.dependencies.pagination import KeysetPage
+from app.models.base import CommonArea, Reservation, Unit, User
+from app.schemas.reservation import (
+    ReservationCreate,
+    ReservationResponse,
+    ReservationSeriesCreate,
+    ReservationSeriesResponse,
+)
+from app.services.availability_service import AvailabilityService
+from app.services.notification_service import send_notifications
+from app.services.reservation_service import (
+    CREATED,
+    check_reservation_availability,
+    create_series,
+    expand_series,
+    is_overlap_violation,
+)
 
 router = APIRouter()
 
 @router.get("/", response_model=List[ReservationResponse])
 async def list_reservations(
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    common_area_id: Optional[str] = None,
+    start_from: Optional[datetime] = Query(None, description="Reservations starting at or after"),
+    start_to: Optional[datetime] = Query(None, description="Reservations starting before"),
+    page: KeysetPage = Depends(),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all reservations for the current tenant"""
-    result = await db.execute(
-        select(Reservation).where(Reservation.tenant_id == current_user.tenant_id)
-    )
-    reservations = result.scalars().all()
-    return reservations
+    """
+    List reservations for the current tenant, newest first.
+    Paginated by cursor: pass the X-Next-Cursor response header as `cursor`.
+    """
+    query = select(Reservation).where(Reservation.tenant_id == current_user.tenant_id)
+
+    if status_filter:
+        query = query.where(Reservation.status == status_filter)
+    if common_area_id:
+        query = query.where(Reservation.common_area_id == common_area_id)
+    if start_from:
+        query = query.where(Reservation.start_time >= start_from)
+    if start_to:
+        query = query.where(Reservation.start_time < start_to)
+
+    result = await db.execute(page.apply(query, Reservation.created_at, Reservation.id))
+    return page.finish(result.scalars().all(), response)
 
 @router.post("/", response_model=ReservationResponse, status_code=status.HTTP_201_CREATED)
 async def create_reservation(
@@ -37,36 +71,27 @@ async def create_reservation(
             detail="Staff members cannot create reservations"
         )
     
-    # Check for time conflicts
-    has_conflict = await check_reservation_conflict(
+    # Check time conflict and unit limit in a single query
+    availability = await check_reservation_availability(
         db=db,
         common_area_id=reservation.common_area_id,
+        unit_id=current_user.unit_id,
         start_time=reservation.start_time,
         end_time=reservation.end_time,
         tenant_id=current_user.tenant_id
     )
     
-    if has_conflict:
+    if availability.has_conflict:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Time slot already reserved"
         )
     
-    # Check unit limit
-    if current_user.unit_id:
-        limit_exceeded = await check_unit_limit(
-            db=db,
-            unit_id=current_user.unit_id,
-            start_time=reservation.start_time,
-            end_time=reservation.end_time,
-            tenant_id=current_user.tenant_id
+    if availability.limit_exceeded:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unit has reached maximum concurrent reservations"
         )
-        
-        if limit_exceeded:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Unit has reached maximum concurrent reservations"
-            )
     
     db_reservation = Reservation(
         **reservation.model_dump(),
@@ -75,14 +100,133 @@ async def create_reservation(
         tenant_id=current_user.tenant_id
     )
     db.add(db_reservation)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        # A concurrent booking took the slot between the check and the insert
+        await db.rollback()
+        if is_overlap_violation(e):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Time slot already reserved"
+            )
+        raise
+    AvailabilityService.invalidate(db_reservation.common_area_id, reservation.start_time, reservation.end_time)
     await db.refresh(db_reservation)
     return db_reservation
 
+@router.post("/series", response_model=ReservationSeriesResponse, status_code=status.HTTP_201_CREATED)
+async def create_reservation_series(
+    series: ReservationSeriesCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Book a recurring series (e.g. weekly gym classes or cleaning windows).
+    All occurrences are checked in one query; the free ones are booked and
+    the result of each occurrence is returned (admins and staff only).
+    """
+    if current_user.role not in ("admin", "staff"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins and staff can book recurring series"
+        )
+
+    area_result = await db.execute(
+        select(CommonArea.id).where(
+            CommonArea.id == series.common_area_id,
+            CommonArea.tenant_id == current_user.tenant_id
+        )
+    )
+    if area_result.scalar() is None:
+        raise HTTPException(status_code=404, detail="Common area not found")
+
+    # Admins usually have no unit of their own: the series names the unit
+    unit_id = series.unit_id or current_user.unit_id
+    if unit_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="unit_id is required for users without a unit"
+        )
+    if series.unit_id:
+        unit_result = await db.execute(
+            select(Unit.id).where(Unit.id == series.unit_id, Unit.tenant_id == current_user.tenant_id)
+        )
+        if unit_result.scalar() is None:
+            raise HTTPException(status_code=404, detail="Unit not found")
+
+    occurrences = expand_series(
+        series.start_time,
+        series.end_time,
+        series.frequency,
+        series.interval,
+        series.count,
+        series.until,
+        series.by_weekday
+    )
+    if any(previous.end_time > current.start_time for previous, current in zip(occurrences, occurrences[1:])):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Occurrences of the series overlap each other"
+        )
+
+    series_id, results = await create_series(
+        db=db,
+        common_area_id=series.common_area_id,
+        user_id=current_user.id,
+        unit_id=unit_id,
+        tenant_id=current_user.tenant_id,
+        occurrences=occurrences
+    )
+    if occurrences:
+        AvailabilityService.invalidate(series.common_area_id, occurrences[0].start_time, occurrences[-1].end_time)
+
+    created = sum(1 for result in results if result["status"] == CREATED)
+    return {
+        "series_id": series_id,
+        "created": created,
+        "skipped": len(results) - created,
+        "occurrences": results,
+    }
+
+@router.delete("/series/{series_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_reservation_series(
+    series_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Cancel the upcoming confirmed occurrences of a series (owner or admin only)"""
+    query = update(Reservation).where(
+        Reservation.series_id == series_id,
+        Reservation.tenant_id == current_user.tenant_id,
+        Reservation.status == "confirmed",
+        Reservation.start_time >= datetime.now(timezone.utc)
+    )
+    if current_user.role != "admin":
+        query = query.where(Reservation.user_id == current_user.id)
+
+    result = await db.execute(
+        query.values(status="cancelled").returning(
+            Reservation.common_area_id, Reservation.start_time, Reservation.end_time
+        )
+    )
+    cancelled = result.all()
+    await db.commit()
+
+    if not cancelled:
+        raise HTTPException(status_code=404, detail="No upcoming reservations in this series")
+
+    AvailabilityService.invalidate(
+        cancelled[0].common_area_id,
+        min(row.start_time for row in cancelled),
+        max(row.end_time for row in cancelled)
+    )
+    return None
+
 @router.get("/{reservation_id}", response_model=ReservationResponse)
 async def get_reservation(
     reservation_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific reservation"""
@@ -123,6 +267,7 @@ async def cancel_reservation(
     
     reservation.status = "cancelled"
     await db.commit()
+    AvailabilityService.invalidate(reservation.common_area_id, reservation.start_time, reservation.end_time)
     return None
 
 
@@ -159,6 +304,7 @@ async def start_reservation(
     
     reservation.status = "in-progress"
     await db.commit()
+    AvailabilityService.invalidate(reservation.common_area_id, reservation.start_time, reservation.end_time)
     await db.refresh(reservation)
     return reservation
 
@@ -195,6 +341,7 @@ async def complete_reservation(
     
     reservation.status = "completed"
     await db.commit()
+    AvailabilityService.invalidate(reservation.common_area_id, reservation.start_time, reservation.end_time)
     await db.refresh(reservation)
     return reservation
 
@@ -223,31 +370,16 @@ async def report_reservation_issue(
     if not reservation:
         raise HTTPException(status_code=404, detail="Reservation not found")
     
-    # Create notification for admins about the issue
-    from app.models.base import Notification
-    
     description = issue.get("description", "Issue reported")
     severity = issue.get("severity", "normal")
     
-    # Get all admins in the tenant
-    admin_result = await db.execute(
-        select(User).where(
-            User.tenant_id == current_user.tenant_id,
-            User.role == "admin"
-        )
+    # Notify all admins in the tenant
+    broadcast = await send_notifications(
+        db=db,
+        tenant_id=current_user.tenant_id,
+        title=f"Problema Reportado - Reserva #{reservation_id[:8]}",
+        message=f"Funcionário {current_user.full_name} reportou: {description} (Severidade: {severity})",
+        roles=["admin"]
     )
-    admins = admin_result.scalars().all()
-    
-    # Create notification for each admin
-    for admin in admins:
-        notification = Notification(
-            user_id=admin.id,
-            title=f"Problema Reportado - Reserva #{reservation_id[:8]}",
-            message=f"Funcionário {current_user.full_name} reportou: {description} (Severidade: {severity})",
-            tenant_id=current_user.tenant_id
-        )
-        db.add(notification)
-    
-    await db.commit()
     
-    return {"message": "Issue reported successfully", "notifications_created": len(admins)}
+    return {"message": "Issue reported successfully", "notifications_created": broadcast.recipients}
@@ -1,11 +1,12 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 import json
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.dependencies.auth import get_current_user
+from app.dependencies.pagination import KeysetPage
 from app.models.base import Unit, User
 from app.schemas.unit import UnitCreate, UnitUpdate, UnitResponse
 
@@ -13,14 +14,16 @@ router = APIRouter()
 
 @router.get("/", response_model=List[UnitResponse])
 async def list_units(
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    page: KeysetPage = Depends(),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all units for the current tenant"""
+    """List units for the current tenant (newest first, paginated)"""
     result = await db.execute(
-        select(Unit).where(Unit.tenant_id == current_user.tenant_id)
+        page.apply(select(Unit).where(Unit.tenant_id == current_user.tenant_id), Unit.created_at, Unit.id)
     )
-    units = result.scalars().all()
+    units = page.finish(result.scalars().all(), response)
     
     # Convert authorized_cpfs JSON to list
     for unit in units:
@@ -73,7 +76,7 @@ async def create_unit(
 @router.get("/{unit_id}", response_model=UnitResponse)
 async def get_unit(
     unit_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific unit"""
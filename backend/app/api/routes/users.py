@@ -1,11 +1,12 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.core.database import get_db
 from app.core.security import get_password_hash
 from app.dependencies.auth import get_current_user
+from app.dependencies.pagination import KeysetPage
 from app.models.base import User
 from app.schemas.user import UserResponse, UserUpdate, PasswordResetRequest
 
@@ -13,21 +14,29 @@ router = APIRouter()
 
 @router.get("/", response_model=List[UserResponse])
 async def list_users(
+    response: Response,
+    role: Optional[str] = None,
+    unit_id: Optional[str] = None,
+    page: KeysetPage = Depends(),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all users in the tenant (admin only)"""
+    """List users in the tenant, newest first and paginated (admin only)"""
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can list users"
         )
     
-    result = await db.execute(
-        select(User).where(User.tenant_id == current_user.tenant_id)
-    )
-    users = result.scalars().all()
-    return users
+    query = select(User).where(User.tenant_id == current_user.tenant_id)
+
+    if role:
+        query = query.where(User.role == role)
+    if unit_id:
+        query = query.where(User.unit_id == unit_id)
+
+    result = await db.execute(page.apply(query, User.created_at, User.id))
+    return page.finish(result.scalars().all(), response)
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
@@ -12,6 +12,38 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     DATABASE_URL: str | None = None
     
+    # Réplica de leitura para handlers somente leitura (vazio = só o primário)
+    DATABASE_READ_URL: str | None = None
+    DB_REPLICA_MAX_LAG_SECONDS: float = 2
+    DB_REPLICA_LAG_CHECK_SECONDS: float = 5
+    # Leituras de quem acabou de escrever vão para o primário (> atraso máximo)
+    DB_STICKY_PRIMARY_SECONDS: int = 10
+
+    # Perfil do engine do banco (pool e driver asyncpg); DB_ECHO loga todo SQL
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10  # Segundos esperando uma conexão livre
+    DB_POOL_RECYCLE: int = 1800  # Renova conexões antes de timeouts do servidor/proxy
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # 0 atrás de pgbouncer (modo transaction)
+
+    # Paginação por cursor das listagens (header X-Next-Cursor)
+    PAGE_DEFAULT_LIMIT: int = 50
+    PAGE_MAX_LIMIT: int = 200
+
+    # Calendário de disponibilidade das áreas comuns (horários no fuso do condomínio)
+    RESERVATION_TIMEZONE: str = "America/Sao_Paulo"
+    AVAILABILITY_CACHE_TTL: int = 300  # Segundos; invalidado ao reservar/cancelar
+    AVAILABILITY_MAX_DAYS: int = 62
+    # Máximo de ocorrências de uma série de reservas recorrentes
+    RESERVATION_SERIES_MAX_OCCURRENCES: int = 104
+
+    # Envios com pelo menos este número de destinatários vão para background
+    NOTIFICATION_BACKGROUND_THRESHOLD: int = 500
+    # Contador de não lidas no Redis; o TTL reconcilia com o banco
+    UNREAD_COUNT_TTL: int = 3600
+
     SECRET_KEY: str = "CHANGE_THIS_IN_PRODUCTION"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -20,9 +52,89 @@ class Settings(BaseSettings):
     # Google Gemini API
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY") 
 
+    # Provedor de LLM/embeddings: "gemini" ou "fake" (local, determinístico)
+    LLM_PROVIDER: str = "gemini"
+    FAKE_LLM_EMBEDDING_LATENCY_MS: float = 0
+    FAKE_LLM_GENERATION_LATENCY_MS: float = 0
+    FAKE_LLM_JITTER_MS: float = 0
+
+    # Admissão de chamadas ao LLM: limite global e pesos por tenant (JSON)
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_TENANT_WEIGHTS: dict[str, float] = {}
+
+    # Prazos por tipo de chamada, circuit breaker e hedging (0 desliga)
+    LLM_TIMEOUT_QUERY_EMBEDDING_SECONDS: float = 5
+    LLM_TIMEOUT_DOCUMENT_EMBEDDING_SECONDS: float = 30
+    LLM_TIMEOUT_GENERATION_SECONDS: float = 30
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    LLM_CIRCUIT_RESET_SECONDS: float = 30
+    LLM_HEDGE_QUERY_EMBEDDING_MS: float = 0
+
+    # Cassetes de chamadas ao LLM: "" (desligado), "record", "replay" ou "auto"
+    LLM_CASSETTE_MODE: str = ""
+    LLM_CASSETTE_PATH: str = "tests/cassettes/gemini.json"
+    LLM_REPLAY_LATENCY_MS: float = 0
+    LLM_REPLAY_USE_RECORDED_LATENCY: bool = False
+
+    # Busca hierárquica: documentos -> páginas -> chunks
+    RAG_HIERARCHICAL_RETRIEVAL: bool = True
+    RAG_TOP_DOCUMENTS: int = 5
+    RAG_TOP_PAGES: int = 20
+    # Versões de embedding (app/services/embedding_versions.py): a ingestão
+    # grava em todas as versões de EMBEDDING_WRITE_VERSIONS; a busca lê a
+    # versão do tenant (tenants.embedding_version) ou a padrão
+    EMBEDDING_V2_MODEL: str = "models/gemini-embedding-001"
+    EMBEDDING_WRITE_VERSIONS: list[str] = ["v1"]
+    EMBEDDING_DEFAULT_READ_VERSION: str = "v1"
+    # Re-embed em background (scripts/reembed_corpus.py)
+    REEMBED_BATCH_SIZE: int = 100
+    REEMBED_PAUSE_SECONDS: float = 1.0
+
+    # Chunks de ingestão (caracteres) e vizinhos incluídos de cada lado na resposta
+    RAG_CHUNK_SIZE: int = 400
+    RAG_CHUNK_OVERLAP: int = 50
+    RAG_NEIGHBOR_WINDOW: int = 1
+    # Buscas vetoriais (índice HNSW único para todos os tenants, com o
+    # tenant e os filtros aplicados depois): candidatos lidos do índice
+    RAG_FILTERED_EF_SEARCH: int = 200
+    # pgvector >= 0.8: "relaxed_order" ou "strict_order" (vazio = desligado)
+    RAG_HNSW_ITERATIVE_SCAN: str = ""
+
+    # Sessões de conversa do chat
+    CONVERSATION_TTL: int = 1800  # 30 minutos sem mensagens
+    CONVERSATION_MAX_TURNS: int = 6
+    CONVERSATION_ANSWER_MAX_CHARS: int = 600
+    CONVERSATION_HISTORY_MAX_TOKENS: int = 1000
+    CONVERSATION_MAX_CHUNK_IDS: int = 10
+    # Similaridade mínima para responder só com os chunks já recuperados
+    CONVERSATION_REUSE_MIN_SIMILARITY: float = 0.7
+
+    # Autocompletar perguntas: fração mínima de trigramas em comum
+    SUGGEST_MIN_TRIGRAM_SIMILARITY: float = 0.5
+    # Trigramas em mais perguntas que isso não geram candidatos (comuns demais)
+    SUGGEST_MAX_TRIGRAM_POSTINGS: int = 200
+
+    # Respostas pré-calculadas após o processamento de documentos
+    FAQ_MAX_QUESTIONS: int = 50
+    FAQ_TOP_QUESTIONS: int = 20  # Perguntas mais frequentes incluídas
+    FAQ_PRECOMPUTE_CONCURRENCY: int = 2
+    FAQ_CACHE_TTL: int = 86400  # Invalidadas pela versão dos documentos
+
+    # Consumo de tokens do LLM: preços (USD por milhão de tokens), retenção
+    # dos contadores no Redis e orçamento mensal por tenant (0 = sem limite)
+    AI_PRICE_PROMPT_PER_MTOK: float = 0.30
+    AI_PRICE_OUTPUT_PER_MTOK: float = 2.50
+    AI_PRICE_EMBEDDING_PER_MTOK: float = 0.15
+    AI_USAGE_RETENTION_DAYS: int = 40
+    AI_MONTHLY_BUDGET_USD: float = 0
+    AI_TENANT_MONTHLY_BUDGETS_USD: dict[str, float] = {}
+
     # Redis
     REDIS_URL: str = "redis://redis:6379/0"
 
+    # Cache de embeddings de perguntas (segundos)
+    EMBEDDING_CACHE_TTL: int = 604800  # 7 dias
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+import time
+
+from prometheus_client import Gauge, Histogram
+
+# Buckets cobrem desde leituras de cache (ms) até gerações lentas do LLM
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30)
+
+RAG_STAGE_SECONDS = Histogram(
+    "sindicoai_rag_stage_seconds",
+    "Duração de cada etapa do pipeline de IA",
+    ["stage", "tenant"],
+    buckets=LATENCY_BUCKETS,
+)
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "sindicoai_db_pool_checkout_seconds",
+    "Tempo para obter uma conexão do pool do banco",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_IN_USE = Gauge(
+    "sindicoai_db_pool_connections_in_use",
+    "Conexões do pool do banco em uso (checked out)",
+    ["engine"],
+)
+DB_POOL_CAPACITY = Gauge(
+    "sindicoai_db_pool_capacity",
+    "Máximo de conexões do pool do banco (pool_size + max_overflow)",
+    ["engine"],
+)
+
+# Etapas medidas na requisição atual, para o header Server-Timing
+_server_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar(
+    "server_timings", default=None
+)
+
+
+class StageTimer:
+    """Resultado de track_stage (elapsed_ms preenchido ao final do bloco)"""
+
+    __slots__ = ("stage", "elapsed_ms")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.elapsed_ms = 0.0
+
+
+@contextmanager
+def track_stage(stage: str, tenant_id: str) -> Iterator[StageTimer]:
+    """
+    Mede a duração de uma etapa do pipeline
+
+    Registra no histograma do Prometheus (labels stage/tenant) e, se houver
+    uma requisição HTTP em andamento, na lista usada pelo Server-Timing.
+    """
+    timer = StageTimer(stage)
+    start = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        elapsed = time.perf_counter() - start
+        timer.elapsed_ms = round(elapsed * 1000, 2)
+        RAG_STAGE_SECONDS.labels(stage=stage, tenant=tenant_id).observe(elapsed)
+
+        timings = _server_timings.get()
+        if timings is not None:
+            timings.append((stage, timer.elapsed_ms))
+
+
+def start_server_timing() -> Tuple[List[Tuple[str, float]], object]:
+    """Inicia a coleta de etapas da requisição atual; retorna (lista, token)"""
+    timings: List[Tuple[str, float]] = []
+    return timings, _server_timings.set(timings)
+
+
+def stop_server_timing(token: object) -> None:
+    _server_timings.reset(token)
+
+
+def format_server_timing(timings: List[Tuple[str, float]]) -> str:
+    """Formata etapas no padrão do header Server-Timing (W3C)"""
+    return ", ".join(f"{stage};dur={elapsed_ms:.1f}" for stage, elapsed_ms in timings)
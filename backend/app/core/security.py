@@ -33,3 +33,13 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+def get_token_subject(authorization: str | None) -> str | None:
+    """ID do usuário de um header 'Authorization: Bearer ...' (None se ausente ou inválido)"""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        payload = jwt.decode(authorization[7:], settings.SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.JWTError:
+        return None
+    return payload.get("sub")
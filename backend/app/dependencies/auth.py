@@ -3,12 +3,11 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.core.config import settings
 from app.core import security
-from app.core.database import get_db
+from app.core import database
 from app.models.base import User
 from app.schemas.token import TokenPayload
 
@@ -16,8 +15,13 @@ reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
+async def _load_user(session_factory, user_id: str) -> Optional[User]:
+    async with session_factory() as db:
+        result = await db.execute(select(User).where(User.id == user_id))
+        return result.scalars().first()
+
+
 async def get_current_user(
-    db: AsyncSession = Depends(get_db),
     token: str = Depends(reusable_oauth2)
 ) -> User:
     try:
@@ -31,8 +35,13 @@ async def get_current_user(
             detail="Could not validate credentials",
         )
 
-    result = await db.execute(select(User).where(User.id == token_data.sub))
-    user = result.scalars().first()
+    # Sessão própria e curta: não segura conexão durante o handler nem
+    # compartilha a sessão de leitura (get_read_db) que ele usa
+    session_factory = await database.read_session_factory(token_data.sub)
+    user = await _load_user(session_factory, token_data.sub)
+    if not user and session_factory is not database.AsyncSessionLocal:
+        # Usuário recém-criado pode ainda não ter chegado à réplica
+        user = await _load_user(database.AsyncSessionLocal, token_data.sub)
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
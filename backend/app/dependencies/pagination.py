@@ -0,0 +1,65 @@
+import base64
+from datetime import datetime
+from typing import Optional, Sequence
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import tuple_
+
+from app.core.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), row_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class KeysetPage:
+    """
+    Keyset pagination over (created_at, id), newest first.
+
+    List endpoints keep returning a plain array; when there are more rows,
+    the cursor for the next page is sent in the X-Next-Cursor header.
+    """
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Value of the X-Next-Cursor header from the previous page"),
+        limit: int = Query(settings.PAGE_DEFAULT_LIMIT, ge=1, le=settings.PAGE_MAX_LIMIT)
+    ):
+        self.limit = limit
+        self.after = None
+        if cursor:
+            try:
+                self.after = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid pagination cursor"
+                )
+
+    def apply(self, query, created_column, id_column):
+        """Order by (created_at, id) descending and fetch one extra row to detect a next page"""
+        if self.after:
+            query = query.where(tuple_(created_column, id_column) < tuple_(*self.after))
+        return query.order_by(created_column.desc(), id_column.desc()).limit(self.limit + 1)
+
+    def finish(self, rows: Sequence, response: Response, created_attr: str = "created_at") -> list:
+        """Trim the extra row and set the X-Next-Cursor header if there is a next page"""
+        rows = list(rows)
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            last = rows[-1]
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, created_attr), last.id)
+        return rows
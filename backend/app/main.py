@@ -1,6 +1,8 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from app.api.routes import api_router
+from app.middleware.server_timing import ServerTimingMiddleware
 
 app = FastAPI(title="SindicoAI API", version="0.1.0")
 
@@ -18,12 +20,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Next-Cursor"],
 )
 
+# Tempos por etapa (embedding, busca, geração...) no header Server-Timing
+app.add_middleware(ServerTimingMiddleware)
+
 @app.get("/health")
 def health_check():
     return {"status": "ok", "service": "SindicoAI Backend"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to SindicoAI API"}
@@ -1,6 +1,7 @@
 from fastapi import HTTPException, Request
 from redis import Redis
 from app.core.config import settings
+from app.services.usage_service import UsageService, get_tenant_budget
 import time
 
 redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
@@ -78,3 +79,35 @@ def get_user_request_count(user_id: str) -> dict:
             "remaining": 50,
             "error": str(e)
         }
+
+async def check_ai_budget(tenant_id: str):
+    """
+    Bloqueia chamadas ao LLM de tenants que esgotaram o orçamento do mês
+
+    O consumo vem dos contadores do UsageService (custo estimado em USD);
+    o orçamento é AI_TENANT_MONTHLY_BUDGETS_USD[tenant] ou AI_MONTHLY_BUDGET_USD.
+
+    Args:
+        tenant_id: ID do tenant
+
+    Raises:
+        HTTPException: Se o orçamento mensal foi atingido
+    """
+    budget = get_tenant_budget(tenant_id)
+    if not budget:
+        return
+
+    try:
+        spent = UsageService.get_month_usage(tenant_id)["cost_usd"]
+    except Exception as e:
+        # Se Redis falhar, permitir a requisição mas logar o erro
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"AI budget check failed: {e}")
+        return
+
+    if spent >= budget:
+        raise HTTPException(
+            status_code=429,
+            detail="Monthly AI budget for this condominium has been reached. Contact the administrator."
+        )
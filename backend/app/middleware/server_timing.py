@@ -0,0 +1,41 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import format_server_timing, start_server_timing, stop_server_timing
+
+
+class ServerTimingMiddleware:
+    """
+    Adiciona o header Server-Timing com as etapas medidas por track_stage
+
+    Middleware ASGI puro (sem BaseHTTPMiddleware) para que o endpoint rode
+    no mesmo contexto e as etapas registradas cheguem até aqui.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        timings, token = start_server_timing()
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start" and timings:
+                total_ms = (time.perf_counter() - start) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    format_server_timing(timings + [("total", total_ms)])
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_server_timing(token)
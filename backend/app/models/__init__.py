@@ -1,5 +1,6 @@
-from app.models.base import Tenant, User, Unit, CommonArea, Reservation, Notification
-from app.models.document import Document, DocumentChunk
+from app.models.base import Tenant, User, Unit, CommonArea, Reservation, Notification, Broadcast, BroadcastRead
+from app.models.document import Document, DocumentPage, DocumentChunk
+from app.models.usage import AIUsageDaily
 
 __all__ = [
     "Tenant",
@@ -9,5 +10,7 @@ __all__ = [
     "Reservation",
     "Notification",
     "Document",
+    "DocumentPage",
     "DocumentChunk",
+    "AIUsageDaily",
 ]
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, func
+from sqlalchemy import Column, Computed, Integer, String, Boolean, ForeignKey, DateTime, Index, func, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint, TSTZRANGE
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 import uuid
@@ -13,6 +14,8 @@ class Tenant(Base):
     name = Column(String, nullable=False)
     domain = Column(String, unique=True, index=True)
     address = Column(String)
+    # Versão de embedding lida pela busca do RAG (None = padrão da aplicação)
+    embedding_version = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     users = relationship("User", back_populates="tenant")
@@ -20,6 +23,12 @@ class Tenant(Base):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Listagens do tenant e destinatários por papel (ex.: admins, residents)
+        Index("ix_users_tenant_id_role", "tenant_id", "role"),
+        # Keyset pagination (newest first)
+        Index("ix_users_tenant_id_created_at_id", "tenant_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -28,20 +37,26 @@ class User(Base):
     full_name = Column(String)
     role = Column(String, default="resident") # resident, admin, staff
     is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False)
     tenant = relationship("Tenant", back_populates="users")
     
-    unit_id = Column(String, ForeignKey("units.id"), nullable=True)
+    unit_id = Column(String, ForeignKey("units.id"), nullable=True, index=True)
     unit = relationship("Unit", back_populates="residents")
 
 class Unit(Base):
     __tablename__ = "units"
+    __table_args__ = (
+        # Keyset pagination (newest first)
+        Index("ix_units_tenant_id_created_at_id", "tenant_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     block = Column(String)
     number = Column(String, nullable=False)
     authorized_cpfs = Column(String)  # JSON string of authorized CPFs for this unit
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False)
     tenant = relationship("Tenant", back_populates="units")
@@ -50,6 +65,10 @@ class Unit(Base):
 
 class CommonArea(Base):
     __tablename__ = "common_areas"
+    __table_args__ = (
+        # Keyset pagination (newest first)
+        Index("ix_common_areas_tenant_id_created_at_id", "tenant_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     name = Column(String, nullable=False)
@@ -58,20 +77,44 @@ class CommonArea(Base):
     opening_time = Column(String)  # Format: "08:00"
     closing_time = Column(String)  # Format: "22:00"
     is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False)
     tenant = relationship("Tenant")
     
     reservations = relationship("Reservation", back_populates="common_area")
 
+RESERVATION_OVERLAP_CONSTRAINT = "ex_reservations_common_area_period"
+
 class Reservation(Base):
     __tablename__ = "reservations"
+    __table_args__ = (
+        # Conflito de horário da área e limite de reservas simultâneas da unidade
+        Index("ix_reservations_common_area_id_start_time_end_time", "common_area_id", "start_time", "end_time"),
+        Index("ix_reservations_unit_id_start_time", "unit_id", "start_time"),
+        # Keyset pagination (newest first) and the date range filter
+        Index("ix_reservations_tenant_id_created_at_id", "tenant_id", "created_at", "id"),
+        Index("ix_reservations_tenant_id_start_time", "tenant_id", "start_time"),
+        # The database rejects overlapping confirmed reservations of the same
+        # area, even from concurrent requests (requires btree_gist)
+        ExcludeConstraint(
+            ("common_area_id", "="),
+            ("period", "&&"),
+            name=RESERVATION_OVERLAP_CONSTRAINT,
+            using="gist",
+            where=text("status = 'confirmed'"),
+        ),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     start_time = Column(DateTime(timezone=True), nullable=False)
     end_time = Column(DateTime(timezone=True), nullable=False)
+    # [start_time, end_time) computed by the database for the exclusion constraint
+    period = Column(TSTZRANGE, Computed("tstzrange(start_time, end_time, '[)')", persisted=True))
     status = Column(String, default="confirmed")  # confirmed, cancelled
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Occurrences booked together by a recurring series share this id
+    series_id = Column(String, index=True)
     
     common_area_id = Column(String, ForeignKey("common_areas.id"), nullable=False)
     common_area = relationship("CommonArea", back_populates="reservations")
@@ -87,16 +130,52 @@ class Reservation(Base):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Caixa de entrada do usuário (filtro por lidas/não lidas, mais recentes primeiro)
+        Index("ix_notifications_user_id_is_read_created_at", "user_id", "is_read", "created_at"),
+        Index("ix_notifications_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     title = Column(String, nullable=False)
     message = Column(String, nullable=False)
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Notifications created together by one send share this id
+    broadcast_id = Column(String, index=True)
     
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     user = relationship("User")
     
+    tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False, index=True)
+    tenant = relationship("Tenant")
+
+
+class Broadcast(Base):
+    """A tenant-wide notice stored once, instead of one notification per recipient"""
+    __tablename__ = "broadcasts"
+    __table_args__ = (
+        # Merged into the inbox by keyset (newest first)
+        Index("ix_broadcasts_tenant_id_created_at_id", "tenant_id", "created_at", "id"),
+    )
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    title = Column(String, nullable=False)
+    message = Column(String, nullable=False)
+    # Only users with this role see it (None = everyone in the tenant)
+    audience_role = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    created_by = Column(String, ForeignKey("users.id"))
+
     tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False)
     tenant = relationship("Tenant")
 
+class BroadcastRead(Base):
+    """Per-user state of a broadcast; no row means unread"""
+    __tablename__ = "broadcast_reads"
+
+    broadcast_id = Column(String, ForeignKey("broadcasts.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    read_at = Column(DateTime(timezone=True))
+    deleted_at = Column(DateTime(timezone=True))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, func
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, Text, func
 from sqlalchemy.orm import relationship
 from pgvector.sqlalchemy import Vector
 from app.core.database import Base
@@ -9,6 +9,10 @@ def generate_uuid():
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # Paginação por cursor (mais recentes primeiro)
+        Index("ix_documents_tenant_id_upload_date_id", "tenant_id", "upload_date", "id"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     filename = Column(String, nullable=False)
@@ -16,6 +20,11 @@ class Document(Base):
     file_size = Column(Integer)  # bytes
     upload_date = Column(DateTime(timezone=True), server_default=func.now())
     status = Column(String, default="processing")  # processing, completed, failed
+    document_type = Column(String, nullable=False, default="outro", server_default="outro")  # regimento, convencao, ata, comunicado, outro
+
+    # Centróide dos embeddings dos chunks (1º estágio da busca hierárquica)
+    summary_embedding = Column(Vector(768))
+    summary_embedding_v2 = Column(Vector(768))
 
     tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False)
     tenant = relationship("Tenant")
@@ -24,18 +33,56 @@ class Document(Base):
     uploader = relationship("User")
 
     chunks = relationship("DocumentChunk", back_populates="document", cascade="all, delete-orphan")
+    pages = relationship("DocumentPage", back_populates="document", cascade="all, delete-orphan")
+
+
+class DocumentPage(Base):
+    __tablename__ = "document_pages"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    page_number = Column(Integer, nullable=False)
+
+    # Centróide dos embeddings dos chunks da página (2º estágio da busca)
+    embedding = Column(Vector(768))
+    embedding_v2 = Column(Vector(768))
+
+    document_id = Column(String, ForeignKey("documents.id"), nullable=False, index=True)
+    document = relationship("Document", back_populates="pages")
+
+    tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False)
 
 
 class DocumentChunk(Base):
     __tablename__ = "document_chunks"
+    __table_args__ = (
+        # Filtros de metadados do chat (aplicados junto com a busca vetorial)
+        Index("ix_document_chunks_tenant_id_document_type", "tenant_id", "document_type"),
+        Index("ix_document_chunks_tenant_id_document_date", "tenant_id", "document_date"),
+        Index("ix_document_chunks_document_id_page_number", "document_id", "page_number"),
+        # Expansão por vizinhos: leitura de intervalo de chunk_index
+        Index("ix_document_chunks_document_id_chunk_index", "document_id", "chunk_index"),
+        Index(
+            "ix_document_chunks_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+        Index(
+            "ix_document_chunks_embedding_v2_hnsw",
+            "embedding_v2",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding_v2": "vector_cosine_ops"},
+        ),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     chunk_text = Column(Text, nullable=False)
     chunk_index = Column(Integer, nullable=False)  # Ordem do chunk no documento
     page_number = Column(Integer)  # Página de origem (se disponível)
 
-    # Vector embedding (768 dimensões para Gemini text-embedding-004)
-    embedding = Column(Vector(768))
+    # Vector embedding por versão (ver app/services/embedding_versions.py)
+    embedding = Column(Vector(768))  # v1: Gemini text-embedding-004
+    embedding_v2 = Column(Vector(768))  # v2: EMBEDDING_V2_MODEL (preenchida no dual-write/re-embed)
 
     document_id = Column(String, ForeignKey("documents.id"), nullable=False)
     document = relationship("Document", back_populates="chunks")
@@ -43,4 +90,8 @@ class DocumentChunk(Base):
     tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False)
     tenant = relationship("Tenant")
 
+    # Cópias dos metadados do documento para filtrar sem JOIN
+    document_type = Column(String)
+    document_date = Column(DateTime(timezone=True))
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
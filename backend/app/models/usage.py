@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Date, DateTime, ForeignKey, UniqueConstraint, func
+from app.core.database import Base
+import uuid
+
+def generate_uuid():
+    return str(uuid.uuid4())
+
+class AIUsageDaily(Base):
+    """Consumo diário de tokens por usuário (rollup dos contadores do Redis)"""
+    __tablename__ = "ai_usage_daily"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False)
+    # Sem FK: o histórico de consumo sobrevive ao usuário ("system" = sem usuário)
+    user_id = Column(String, nullable=False)
+    day = Column(Date, nullable=False)
+
+    prompt_tokens = Column(BigInteger, nullable=False, default=0)
+    output_tokens = Column(BigInteger, nullable=False, default=0)
+    embedding_tokens = Column(BigInteger, nullable=False, default=0)
+    requests = Column(Integer, nullable=False, default=0)
+    cost_usd = Column(Float, nullable=False, default=0)  # Preços vigentes no rollup
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "user_id", "day", name="uq_ai_usage_daily_tenant_user_day"),
+    )
@@ -2,14 +2,26 @@ from app.schemas.document import (
     DocumentUploadResponse,
     DocumentResponse,
     DocumentListResponse,
+    ChatFilters,
     ChatRequest,
     ChatResponse,
+    QuestionSuggestion,
+    BatchChatRequest,
+    BatchChatResult,
+    BatchChatResponse,
+    FAQItem,
 )
 
 __all__ = [
     "DocumentUploadResponse",
     "DocumentResponse",
     "DocumentListResponse",
+    "ChatFilters",
     "ChatRequest",
     "ChatResponse",
+    "QuestionSuggestion",
+    "BatchChatRequest",
+    "BatchChatResult",
+    "BatchChatResponse",
+    "FAQItem",
 ]
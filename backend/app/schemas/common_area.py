@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
 
 class CommonAreaBase(BaseModel):
     name: str
@@ -27,3 +27,17 @@ class CommonAreaResponse(CommonAreaBase):
 
     class Config:
         from_attributes = True
+
+class FreeInterval(BaseModel):
+    start: datetime
+    end: datetime
+
+class DayAvailability(BaseModel):
+    date: date
+    free: List[FreeInterval]
+
+class AvailabilityResponse(BaseModel):
+    common_area_id: str
+    timezone: str
+    slot_minutes: Optional[int] = None
+    days: List[DayAvailability]
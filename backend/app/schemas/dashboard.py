@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+
+class DashboardMetrics(BaseModel):
+    total_users: int
+    total_residents: int
+    total_staff: int
+    total_admins: int
+    recent_users: int  # Created in the last 7 days
+    total_reservations: int
+    active_reservations: int  # Confirmed or in progress
+    total_areas: int
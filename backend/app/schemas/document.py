@@ -1,6 +1,8 @@
-from pydantic import BaseModel
-from typing import Optional, List
-from datetime import datetime
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Literal
+from datetime import date, datetime
+
+DocumentType = Literal["regimento", "convencao", "ata", "comunicado", "outro"]
 
 class DocumentUploadResponse(BaseModel):
     id: str
@@ -19,6 +21,7 @@ class DocumentResponse(BaseModel):
     file_size: int
     upload_date: datetime
     status: str
+    document_type: str
     tenant_id: str
 
     class Config:
@@ -30,12 +33,92 @@ class DocumentListResponse(BaseModel):
     total: int
 
 
+class ChatFilters(BaseModel):
+    """Restringe a busca a parte dos documentos do condomínio"""
+    document_ids: Optional[List[str]] = Field(None, max_length=50)
+    document_type: Optional[DocumentType] = None
+    uploaded_after: Optional[datetime] = None
+    uploaded_before: Optional[datetime] = None
+    page_from: Optional[int] = Field(None, ge=1)
+    page_to: Optional[int] = Field(None, ge=1)
+
+    @model_validator(mode="after")
+    def check_ranges(self):
+        if self.page_from and self.page_to and self.page_from > self.page_to:
+            raise ValueError("page_from must be less than or equal to page_to")
+        if self.uploaded_after and self.uploaded_before and self.uploaded_after > self.uploaded_before:
+            raise ValueError("uploaded_after must be before uploaded_before")
+        return self
+
+
 class ChatRequest(BaseModel):
     question: str
     max_chunks: int = 5  # Número de chunks a recuperar
+    filters: Optional[ChatFilters] = None
+    session_id: Optional[str] = None  # Continua uma conversa anterior
 
 
 class ChatResponse(BaseModel):
     answer: str
     sources: List[dict]  # Lista de documentos citados
     confidence: Optional[float] = None
+    degraded: bool = False  # True quando o LLM está indisponível (apenas trechos)
+    session_id: Optional[str] = None  # Enviar na próxima pergunta para manter o contexto
+
+
+class QuestionSuggestion(BaseModel):
+    question: str  # Enviar para /ai/chat para receber a resposta em cache
+    count: int  # Quantas vezes a pergunta foi feita
+
+
+class BatchChatRequest(BaseModel):
+    questions: List[str] = Field(..., min_length=1, max_length=50)
+    max_chunks: int = 5
+    max_concurrency: int = Field(4, ge=1, le=10)  # Respostas geradas em paralelo
+
+
+class BatchChatResult(BaseModel):
+    question: str
+    answer: Optional[str] = None
+    sources: List[dict] = []
+    cached: bool = False
+    degraded: bool = False
+    error: Optional[str] = None
+    timings_ms: dict = {}  # embedding, search, generation
+
+
+class BatchChatResponse(BaseModel):
+    results: List[BatchChatResult]
+    total_ms: float
+
+
+class FAQItem(BaseModel):
+    """Pergunta frequente (formato de tests/rag_evaluation/test_dataset.json)"""
+    question: str = Field(..., min_length=3)
+    expected_answer: Optional[str] = None
+    context_should_contain: List[str] = []
+
+
+class AIUsage(BaseModel):
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    embedding_tokens: int = 0  # Estimados pelo tamanho dos textos
+    requests: int = 0  # Respostas geradas
+    total_tokens: int = 0
+    cost_usd: float = 0
+
+
+class DailyAIUsage(AIUsage):
+    day: date
+
+
+class UserAIUsage(AIUsage):
+    user_id: str  # "system" = chamadas fora de uma requisição de usuário
+
+
+class TenantUsageResponse(BaseModel):
+    month: AIUsage
+    budget_usd: float  # 0 = sem limite
+    budget_used: Optional[float] = None  # Fração do orçamento já consumida
+    daily: List[DailyAIUsage]
+    users: List[UserAIUsage]
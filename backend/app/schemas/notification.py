@@ -11,12 +11,24 @@ class NotificationCreate(NotificationBase):
     unit_ids: Optional[List[str]] = None  # All residents of these units
     send_to_all: bool = False  # Send to all residents in tenant
 
+class NotificationBroadcastResponse(BaseModel):
+    broadcast_id: str
+    recipients: int
+    queued: bool  # True when delivery runs in background
+
+class UnreadCountResponse(BaseModel):
+    unread: int
+
+class MarkAllReadResponse(BaseModel):
+    updated: int
+
 class NotificationResponse(NotificationBase):
     id: str
     is_read: bool
     created_at: datetime
     user_id: str
     tenant_id: str
+    broadcast_id: Optional[str] = None
 
     class Config:
         from_attributes = True
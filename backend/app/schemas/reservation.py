@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional
 from datetime import datetime
 
 class ReservationBase(BaseModel):
@@ -8,7 +8,40 @@ class ReservationBase(BaseModel):
     common_area_id: str
 
 class ReservationCreate(ReservationBase):
-    pass
+    @model_validator(mode="after")
+    def check_period(self):
+        if self.end_time <= self.start_time:
+            raise ValueError("end_time must be after start_time")
+        return self
+
+class ReservationSeriesCreate(ReservationCreate):
+    """First occurrence (start_time/end_time) plus an RRULE-like recurrence"""
+    frequency: Literal["daily", "weekly"] = "weekly"
+    interval: int = Field(1, ge=1, le=52)
+    count: Optional[int] = Field(None, ge=1)
+    until: Optional[datetime] = None
+    by_weekday: Optional[List[int]] = Field(None, description="0 = Monday ... 6 = Sunday (weekly only)")
+    unit_id: Optional[str] = Field(None, description="Unit the series is booked for (defaults to the caller's unit)")
+
+    @model_validator(mode="after")
+    def check_recurrence(self):
+        if self.count is None and self.until is None:
+            raise ValueError("count or until is required")
+        if self.by_weekday and (self.frequency != "weekly" or not all(0 <= day <= 6 for day in self.by_weekday)):
+            raise ValueError("by_weekday takes weekdays 0-6 and only applies to weekly series")
+        return self
+
+class OccurrenceResult(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    status: str  # created, conflict, limit_exceeded
+    reservation_id: Optional[str] = None
+
+class ReservationSeriesResponse(BaseModel):
+    series_id: str
+    created: int
+    skipped: int
+    occurrences: List[OccurrenceResult]
 
 class ReservationUpdate(BaseModel):
     status: Optional[str] = None
@@ -20,6 +53,7 @@ class ReservationResponse(ReservationBase):
     user_id: str
     unit_id: str
     tenant_id: str
+    series_id: Optional[str] = None
 
     class Config:
         from_attributes = True
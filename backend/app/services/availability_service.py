@@ -0,0 +1,263 @@
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from redis import Redis
+from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.models.base import CommonArea, Reservation
+from app.services.reservation_service import CONFIRMED, overlaps
+
+logger = logging.getLogger(__name__)
+
+redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+Interval = Tuple[datetime, datetime]
+
+
+def local_timezone() -> ZoneInfo:
+    """Timezone in which common area opening hours are expressed"""
+    return ZoneInfo(settings.RESERVATION_TIMEZONE)
+
+
+def _parse_time(value: Optional[str]) -> Optional[time]:
+    try:
+        return time.fromisoformat(value) if value else None
+    except ValueError:
+        logger.warning(f"Invalid opening hours value: {value!r}")
+        return None
+
+
+def day_window(area: CommonArea, day: date, tz: ZoneInfo) -> Interval:
+    """
+    Opening window of an area on a local day, as aware datetimes.
+    Without opening hours the area is open all day; a closing time at or
+    before the opening time means it closes after midnight.
+    """
+    opening = _parse_time(area.opening_time) or time(0, 0)
+    closing = _parse_time(area.closing_time) or time(0, 0)
+
+    start = datetime.combine(day, opening, tzinfo=tz)
+    end = datetime.combine(day, closing, tzinfo=tz)
+    if end <= start:
+        end = datetime.combine(day + timedelta(days=1), closing, tzinfo=tz)
+    return start, end
+
+
+def free_intervals(window: Interval, busy: List[Interval]) -> List[Interval]:
+    """
+    Interval sweep: the parts of `window` not covered by any busy interval.
+    Busy intervals may overlap each other and extend past the window.
+    """
+    window_start, window_end = window
+    free = []
+    cursor = window_start
+
+    for start, end in sorted(busy):
+        if end <= cursor:
+            continue
+        if start >= window_end:
+            break
+        if start > cursor:
+            free.append((cursor, start))
+        cursor = end
+        if cursor >= window_end:
+            break
+
+    if cursor < window_end:
+        free.append((cursor, window_end))
+    return free
+
+
+def split_slots(free: List[Interval], window_start: datetime, slot: timedelta) -> List[Interval]:
+    """
+    Bookable slots of a fixed length, aligned to the opening time, that fit
+    entirely inside a free interval.
+    """
+    slots = []
+    for start, end in free:
+        steps = -((window_start - start) // slot)  # ceil((start - window_start) / slot)
+        slot_start = window_start + steps * slot
+        while slot_start + slot <= end:
+            slots.append((slot_start, slot_start + slot))
+            slot_start += slot
+    return slots
+
+
+def _normalize(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class AvailabilityService:
+    """
+    Free intervals of a common area per local day.
+
+    The free intervals of each (area, day) are cached under their own Redis
+    key (availability:{area_id}:g{generation}:{day}) with their own TTL, and
+    invalidated when a reservation of the area is created or changes status.
+    Updating the area bumps its generation, which orphans every cached day at
+    once; orphaned keys simply expire. The TTL bounds staleness from a read
+    that raced an invalidation; bookings themselves are always protected by
+    the reservation overlap constraint.
+    """
+
+    @staticmethod
+    def generation_key(area_id: str) -> str:
+        return f"availability:{area_id}:generation"
+
+    @staticmethod
+    def cache_key(area_id: str, generation: int, day: date) -> str:
+        return f"availability:{area_id}:g{generation}:{day.isoformat()}"
+
+    @staticmethod
+    def _get_generation(area_id: str) -> int:
+        return int(redis_client.get(AvailabilityService.generation_key(area_id)) or 0)
+
+    @staticmethod
+    def _get_cached(area_id: str, days: List[date]) -> Tuple[Optional[int], Dict[date, List[Interval]]]:
+        """Generation the days were read under (None if Redis failed) and the cached days"""
+        try:
+            generation = AvailabilityService._get_generation(area_id)
+            values = redis_client.mget([AvailabilityService.cache_key(area_id, generation, day) for day in days])
+        except Exception as e:
+            logger.error(f"Error reading availability cache: {e}")
+            return None, {}
+
+        cached = {}
+        for day, value in zip(days, values):
+            if value:
+                cached[day] = [
+                    (datetime.fromisoformat(start), datetime.fromisoformat(end))
+                    for start, end in json.loads(value)
+                ]
+        return generation, cached
+
+    @staticmethod
+    def _set_cached(area_id: str, generation: Optional[int], computed: Dict[date, List[Interval]]):
+        # Written under the generation read before the query: if the area
+        # changed meanwhile, these keys are already orphaned and just expire
+        if not computed or generation is None:
+            return
+
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for day, free in computed.items():
+                pipe.set(
+                    AvailabilityService.cache_key(area_id, generation, day),
+                    json.dumps([[start.isoformat(), end.isoformat()] for start, end in free]),
+                    ex=settings.AVAILABILITY_CACHE_TTL
+                )
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error writing availability cache: {e}")
+
+    @staticmethod
+    def invalidate(area_id: str, start_time: datetime, end_time: datetime):
+        """Drop the cached days touched by a reservation of the area"""
+        tz = local_timezone()
+        # The day before too: its window may run past midnight
+        day = _normalize(start_time).astimezone(tz).date() - timedelta(days=1)
+        last_day = _normalize(end_time).astimezone(tz).date()
+
+        days = []
+        while day <= last_day:
+            days.append(day)
+            day += timedelta(days=1)
+
+        try:
+            generation = AvailabilityService._get_generation(area_id)
+            redis_client.delete(*[AvailabilityService.cache_key(area_id, generation, day) for day in days])
+        except Exception as e:
+            logger.error(f"Error invalidating availability cache: {e}")
+
+    @staticmethod
+    def invalidate_area(area_id: str):
+        """Drop every cached day of the area (opening hours changed)"""
+        try:
+            redis_client.incr(AvailabilityService.generation_key(area_id))
+        except Exception as e:
+            logger.error(f"Error invalidating availability cache: {e}")
+
+    @staticmethod
+    async def get_free_intervals(
+        db: AsyncSession,
+        area: CommonArea,
+        days: List[date]
+    ) -> Dict[date, List[Interval]]:
+        """
+        Free intervals of the area for each day, from the cache when
+        possible. Missing days are computed from a single query over the
+        confirmed reservations of their combined window; db must be the
+        primary, since the result is cached.
+        """
+        if not area.is_active:
+            return {day: [] for day in days}
+
+        generation, result = AvailabilityService._get_cached(area.id, days)
+        missing = [day for day in days if day not in result]
+        if not missing:
+            return result
+
+        tz = local_timezone()
+        windows = {day: day_window(area, day, tz) for day in missing}
+        range_start = min(start for start, _ in windows.values())
+        range_end = max(end for _, end in windows.values())
+
+        rows = await db.execute(
+            select(Reservation.start_time, Reservation.end_time).where(
+                and_(
+                    Reservation.common_area_id == area.id,
+                    Reservation.tenant_id == area.tenant_id,
+                    Reservation.status == CONFIRMED,
+                    overlaps(range_start, range_end)
+                )
+            )
+        )
+        busy = [(_normalize(start), _normalize(end)) for start, end in rows.all()]
+
+        computed = {
+            day: [
+                (start.astimezone(tz), end.astimezone(tz))
+                for start, end in free_intervals(window, busy)
+            ]
+            for day, window in windows.items()
+        }
+        AvailabilityService._set_cached(area.id, generation, computed)
+
+        result.update(computed)
+        return result
+
+    @staticmethod
+    async def get_availability(
+        db: AsyncSession,
+        area: CommonArea,
+        date_from: date,
+        date_to: date,
+        slot_minutes: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Calendar of free intervals (or fixed-length slots) per day.
+        Time already past is left out.
+        """
+        tz = local_timezone()
+        days = [date_from + timedelta(days=offset) for offset in range((date_to - date_from).days + 1)]
+        free_by_day = await AvailabilityService.get_free_intervals(db, area, days)
+        now = datetime.now(tz)
+
+        calendar = []
+        for day in days:
+            free = [(max(start, now), end) for start, end in free_by_day[day] if end > now]
+            free = [(start, end) for start, end in free if end > start]
+            if slot_minutes:
+                free = split_slots(free, day_window(area, day, tz)[0], timedelta(minutes=slot_minutes))
+
+            calendar.append({
+                "date": day,
+                "free": [{"start": start, "end": end} for start, end in free],
+            })
+        return calendar
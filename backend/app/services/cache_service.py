@@ -1,12 +1,17 @@
 from redis import Redis
 from app.core.config import settings
+from app.utils.embedding import pack_embedding, unpack_embedding
+from app.utils.text import normalize_query
 import hashlib
 import json
 import logging
+from typing import List
 
 logger = logging.getLogger(__name__)
 
 redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+# Cliente sem decode_responses para valores binários (embeddings float16)
+binary_redis_client = Redis.from_url(settings.REDIS_URL)
 
 
 class CacheService:
@@ -15,41 +20,87 @@ class CacheService:
     """
     
     @staticmethod
-    def get_cache_key(question: str, tenant_id: str) -> str:
+    def get_document_set_version(tenant_id: str) -> int:
+        """
+        Versão do conjunto de documentos do tenant
+
+        Faz parte da chave das respostas em cache: ao processar um novo
+        documento (ou invalidar o cache) a versão sobe e as respostas
+        antigas deixam de ser encontradas, expirando pelo TTL.
+        """
+        try:
+            return int(redis_client.get(f"ai_docset_version:{tenant_id}") or 0)
+        except Exception as e:
+            logger.error(f"Error reading document set version: {e}")
+            return 0
+
+    @staticmethod
+    def bump_document_set_version(tenant_id: str) -> int:
+        """Incrementa a versão do conjunto de documentos do tenant"""
+        version = redis_client.incr(f"ai_docset_version:{tenant_id}")
+        logger.info(f"Document set version for tenant {tenant_id} is now {version}")
+        return version
+
+    @staticmethod
+    def get_cache_key(
+        question: str,
+        tenant_id: str,
+        filters: dict | None = None,
+        version: int = 0
+    ) -> str:
         """
         Gera chave única de cache baseada na pergunta e tenant
         
         Args:
             question: Pergunta do usuário
             tenant_id: ID do tenant
+            filters: Filtros de metadados da busca (respostas filtradas
+                não podem ser servidas para a pergunta sem filtros)
+            version: Versão do conjunto de documentos do tenant
             
         Returns:
             Chave MD5 hash para cache
         """
-        # Normalizar pergunta (lowercase e strip)
-        normalized_question = question.lower().strip()
+        # Normalizar pergunta (acentos, pontuação, espaços e casefold)
+        normalized_question = normalize_query(question)
         
         # Criar conteúdo para hash
-        content = f"{tenant_id}:{normalized_question}"
+        content = f"{tenant_id}:v{version}:{normalized_question}"
+        if filters:
+            content += ":" + json.dumps(filters, sort_keys=True, default=str)
         
         # Gerar hash MD5
         hash_key = hashlib.md5(content.encode()).hexdigest()
         
         return f"ai_cache:{hash_key}"
+
+    @staticmethod
+    def get_entries_key(tenant_id: str, version: int) -> str:
+        """SET com as chaves das respostas em cache de uma versão do tenant"""
+        return f"ai_cache_entries:{tenant_id}:v{version}"
     
     @staticmethod
-    def get_cached_response(question: str, tenant_id: str) -> dict | None:
+    def get_cached_response(
+        question: str,
+        tenant_id: str,
+        filters: dict | None = None,
+        version: int | None = None
+    ) -> dict | None:
         """
         Busca resposta em cache
         
         Args:
             question: Pergunta do usuário
             tenant_id: ID do tenant
+            filters: Filtros de metadados da busca
+            version: Versão do conjunto de documentos (padrão: a atual)
             
         Returns:
             dict com resposta e fontes, ou None se não encontrado
         """
-        key = CacheService.get_cache_key(question, tenant_id)
+        if version is None:
+            version = CacheService.get_document_set_version(tenant_id)
+        key = CacheService.get_cache_key(question, tenant_id, filters, version)
         
         try:
             cached = redis_client.get(key)
@@ -70,7 +121,9 @@ class CacheService:
         question: str, 
         tenant_id: str, 
         response: dict, 
-        ttl: int = 3600
+        ttl: int = 3600,
+        filters: dict | None = None,
+        version: int | None = None
     ) -> bool:
         """
         Salva resposta em cache
@@ -80,18 +133,30 @@ class CacheService:
             tenant_id: ID do tenant
             response: dict com answer e sources
             ttl: Tempo de vida em segundos (padrão: 1 hora)
+            filters: Filtros de metadados da busca
+            version: Versão do conjunto de documentos lida antes de gerar
+                a resposta (padrão: a atual)
             
         Returns:
             True se salvo com sucesso, False caso contrário
         """
-        key = CacheService.get_cache_key(question, tenant_id)
+        if version is None:
+            version = CacheService.get_document_set_version(tenant_id)
+        key = CacheService.get_cache_key(question, tenant_id, filters, version)
         
         try:
             # Serializar resposta
             cached_data = json.dumps(response, ensure_ascii=False)
             
-            # Salvar com TTL
-            redis_client.setex(key, ttl, cached_data)
+            # Salvar com TTL; o índice da versão vive tanto quanto a
+            # resposta mais longa (NX define o primeiro prazo, GT só estende)
+            entries_key = CacheService.get_entries_key(tenant_id, version)
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.setex(key, ttl, cached_data)
+            pipe.sadd(entries_key, key)
+            pipe.expire(entries_key, ttl, nx=True)
+            pipe.expire(entries_key, ttl, gt=True)
+            pipe.execute()
             
             logger.info(f"Cached response for question: {question[:50]}... (TTL: {ttl}s)")
             return True
@@ -101,37 +166,115 @@ class CacheService:
             return False
     
     @staticmethod
-    def invalidate_cache(tenant_id: str) -> int:
+    def get_embedding_cache_key(query: str, model: str) -> str:
+        """
+        Gera chave de cache do embedding de uma pergunta
+
+        Embeddings não dependem do tenant nem dos documentos, então a chave
+        considera apenas o modelo e a pergunta normalizada.
+
+        Args:
+            query: Pergunta do usuário
+            model: Nome do modelo de embedding
+
+        Returns:
+            Chave MD5 hash para cache
+        """
+        content = f"{model}:{normalize_query(query)}"
+        hash_key = hashlib.md5(content.encode()).hexdigest()
+
+        return f"ai_embedding:{hash_key}"
+
+    @staticmethod
+    def get_cached_embedding(query: str, model: str) -> List[float] | None:
+        """
+        Busca embedding de pergunta em cache
+
+        Args:
+            query: Pergunta do usuário
+            model: Nome do modelo de embedding
+
+        Returns:
+            Lista de floats, ou None se não encontrado
+        """
+        key = CacheService.get_embedding_cache_key(query, model)
+
+        try:
+            cached = binary_redis_client.get(key)
+
+            if cached:
+                logger.debug(f"Embedding cache hit for query: {query[:50]}...")
+                return unpack_embedding(cached)
+
+            return None
+
+        except Exception as e:
+            logger.error(f"Error reading embedding from cache: {e}")
+            return None
+
+    @staticmethod
+    def cache_embedding(
+        query: str,
+        model: str,
+        embedding: List[float],
+        ttl: int | None = None
+    ) -> bool:
         """
-        Invalida todo o cache de um tenant específico
+        Salva embedding de pergunta em cache (float16, 2 bytes por dimensão)
+
+        Args:
+            query: Pergunta do usuário
+            model: Nome do modelo de embedding
+            embedding: Vetor retornado pelo modelo
+            ttl: Tempo de vida em segundos (padrão: EMBEDDING_CACHE_TTL)
+
+        Returns:
+            True se salvo com sucesso, False caso contrário
+        """
+        key = CacheService.get_embedding_cache_key(query, model)
+
+        try:
+            binary_redis_client.setex(
+                key,
+                ttl or settings.EMBEDDING_CACHE_TTL,
+                pack_embedding(embedding)
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"Error writing embedding to cache: {e}")
+            return False
+
+    @staticmethod
+    def invalidate_cache(tenant_id: str) -> tuple[int, int]:
+        """
+        Invalida todo o cache de respostas de um tenant específico
         Útil quando novos documentos são adicionados
         
+        A nova versão do conjunto de documentos torna as respostas
+        anteriores inacessíveis; as da versão que estava em uso são apagadas
+        pelo índice da versão (as de versões mais antigas expiram pelo TTL).
+        
         Args:
             tenant_id: ID do tenant
             
         Returns:
-            Número de chaves removidas
+            Nova versão do conjunto de documentos e número de respostas apagadas
         """
         try:
-            # Buscar todas as chaves de cache
-            pattern = "ai_cache:*"
-            keys = redis_client.keys(pattern)
-            
-            # Nota: Esta é uma implementação simplificada
-            # Em produção, seria melhor armazenar tenant_id na chave
-            # ou manter um índice separado de chaves por tenant
-            
-            deleted = 0
-            for key in keys:
-                redis_client.delete(key)
-                deleted += 1
-            
-            logger.info(f"Invalidated {deleted} cache entries")
-            return deleted
+            version = CacheService.bump_document_set_version(tenant_id)
+            entries_key = CacheService.get_entries_key(tenant_id, version - 1)
+
+            keys = list(redis_client.smembers(entries_key))
+            deleted = redis_client.delete(*keys) if keys else 0
+            redis_client.delete(entries_key)
+
+            logger.info(f"Invalidated {deleted} cache entries for tenant {tenant_id}")
+            return version, deleted
         
         except Exception as e:
             logger.error(f"Error invalidating cache: {e}")
-            return 0
+            return 0, 0
     
     @staticmethod
     def get_cache_stats() -> dict:
@@ -144,9 +287,11 @@ class CacheService:
         try:
             pattern = "ai_cache:*"
             keys = redis_client.keys(pattern)
+            embedding_keys = redis_client.keys("ai_embedding:*")
             
             return {
                 "total_cached_responses": len(keys),
+                "total_cached_embeddings": len(embedding_keys),
                 "cache_pattern": pattern
             }
         
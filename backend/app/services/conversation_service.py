@@ -0,0 +1,158 @@
+from redis import Redis
+from app.core.config import settings
+import json
+import logging
+import uuid
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+# Estimativa de tokens sem tokenizer (português fica perto de 4 caracteres/token)
+CHARS_PER_TOKEN = 4
+
+
+class ConversationService:
+    """
+    Sessões de conversa do chat armazenadas no Redis
+
+    Cada sessão guarda um histórico compacto (últimas CONVERSATION_MAX_TURNS
+    trocas, respostas truncadas) e os ids dos chunks já recuperados, que o
+    RAG reaproveita nas perguntas de acompanhamento.
+    """
+
+    @staticmethod
+    def get_session_key(session_id: str, tenant_id: str) -> str:
+        return f"ai_conversation:{tenant_id}:{session_id}"
+
+    @staticmethod
+    def filters_key(filters: dict | None) -> str:
+        """Representação estável dos filtros (chunks só são reusados com os mesmos filtros)"""
+        return json.dumps(filters or {}, sort_keys=True, default=str)
+
+    @staticmethod
+    def create_session(tenant_id: str, user_id: str) -> dict:
+        """Nova sessão vazia (só é gravada no Redis ao salvar a primeira troca)"""
+        return {
+            "id": str(uuid.uuid4()),
+            "tenant_id": tenant_id,
+            "user_id": user_id,
+            "turns": [],
+            "chunk_ids": [],
+            "filters_key": ConversationService.filters_key(None)
+        }
+
+    @staticmethod
+    def get_session(session_id: str, tenant_id: str, user_id: str) -> dict | None:
+        """
+        Busca uma sessão do usuário
+
+        Returns:
+            dict da sessão, ou None se não existir, tiver expirado ou
+            pertencer a outro usuário
+        """
+        key = ConversationService.get_session_key(session_id, tenant_id)
+
+        try:
+            cached = redis_client.get(key)
+        except Exception as e:
+            logger.error(f"Error reading conversation session: {e}")
+            return None
+
+        if not cached:
+            return None
+
+        session = json.loads(cached)
+        if session.get("user_id") != user_id:
+            return None
+
+        return session
+
+    @staticmethod
+    def add_turn(
+        session: dict,
+        question: str,
+        answer: str,
+        chunk_ids: List[str],
+        filters: dict | None = None
+    ) -> dict:
+        """
+        Registra uma troca na sessão (em memória)
+
+        Mantém apenas as últimas CONVERSATION_MAX_TURNS trocas e os
+        CONVERSATION_MAX_CHUNK_IDS chunks mais recentes, com os chunks da
+        última resposta na frente.
+        """
+        session["turns"].append({
+            "question": question,
+            "answer": (answer or "")[:settings.CONVERSATION_ANSWER_MAX_CHARS]
+        })
+        session["turns"] = session["turns"][-settings.CONVERSATION_MAX_TURNS:]
+
+        filters_key = ConversationService.filters_key(filters)
+        previous_ids = session["chunk_ids"] if session.get("filters_key") == filters_key else []
+        merged = list(dict.fromkeys([*chunk_ids, *previous_ids]))
+        session["chunk_ids"] = merged[:settings.CONVERSATION_MAX_CHUNK_IDS]
+        session["filters_key"] = filters_key
+
+        return session
+
+    @staticmethod
+    def save_session(session: dict) -> bool:
+        """Grava a sessão renovando o TTL"""
+        key = ConversationService.get_session_key(session["id"], session["tenant_id"])
+
+        try:
+            redis_client.setex(
+                key,
+                settings.CONVERSATION_TTL,
+                json.dumps(session, ensure_ascii=False)
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"Error saving conversation session: {e}")
+            return False
+
+    @staticmethod
+    def format_history(session: dict | None, max_tokens: int | None = None) -> str:
+        """
+        Histórico para o prompt, das trocas mais recentes para as mais
+        antigas até o limite de tokens (CONVERSATION_HISTORY_MAX_TOKENS)
+        """
+        if not session or not session["turns"]:
+            return ""
+
+        budget = (max_tokens or settings.CONVERSATION_HISTORY_MAX_TOKENS) * CHARS_PER_TOKEN
+        lines = []
+
+        for turn in reversed(session["turns"]):
+            entry = f"Morador: {turn['question']}\nAssistente: {turn['answer']}"
+            if len(entry) > budget:
+                break
+            lines.append(entry)
+            budget -= len(entry)
+
+        return "\n\n".join(reversed(lines))
+
+    @staticmethod
+    def retrieval_query(session: dict | None, question: str) -> str:
+        """
+        Texto usado no embedding da busca
+
+        Perguntas de acompanhamento ("e aos domingos?") isoladas recuperam
+        mal; juntá-las à pergunta anterior mantém o assunto.
+        """
+        if not session or not session["turns"]:
+            return question
+
+        return f"{session['turns'][-1]['question']} {question}"
+
+    @staticmethod
+    def reusable_chunk_ids(session: dict | None, filters: dict | None = None) -> List[str]:
+        """Chunks recuperados antes na sessão, se os filtros não mudaram"""
+        if not session or session.get("filters_key") != ConversationService.filters_key(filters):
+            return []
+
+        return session["chunk_ids"]
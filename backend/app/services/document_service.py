@@ -1,23 +1,29 @@
 import pdfplumber
-import google.generativeai as genai
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.document import Document, DocumentChunk
 from app.core.config import settings
+from app.models.document import Document, DocumentChunk
+from app.services.cache_service import CacheService
+from app.services.embedding_versions import EMBEDDING_VERSIONS, EmbeddingVersion, get_embedding_version, get_write_versions
+from app.services.llm_provider import get_provider
+from app.services.llm_resilience import DOCUMENT_EMBEDDING, call_llm
+from app.services.llm_scheduler import BACKGROUND
+from app.services.usage_service import UsageService
 import logging
 from typing import List, Dict
 
 logger = logging.getLogger(__name__)
 
-# Configurar Gemini
-genai.configure(api_key=settings.GOOGLE_API_KEY)
-
 
 class DocumentProcessor:
-    def __init__(self):
+    def __init__(self, provider=None):
+        self.provider = provider or get_provider()
+        # Chunks pequenos para precisão na busca; o contexto ao redor vem da
+        # expansão por vizinhos (RAG_NEIGHBOR_WINDOW) na hora da resposta
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
+            chunk_size=settings.RAG_CHUNK_SIZE,
+            chunk_overlap=settings.RAG_CHUNK_OVERLAP,
             length_function=len,
             separators=["\n\n", "\n", ". ", " ", ""]
         )
@@ -57,20 +63,82 @@ class DocumentProcessor:
         logger.info(f"Created {len(chunks)} chunks")
         return chunks
 
-    async def generate_embedding(self, text: str) -> List[float]:
-        """Gera embedding usando Gemini"""
+    async def generate_embedding(
+        self,
+        text: str,
+        tenant_id: str = "",
+        version: EmbeddingVersion | None = None
+    ) -> List[float]:
+        """Gera embedding usando o provedor configurado (Gemini por padrão)"""
+        embeddings = await self.generate_embeddings([text], tenant_id, version)
+        return embeddings[0]
+
+    async def generate_embeddings(
+        self,
+        texts: List[str],
+        tenant_id: str = "",
+        version: EmbeddingVersion | None = None
+    ) -> List[List[float]]:
+        """Embeddings de vários chunks com o modelo de uma versão de embedding"""
+        version = version or get_embedding_version()
+
         try:
-            result = genai.embed_content(
-                model="models/text-embedding-004",
-                content=text,
-                task_type="retrieval_document"
+            # Ingestão é background: cede a vez para o chat interativo
+            embeddings = await call_llm(
+                DOCUMENT_EMBEDDING,
+                lambda: self.provider.embed(
+                    texts,
+                    task_type="retrieval_document",
+                    model=version.model,
+                    dimensions=version.dimensions
+                ),
+                tenant_id,
+                BACKGROUND
             )
-            return result['embedding']
+            UsageService.record_embedding(tenant_id, texts)
+            return embeddings
 
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
             raise
 
+    async def build_summary_embeddings(self, db: AsyncSession, document: Document):
+        """
+        Calcula os embeddings de resumo usados pela busca hierárquica
+
+        O resumo do documento e de cada página é o centróide (avg) dos
+        embeddings dos seus chunks, calculado no próprio Postgres, sem
+        chamadas extras ao LLM. Calculado para todas as versões de
+        embedding (versões sem vetores nos chunks ficam NULL).
+        """
+        chunk_columns = [version.chunk_column for version in EMBEDDING_VERSIONS.values()]
+        page_columns = ", ".join(version.page_column for version in EMBEDDING_VERSIONS.values())
+        page_averages = ", ".join(f"avg({column})" for column in chunk_columns)
+        document_averages = ", ".join(
+            f"{version.document_column} = (SELECT avg({version.chunk_column}) FROM document_chunks WHERE document_id = :document_id)"
+            for version in EMBEDDING_VERSIONS.values()
+        )
+
+        await db.execute(
+            text("DELETE FROM document_pages WHERE document_id = :document_id"),
+            {"document_id": document.id}
+        )
+        await db.execute(
+            text(f"""
+                INSERT INTO document_pages (id, document_id, tenant_id, page_number, {page_columns})
+                SELECT gen_random_uuid()::text, document_id, tenant_id, page_number, {page_averages}
+                FROM document_chunks
+                WHERE document_id = :document_id
+                  AND page_number IS NOT NULL
+                GROUP BY document_id, tenant_id, page_number
+            """),
+            {"document_id": document.id}
+        )
+        await db.execute(
+            text(f"UPDATE documents SET {document_averages} WHERE id = :document_id"),
+            {"document_id": document.id}
+        )
+
     async def process_document(
         self,
         db: AsyncSession,
@@ -95,23 +163,41 @@ class DocumentProcessor:
             document.status = "embedding"
             await db.commit()
 
-            for chunk_data in chunks:
-                embedding = await self.generate_embedding(chunk_data["text"])
-
+            # Durante uma migração de modelo, grava todas as versões (dual-write).
+            # Uma chamada por versão com todos os chunks (o provedor divide em
+            # lotes de EMBEDDING_BATCH_SIZE)
+            write_versions = get_write_versions()
+            texts = [chunk_data["text"] for chunk_data in chunks]
+            embeddings_by_version = [
+                (version, await self.generate_embeddings(texts, document.tenant_id, version))
+                for version in write_versions
+            ] if texts else []
+
+            for idx, chunk_data in enumerate(chunks):
                 chunk = DocumentChunk(
                     chunk_text=chunk_data["text"],
                     chunk_index=chunk_data["chunk_index"],
                     page_number=chunk_data["page_number"],
-                    embedding=embedding,
                     document_id=document.id,
-                    tenant_id=document.tenant_id
+                    tenant_id=document.tenant_id,
+                    document_type=document.document_type,
+                    document_date=document.upload_date
                 )
+                for version, embeddings in embeddings_by_version:
+                    setattr(chunk, version.chunk_column, embeddings[idx])
                 db.add(chunk)
 
-            # 4. Finalizar
+            # 4. Resumos por documento e página (busca hierárquica)
+            await db.flush()
+            await self.build_summary_embeddings(db, document)
+
+            # 5. Finalizar
             document.status = "completed"
             await db.commit()
 
+            # 6. Nova versão dos documentos: respostas em cache ficam obsoletas
+            CacheService.bump_document_set_version(document.tenant_id)
+
             logger.info(f"Document {document.id} processed successfully")
 
         except Exception as e:
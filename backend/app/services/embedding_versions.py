@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class EmbeddingVersion:
+    """
+    Uma versão dos embeddings do corpus: o modelo e as colunas onde os
+    vetores dessa versão ficam (chunks, resumo do documento e páginas)
+    """
+    name: str
+    model: str | None  # None = modelo padrão do provedor
+    dimensions: int
+    chunk_column: str
+    document_column: str
+    page_column: str
+
+
+# Todas as versões usam colunas Vector(768); modelos com mais dimensões
+# são chamados com output_dimensionality
+EMBEDDING_VERSIONS = {
+    "v1": EmbeddingVersion(
+        name="v1",
+        model=None,
+        dimensions=768,
+        chunk_column="embedding",
+        document_column="summary_embedding",
+        page_column="embedding",
+    ),
+    "v2": EmbeddingVersion(
+        name="v2",
+        model=settings.EMBEDDING_V2_MODEL,
+        dimensions=768,
+        chunk_column="embedding_v2",
+        document_column="summary_embedding_v2",
+        page_column="embedding_v2",
+    ),
+}
+
+
+def get_embedding_version(name: str | None = None) -> EmbeddingVersion:
+    """Versão pelo nome (padrão: EMBEDDING_DEFAULT_READ_VERSION)"""
+    name = name or settings.EMBEDDING_DEFAULT_READ_VERSION
+    if name not in EMBEDDING_VERSIONS:
+        raise ValueError(f"Unknown embedding version: {name}")
+    return EMBEDDING_VERSIONS[name]
+
+
+def get_write_versions() -> List[EmbeddingVersion]:
+    """Versões gravadas na ingestão (mais de uma durante uma migração)"""
+    return [get_embedding_version(name) for name in settings.EMBEDDING_WRITE_VERSIONS]
+
+
+async def get_tenant_read_version(db: AsyncSession, tenant_id: str) -> EmbeddingVersion:
+    """Versão lida pela busca do tenant (cutover por tenant)"""
+    result = await db.execute(
+        text("SELECT embedding_version FROM tenants WHERE id = :tenant_id"),
+        {"tenant_id": tenant_id}
+    )
+    return get_embedding_version(result.scalar_one_or_none())
@@ -0,0 +1,117 @@
+from redis import Redis
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.services.cache_service import CacheService
+from app.services.llm_scheduler import BACKGROUND
+from app.services.rag_service import RAGService
+from app.services.suggest_service import SuggestService
+from app.utils.text import normalize_query
+import json
+import logging
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+rag_service = RAGService()
+
+
+class FAQService:
+    """
+    Perguntas frequentes do tenant com respostas pré-calculadas
+
+    A lista (formato de tests/rag_evaluation/test_dataset.json) fica no
+    Redis. Quando um documento termina de ser processado, as respostas das
+    perguntas da lista e das mais feitas pelos moradores são geradas em
+    background e gravadas no cache com a nova versão dos documentos, então
+    os primeiros moradores já recebem a resposta do cache.
+    """
+
+    @staticmethod
+    def get_faq_key(tenant_id: str) -> str:
+        return f"ai_faq:{tenant_id}"
+
+    @staticmethod
+    def get_faq(tenant_id: str) -> List[dict]:
+        cached = redis_client.get(FAQService.get_faq_key(tenant_id))
+        return json.loads(cached) if cached else []
+
+    @staticmethod
+    def set_faq(tenant_id: str, items: List[dict]):
+        redis_client.set(
+            FAQService.get_faq_key(tenant_id),
+            json.dumps(items, ensure_ascii=False)
+        )
+
+    @staticmethod
+    def get_questions(tenant_id: str) -> List[str]:
+        """
+        Perguntas a pré-calcular: a lista do tenant seguida das mais
+        frequentes, sem repetições (comparando a forma normalizada)
+        """
+        questions = [item["question"] for item in FAQService.get_faq(tenant_id)]
+        questions += SuggestService.top_questions(tenant_id, settings.FAQ_TOP_QUESTIONS)
+
+        unique = {}
+        for question in questions:
+            unique.setdefault(normalize_query(question), question)
+
+        return list(unique.values())[:settings.FAQ_MAX_QUESTIONS]
+
+    @staticmethod
+    async def precompute_answers(tenant_id: str) -> dict:
+        """
+        Gera e grava no cache as respostas das perguntas frequentes
+
+        Roda em background com uma sessão própria e prioridade BACKGROUND no
+        llm_scheduler. Perguntas já em cache na versão atual são puladas.
+
+        Returns:
+            dict com o número de respostas geradas, já em cache e com erro
+        """
+        stats = {"generated": 0, "already_cached": 0, "failed": 0}
+
+        try:
+            version = CacheService.get_document_set_version(tenant_id)
+            questions = []
+            for question in FAQService.get_questions(tenant_id):
+                if CacheService.get_cached_response(question, tenant_id, version=version):
+                    stats["already_cached"] += 1
+                else:
+                    questions.append(question)
+
+            if not questions:
+                return stats
+
+            async with AsyncSessionLocal() as db:
+                results = await rag_service.chat_batch(
+                    db=db,
+                    questions=questions,
+                    tenant_id=tenant_id,
+                    max_concurrency=settings.FAQ_PRECOMPUTE_CONCURRENCY,
+                    priority=BACKGROUND
+                )
+
+            for result in results:
+                if result.get("error") or result.get("degraded") or not result.get("sources"):
+                    stats["failed"] += 1
+                    continue
+
+                CacheService.cache_response(
+                    result["question"],
+                    tenant_id,
+                    {"answer": result["answer"], "sources": result["sources"]},
+                    ttl=settings.FAQ_CACHE_TTL,
+                    version=version
+                )
+                # Sugerida no autocompletar sem contar como pergunta feita
+                SuggestService.record_question(result["question"], tenant_id, increment=0)
+                stats["generated"] += 1
+
+            logger.info(f"Precomputed FAQ answers for tenant {tenant_id}: {stats}")
+
+        except Exception as e:
+            logger.error(f"Error precomputing FAQ answers for tenant {tenant_id}: {e}")
+
+        return stats
@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import List
+
+from app.services.llm_provider import EMBEDDING_MODEL, CHAT_MODEL, GenerationResult
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMissError(LookupError):
+    """Chamada não encontrada no cassete em modo replay"""
+
+
+class CassetteProvider:
+    """
+    Grava e reproduz chamadas de um provedor de LLM em um cassete JSON
+
+    Modos:
+        record: sempre chama o provedor real e grava a resposta
+        replay: responde apenas a partir do cassete (sem rede)
+        auto:   reproduz se gravado, senão chama o provedor e grava
+
+    Embeddings são gravados por texto, então a composição dos lotes não
+    precisa ser igual entre gravação e reprodução. Em replay a latência
+    pode ser simulada com um valor fixo ou com a latência gravada.
+    """
+
+    MODES = ("record", "replay", "auto")
+
+    def __init__(
+        self,
+        inner,
+        path: str,
+        mode: str = "replay",
+        replay_latency_ms: float = 0,
+        use_recorded_latency: bool = False
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if mode != "replay" and inner is None:
+            raise ValueError(f"Cassette mode '{mode}' requires a real provider")
+
+        self.inner = inner
+        self.path = Path(path)
+        self.mode = mode
+        self.replay_latency_ms = replay_latency_ms
+        self.use_recorded_latency = use_recorded_latency
+        self.name = f"{inner.name if inner else 'cassette'}:{mode}"
+        self.chat_model = inner.chat_model if inner else CHAT_MODEL
+        self.embedding_model = inner.embedding_model if inner else EMBEDDING_MODEL
+        self.interactions = self._load()
+
+    def _load(self) -> dict:
+        if not self.path.exists():
+            if self.mode == "replay":
+                raise FileNotFoundError(f"Cassette not found: {self.path}")
+            return {}
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {self.path}")
+
+        logger.info(f"Loaded {len(data['interactions'])} interactions from {self.path}")
+        return data["interactions"]
+
+    def _save(self):
+        """Grava o cassete de forma atômica (arquivo temporário + rename)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": CASSETTE_VERSION, "interactions": self.interactions},
+                f,
+                ensure_ascii=False
+            )
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _key(request: dict) -> str:
+        content = json.dumps(request, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    async def _simulate_latency(self, recorded_ms: float):
+        latency_ms = recorded_ms if self.use_recorded_latency else self.replay_latency_ms
+        if latency_ms > 0:
+            await asyncio.sleep(latency_ms / 1000)
+
+    def _replay(self, key: str, request: dict) -> dict | None:
+        interaction = self.interactions.get(key)
+        if interaction is None and self.mode == "replay":
+            raise CassetteMissError(
+                f"No recorded {request['method']} call in {self.path} for this request"
+            )
+        return interaction
+
+    async def embed(
+        self,
+        texts: List[str],
+        task_type: str,
+        model: str | None = None,
+        dimensions: int | None = None
+    ) -> List[List[float]]:
+        requests = [
+            {"method": "embed", "model": model or self.embedding_model, "task_type": task_type, "content": text}
+            for text in texts
+        ]
+        if model and dimensions:
+            for request in requests:
+                request["dimensions"] = dimensions
+        keys = [self._key(request) for request in requests]
+
+        if self.mode == "record":
+            replayed = [None] * len(texts)
+        else:
+            replayed = [self._replay(key, request) for key, request in zip(keys, requests)]
+
+        missing = [idx for idx, interaction in enumerate(replayed) if interaction is None]
+        if not missing:
+            await self._simulate_latency(max(i["latency_ms"] for i in replayed) if replayed else 0)
+            return [interaction["response"]["embedding"] for interaction in replayed]
+
+        start = time.perf_counter()
+        generated = await self.inner.embed(
+            [texts[idx] for idx in missing],
+            task_type=task_type,
+            model=model,
+            dimensions=dimensions
+        )
+        latency_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        for idx, embedding in zip(missing, generated):
+            replayed[idx] = self.interactions[keys[idx]] = {
+                "request": requests[idx],
+                "response": {"embedding": embedding},
+                "latency_ms": latency_ms
+            }
+        self._save()
+
+        return [interaction["response"]["embedding"] for interaction in replayed]
+
+    async def generate(self, prompt: str) -> GenerationResult:
+        request = {"method": "generate", "model": self.chat_model, "prompt": prompt}
+        key = self._key(request)
+
+        interaction = None if self.mode == "record" else self._replay(key, request)
+        if interaction is not None:
+            await self._simulate_latency(interaction["latency_ms"])
+            return GenerationResult(**interaction["response"])
+
+        start = time.perf_counter()
+        result = await self.inner.generate(prompt)
+        latency_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        self.interactions[key] = {
+            "request": request,
+            "response": {
+                "text": result.text,
+                "prompt_tokens": result.prompt_tokens,
+                "output_tokens": result.output_tokens
+            },
+            "latency_ms": latency_ms
+        }
+        self._save()
+
+        return result
@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import math
+import random
+from dataclasses import dataclass
+from typing import List
+
+import google.generativeai as genai
+
+from app.core.config import settings
+from app.utils.text import normalize_query
+
+genai.configure(api_key=settings.GOOGLE_API_KEY)
+
+CHAT_MODEL = "gemini-2.5-flash"
+EMBEDDING_MODEL = "models/text-embedding-004"
+EMBEDDING_DIMENSIONS = 768
+
+# Limite de textos por chamada batchEmbedContents da API do Gemini
+EMBEDDING_BATCH_SIZE = 100
+
+
+@dataclass
+class GenerationResult:
+    text: str
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+
+class GeminiProvider:
+    """Chamadas reais à API do Gemini (embeddings e geração)"""
+
+    name = "gemini"
+
+    def __init__(self, chat_model: str = CHAT_MODEL, embedding_model: str = EMBEDDING_MODEL):
+        self.chat_model = chat_model
+        self.embedding_model = embedding_model
+        self.model = genai.GenerativeModel(chat_model)
+
+    async def embed(
+        self,
+        texts: List[str],
+        task_type: str,
+        model: str | None = None,
+        dimensions: int | None = None
+    ) -> List[List[float]]:
+        """
+        Gera embeddings em lotes de até EMBEDDING_BATCH_SIZE textos
+
+        model e dimensions selecionam outra versão de embedding (ver
+        embedding_versions); por padrão usa o modelo do provedor.
+        """
+        embeddings = []
+
+        for offset in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            result = await genai.embed_content_async(
+                model=model or self.embedding_model,
+                content=texts[offset:offset + EMBEDDING_BATCH_SIZE],
+                task_type=task_type,
+                output_dimensionality=dimensions if model else None
+            )
+            embeddings.extend(result['embedding'])
+
+        return embeddings
+
+    async def generate(self, prompt: str) -> GenerationResult:
+        response = await self.model.generate_content_async(prompt)
+        usage = getattr(response, "usage_metadata", None)
+
+        return GenerationResult(
+            text=response.text,
+            prompt_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+            output_tokens=getattr(usage, "candidates_token_count", 0) or 0
+        )
+
+
+class FakeProvider:
+    """
+    Provedor local e determinístico, para benchmarks e testes offline
+
+    Embeddings são vetores de hashing (palavras e trigramas de caracteres
+    da pergunta normalizada), então textos parecidos ficam próximos. A
+    geração devolve o início do contexto recebido. A latência de cada
+    chamada é simulada com asyncio.sleep.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        dimensions: int = EMBEDDING_DIMENSIONS,
+        embedding_latency_ms: float = 0,
+        generation_latency_ms: float = 0,
+        jitter_ms: float = 0,
+        seed: int = 42
+    ):
+        self.dimensions = dimensions
+        self.embedding_latency_ms = embedding_latency_ms
+        self.generation_latency_ms = generation_latency_ms
+        self.jitter_ms = jitter_ms
+        self.chat_model = "fake-chat"
+        self.embedding_model = f"fake-hashing-{dimensions}"
+        self._random = random.Random(seed)
+
+    async def _sleep(self, latency_ms: float):
+        if self.jitter_ms:
+            latency_ms += self._random.uniform(0, self.jitter_ms)
+        if latency_ms > 0:
+            await asyncio.sleep(latency_ms / 1000)
+
+    def embed_text(self, text: str, model: str | None = None) -> List[float]:
+        # Outro modelo gera outro espaço vetorial (hash com sal)
+        salt = f"{model}:" if model and model != self.embedding_model else ""
+        vector = [0.0] * self.dimensions
+
+        for word in normalize_query(text).split():
+            features = [word] + [word[i:i + 3] for i in range(max(len(word) - 2, 0))]
+            for feature in features:
+                digest = hashlib.blake2b(f"{salt}{feature}".encode(), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                sign = 1.0 if value >> 63 else -1.0
+                vector[value % self.dimensions] += sign
+
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    async def embed(
+        self,
+        texts: List[str],
+        task_type: str,
+        model: str | None = None,
+        dimensions: int | None = None
+    ) -> List[List[float]]:
+        await self._sleep(self.embedding_latency_ms)
+        return [self.embed_text(text, model) for text in texts]
+
+    async def generate(self, prompt: str) -> GenerationResult:
+        await self._sleep(self.generation_latency_ms)
+
+        context = prompt.split("CONTEXTO DOS DOCUMENTOS:", 1)[-1]
+        context = context.split("PERGUNTA DO USUÁRIO:", 1)[0].strip()
+        text = f"[resposta simulada] {context[:300]}"
+
+        return GenerationResult(
+            text=text,
+            prompt_tokens=len(prompt) // 4,
+            output_tokens=len(text) // 4
+        )
+
+
+def get_provider(name: str | None = None):
+    """
+    Retorna o provedor configurado em LLM_PROVIDER (gemini ou fake)
+
+    Com LLM_CASSETTE_MODE definido, o provedor é envolvido por um
+    CassetteProvider que grava/reproduz as chamadas em LLM_CASSETTE_PATH.
+    """
+    name = name or settings.LLM_PROVIDER
+
+    if name == "gemini":
+        provider = GeminiProvider()
+    elif name == "fake":
+        provider = FakeProvider(
+            embedding_latency_ms=settings.FAKE_LLM_EMBEDDING_LATENCY_MS,
+            generation_latency_ms=settings.FAKE_LLM_GENERATION_LATENCY_MS,
+            jitter_ms=settings.FAKE_LLM_JITTER_MS
+        )
+    else:
+        raise ValueError(f"Unknown LLM provider: {name}")
+
+    if settings.LLM_CASSETTE_MODE:
+        from app.services.llm_cassette import CassetteProvider
+
+        provider = CassetteProvider(
+            provider,
+            settings.LLM_CASSETTE_PATH,
+            mode=settings.LLM_CASSETTE_MODE,
+            replay_latency_ms=settings.LLM_REPLAY_LATENCY_MS,
+            use_recorded_latency=settings.LLM_REPLAY_USE_RECORDED_LATENCY
+        )
+
+    return provider
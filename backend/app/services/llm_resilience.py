@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, TypeVar
+
+from prometheus_client import Counter, Gauge
+
+from app.core.config import settings
+from app.services.llm_scheduler import INTERACTIVE, llm_scheduler
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Tipos de chamada (cada um com seu prazo)
+QUERY_EMBEDDING = "query_embedding"
+DOCUMENT_EMBEDDING = "document_embedding"
+GENERATION = "generation"
+
+LLM_CALL_FAILURES = Counter(
+    "sindicoai_llm_call_failures_total",
+    "Falhas em chamadas ao LLM",
+    ["call_type", "reason"],
+)
+LLM_CIRCUIT_OPEN = Gauge(
+    "sindicoai_llm_circuit_open",
+    "1 se o circuit breaker está aberto (provedor considerado indisponível)",
+    ["breaker"],
+)
+
+
+class LLMUnavailableError(Exception):
+    """O provedor de LLM não respondeu a tempo ou está indisponível"""
+
+
+class LLMTimeoutError(LLMUnavailableError):
+    pass
+
+
+class LLMQueueTimeoutError(LLMTimeoutError):
+    """O prazo acabou antes de a chamada conseguir vaga no llm_scheduler"""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por contagem de falhas consecutivas
+
+    closed -> open após failure_threshold falhas seguidas; open rejeita
+    chamadas por reset_timeout segundos; depois half_open libera uma
+    chamada de teste, que fecha o circuito se tiver sucesso.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info(f"Circuit {self.name} closed")
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+        LLM_CIRCUIT_OPEN.labels(breaker=self.name).set(0)
+
+    def record_failure(self):
+        self.failures += 1
+        self.probe_in_flight = False
+
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(f"Circuit {self.name} opened after {self.failures} failures")
+            self.opened_at = self.clock()
+            LLM_CIRCUIT_OPEN.labels(breaker=self.name).set(1)
+
+
+async def hedged(fn: Callable[[], Awaitable[T]], delay: float) -> T:
+    """
+    Executa fn e, se não terminar em delay segundos, dispara uma segunda
+    tentativa em paralelo; retorna a primeira que tiver sucesso. Se a
+    primeira falhar antes do delay, tenta de novo imediatamente.
+    """
+    tasks = [asyncio.ensure_future(fn())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done and tasks[0].exception() is None:
+            return tasks[0].result()
+
+        tasks.append(asyncio.ensure_future(fn()))
+        pending = {task for task in tasks if not task.done()}
+        error = tasks[0].exception() if tasks[0].done() else None
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+_breakers = {
+    "embedding": CircuitBreaker(
+        "embedding", settings.LLM_CIRCUIT_FAILURE_THRESHOLD, settings.LLM_CIRCUIT_RESET_SECONDS
+    ),
+    "generation": CircuitBreaker(
+        "generation", settings.LLM_CIRCUIT_FAILURE_THRESHOLD, settings.LLM_CIRCUIT_RESET_SECONDS
+    ),
+}
+
+_deadlines = {
+    QUERY_EMBEDDING: settings.LLM_TIMEOUT_QUERY_EMBEDDING_SECONDS,
+    DOCUMENT_EMBEDDING: settings.LLM_TIMEOUT_DOCUMENT_EMBEDDING_SECONDS,
+    GENERATION: settings.LLM_TIMEOUT_GENERATION_SECONDS,
+}
+
+
+def get_breaker(call_type: str) -> CircuitBreaker:
+    return _breakers["generation" if call_type == GENERATION else "embedding"]
+
+
+async def call_llm(
+    call_type: str,
+    fn: Callable[[], Awaitable[T]],
+    tenant_id: str = "",
+    priority: str = INTERACTIVE
+) -> T:
+    """
+    Executa uma chamada ao provedor com admissão, prazo e circuit breaker
+
+    Cada tentativa aguarda uma vaga no llm_scheduler e tem o prazo do seu
+    tipo de chamada, contado desde a entrada na fila. Embeddings de
+    perguntas podem usar hedging (LLM_HEDGE_QUERY_EMBEDDING_MS > 0). Com o
+    circuito aberto a chamada falha imediatamente com CircuitOpenError.
+
+    Estourar o prazo ainda na fila (LLMQueueTimeoutError) não conta como
+    falha do provedor no circuit breaker.
+    """
+    breaker = get_breaker(call_type)
+    if not breaker.allow():
+        LLM_CALL_FAILURES.labels(call_type=call_type, reason="circuit_open").inc()
+        raise CircuitOpenError(f"LLM {breaker.name} circuit is open")
+
+    timeout = _deadlines[call_type]
+
+    async def attempt() -> T:
+        started = False
+
+        async def acquire_and_call() -> T:
+            nonlocal started
+            async with llm_scheduler.slot(tenant_id, priority):
+                started = True
+                return await fn()
+
+        try:
+            return await asyncio.wait_for(acquire_and_call(), timeout=timeout)
+        except asyncio.TimeoutError:
+            if not started:
+                raise LLMQueueTimeoutError(f"LLM {call_type} call waited more than {timeout}s for a slot")
+            raise LLMTimeoutError(f"LLM {call_type} call exceeded {timeout}s")
+
+    try:
+        if call_type == QUERY_EMBEDDING and settings.LLM_HEDGE_QUERY_EMBEDDING_MS > 0:
+            result = await hedged(attempt, settings.LLM_HEDGE_QUERY_EMBEDDING_MS / 1000)
+        else:
+            result = await attempt()
+    except asyncio.CancelledError:
+        if breaker.probe_in_flight:
+            breaker.probe_in_flight = False
+        raise
+    except LLMQueueTimeoutError:
+        LLM_CALL_FAILURES.labels(call_type=call_type, reason="queue_timeout").inc()
+        breaker.probe_in_flight = False
+        raise
+    except Exception as e:
+        reason = "timeout" if isinstance(e, LLMTimeoutError) else "error"
+        LLM_CALL_FAILURES.labels(call_type=call_type, reason=reason).inc()
+        breaker.record_failure()
+        raise
+
+    breaker.record_success()
+    return result
@@ -0,0 +1,165 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict
+
+from prometheus_client import Gauge, Histogram
+
+from app.core.config import settings
+from app.core.metrics import LATENCY_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+# Classes de prioridade: chat interativo passa na frente da ingestão
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+_PRIORITY_RANK = {INTERACTIVE: 0, BACKGROUND: 1}
+
+LLM_QUEUE_DEPTH = Gauge(
+    "sindicoai_llm_queue_depth",
+    "Chamadas ao LLM aguardando na fila",
+    ["priority"],
+)
+LLM_QUEUE_WAIT_SECONDS = Histogram(
+    "sindicoai_llm_queue_wait_seconds",
+    "Tempo de espera na fila antes de chamar o LLM",
+    ["tenant", "priority"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_INFLIGHT = Gauge(
+    "sindicoai_llm_inflight",
+    "Chamadas ao LLM em andamento",
+)
+
+
+class _Waiter:
+    __slots__ = ("rank", "finish", "seq", "start", "tenant_id", "priority", "future", "cancelled")
+
+    def __init__(self, rank, finish, seq, start, tenant_id, priority, future):
+        self.rank = rank
+        self.finish = finish
+        self.seq = seq
+        self.start = start
+        self.tenant_id = tenant_id
+        self.priority = priority
+        self.future = future
+        self.cancelled = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.rank, self.finish, self.seq) < (other.rank, other.finish, other.seq)
+
+
+class LLMScheduler:
+    """
+    Controle de admissão das chamadas ao LLM/embeddings
+
+    - Limite global de chamadas simultâneas (max_concurrency)
+    - Prioridade estrita: INTERACTIVE antes de BACKGROUND
+    - Dentro de cada prioridade, weighted fair queuing entre tenants
+      (start-time fair queuing): cada chamada recebe uma tag virtual
+      finish = max(V, última tag do tenant) + custo / peso, e a fila é
+      atendida pela menor tag. Um tenant com centenas de chamadas na fila
+      não atrasa as poucas chamadas de outro tenant.
+
+    O estado é por processo: cada worker do uvicorn tem seu próprio limite.
+    """
+
+    def __init__(self, max_concurrency: int, tenant_weights: Dict[str, float] | None = None):
+        self.max_concurrency = max_concurrency
+        self.tenant_weights = tenant_weights or {}
+        self._active = 0
+        self._queue: list[_Waiter] = []
+        self._virtual_time = 0.0
+        self._last_finish: Dict[tuple, float] = {}
+        self._seq = itertools.count()
+
+    def _weight(self, tenant_id: str) -> float:
+        return max(self.tenant_weights.get(tenant_id, 1.0), 0.001)
+
+    @asynccontextmanager
+    async def slot(self, tenant_id: str, priority: str = INTERACTIVE, cost: float = 1.0):
+        """Aguarda a vez do tenant e mantém uma vaga durante o bloco"""
+        await self.acquire(tenant_id, priority, cost)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, tenant_id: str, priority: str = INTERACTIVE, cost: float = 1.0):
+        tenant_id = tenant_id or "unknown"
+        enqueued_at = time.perf_counter()
+
+        key = (priority, tenant_id)
+        start = max(self._virtual_time, self._last_finish.get(key, 0.0))
+        finish = start + cost / self._weight(tenant_id)
+        self._last_finish[key] = finish
+
+        if self._active < self.max_concurrency and not self._queue:
+            self._grant(start)
+            LLM_QUEUE_WAIT_SECONDS.labels(tenant=tenant_id, priority=priority).observe(0)
+            return
+
+        waiter = _Waiter(
+            _PRIORITY_RANK[priority], finish, next(self._seq), start,
+            tenant_id, priority, asyncio.get_running_loop().create_future()
+        )
+        heapq.heappush(self._queue, waiter)
+        LLM_QUEUE_DEPTH.labels(priority=priority).inc()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # A vaga foi concedida no mesmo instante do cancelamento
+                self.release()
+            else:
+                waiter.cancelled = True
+                LLM_QUEUE_DEPTH.labels(priority=priority).dec()
+            raise
+
+        LLM_QUEUE_WAIT_SECONDS.labels(tenant=tenant_id, priority=priority).observe(
+            time.perf_counter() - enqueued_at
+        )
+
+    def release(self):
+        self._active -= 1
+        LLM_INFLIGHT.dec()
+        self._dispatch()
+
+    def _grant(self, start: float):
+        self._virtual_time = max(self._virtual_time, start)
+        self._active += 1
+        LLM_INFLIGHT.inc()
+
+    def _dispatch(self):
+        while self._active < self.max_concurrency and self._queue:
+            waiter = heapq.heappop(self._queue)
+            if waiter.cancelled or waiter.future.done():
+                continue
+
+            LLM_QUEUE_DEPTH.labels(priority=waiter.priority).dec()
+            self._grant(waiter.start)
+            waiter.future.set_result(None)
+
+        if not self._queue and self._active == 0:
+            # Ocioso: zera o relógio virtual para as tags não crescerem sem limite
+            self._virtual_time = 0.0
+            self._last_finish.clear()
+
+    def stats(self) -> dict:
+        queued = [w for w in self._queue if not w.cancelled and not w.future.done()]
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._active,
+            "queued": len(queued),
+            "queued_by_priority": {
+                priority: sum(1 for w in queued if w.priority == priority)
+                for priority in _PRIORITY_RANK
+            },
+        }
+
+
+llm_scheduler = LLMScheduler(settings.LLM_MAX_CONCURRENCY, settings.LLM_TENANT_WEIGHTS)
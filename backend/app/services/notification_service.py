@@ -0,0 +1,404 @@
+from datetime import datetime, timezone
+from redis import Redis
+from sqlalchemy import String, and_, cast, func, literal, or_, union_all, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+import logging
+from typing import List, NamedTuple, Optional
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.base import Broadcast, BroadcastRead, Notification, User, generate_uuid
+
+logger = logging.getLogger(__name__)
+
+redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+# INCRBY/DECRBY only counters that exist (a missing one is recomputed from
+# the database on the next read) and never below zero
+_ADJUST_IF_EXISTS = redis_client.register_script("""
+    if redis.call('EXISTS', KEYS[1]) == 1 then
+        local value = redis.call('INCRBY', KEYS[1], ARGV[1])
+        if value < 0 then redis.call('SET', KEYS[1], 0, 'KEEPTTL') end
+    end
+""")
+
+
+class UnreadCounter:
+    """
+    Unread notifications per user, cached in Redis for the app badge
+
+    Key: notif_unread:{tenant}:{version}:{user}. Personal sends increment
+    the counters of the recipients, reads decrement them, and a new
+    broadcast bumps the tenant version (like the document set version of
+    the RAG cache), so every counter of the tenant is recomputed from the
+    database on its next read. Counters expire after UNREAD_COUNT_TTL, which
+    reconciles any drift from races between a recount and an increment.
+    """
+
+    @staticmethod
+    def get_version(tenant_id: str) -> int:
+        return int(redis_client.get(f"notif_unread_version:{tenant_id}") or 0)
+
+    @staticmethod
+    def bump_version(tenant_id: str):
+        try:
+            redis_client.incr(f"notif_unread_version:{tenant_id}")
+        except Exception as e:
+            logger.error(f"Error bumping unread counter version: {e}")
+
+    @staticmethod
+    def key(tenant_id: str, user_id: str, version: int | None = None) -> str:
+        if version is None:
+            version = UnreadCounter.get_version(tenant_id)
+        return f"notif_unread:{tenant_id}:{version}:{user_id}"
+
+    @staticmethod
+    async def get(db: AsyncSession, user: User) -> int:
+        """Cached count, recomputed on a miss (db must be the primary, not a replica)"""
+        try:
+            key = UnreadCounter.key(user.tenant_id, user.id)
+            cached = redis_client.get(key)
+            if cached is not None:
+                return int(cached)
+        except Exception as e:
+            logger.error(f"Error reading unread counter: {e}")
+            key = None
+
+        count = (await db.execute(unread_count_query(user))).scalar()
+
+        if key:
+            UnreadCounter.set(user.tenant_id, user.id, count, key)
+        return count
+
+    @staticmethod
+    def set(tenant_id: str, user_id: str, count: int, key: str | None = None):
+        try:
+            redis_client.set(key or UnreadCounter.key(tenant_id, user_id), count, ex=settings.UNREAD_COUNT_TTL)
+        except Exception as e:
+            logger.error(f"Error writing unread counter: {e}")
+
+    @staticmethod
+    def increment(tenant_id: str, user_ids: List[str], amount: int = 1):
+        if not user_ids:
+            return
+        try:
+            version = UnreadCounter.get_version(tenant_id)
+            pipe = redis_client.pipeline(transaction=False)
+            for user_id in user_ids:
+                _ADJUST_IF_EXISTS(keys=[UnreadCounter.key(tenant_id, user_id, version)], args=[amount], client=pipe)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error updating unread counters: {e}")
+
+    @staticmethod
+    def decrement(tenant_id: str, user_id: str):
+        UnreadCounter.increment(tenant_id, [user_id], -1)
+
+    @staticmethod
+    def invalidate(tenant_id: str, user_id: str):
+        try:
+            redis_client.delete(UnreadCounter.key(tenant_id, user_id))
+        except Exception as e:
+            logger.error(f"Error invalidating unread counter: {e}")
+
+
+class SendResult(NamedTuple):
+    broadcast_id: str
+    recipients: int
+    queued: bool
+
+
+def target_users_query(
+    tenant_id: str,
+    user_ids: Optional[List[str]] = None,
+    unit_ids: Optional[List[str]] = None,
+    roles: Optional[List[str]] = None,
+    exclude_roles: Optional[List[str]] = None
+):
+    """
+    Distinct ids of the tenant's users matching any of the criteria:
+    explicit ids, residents of the units, or users with one of the roles
+    (minus users with one of `exclude_roles`).
+    """
+    criteria = []
+    if user_ids:
+        criteria.append(User.id.in_(user_ids))
+    if unit_ids:
+        criteria.append(User.unit_id.in_(unit_ids))
+    if roles:
+        criteria.append(User.role.in_(roles))
+
+    if not criteria:
+        return None
+
+    query = select(User.id).where(User.tenant_id == tenant_id, or_(*criteria))
+    if exclude_roles:
+        query = query.where(User.role.not_in(exclude_roles))
+    return query.distinct()
+
+
+async def insert_notifications(
+    db: AsyncSession,
+    broadcast_id: str,
+    tenant_id: str,
+    title: str,
+    message: str,
+    targets
+) -> List[str]:
+    """
+    Create one notification per target user with a single
+    INSERT ... SELECT ... RETURNING; returns the notified user ids.
+    """
+    targets = targets.subquery()
+    statement = insert(Notification).from_select(
+        ["id", "title", "message", "user_id", "tenant_id", "broadcast_id"],
+        select(
+            cast(func.gen_random_uuid(), String),
+            literal(title),
+            literal(message),
+            targets.c.id,
+            literal(tenant_id),
+            literal(broadcast_id)
+        )
+    ).returning(Notification.user_id)
+
+    result = await db.execute(statement)
+    return list(result.scalars().all())
+
+
+async def deliver_broadcast(
+    broadcast_id: str,
+    tenant_id: str,
+    title: str,
+    message: str,
+    user_ids: Optional[List[str]] = None,
+    unit_ids: Optional[List[str]] = None,
+    roles: Optional[List[str]] = None,
+    exclude_roles: Optional[List[str]] = None
+) -> int:
+    """Background delivery of a large broadcast, with its own session"""
+    try:
+        async with AsyncSessionLocal() as db:
+            targets = target_users_query(tenant_id, user_ids, unit_ids, roles, exclude_roles)
+            notified = await insert_notifications(db, broadcast_id, tenant_id, title, message, targets)
+            await db.commit()
+        UnreadCounter.increment(tenant_id, notified)
+
+        logger.info(f"Broadcast {broadcast_id} delivered to {len(notified)} users")
+        return len(notified)
+
+    except Exception as e:
+        logger.error(f"Error delivering broadcast {broadcast_id}: {e}")
+        return 0
+
+
+async def send_notifications(
+    db: AsyncSession,
+    tenant_id: str,
+    title: str,
+    message: str,
+    user_ids: Optional[List[str]] = None,
+    unit_ids: Optional[List[str]] = None,
+    roles: Optional[List[str]] = None,
+    exclude_roles: Optional[List[str]] = None,
+    background_tasks=None
+) -> SendResult:
+    """
+    Fan a notification out to the matching users of the tenant.
+
+    Target users are resolved in SQL. Broadcasts with at least
+    NOTIFICATION_BACKGROUND_THRESHOLD recipients are delivered by a
+    background task when `background_tasks` is given; smaller ones are
+    inserted and committed before returning.
+    """
+    broadcast_id = generate_uuid()
+    targets = target_users_query(tenant_id, user_ids, unit_ids, roles, exclude_roles)
+    if targets is None:
+        return SendResult(broadcast_id, 0, False)
+
+    if background_tasks is not None:
+        count = await db.execute(select(func.count()).select_from(targets.subquery()))
+        recipients = count.scalar()
+
+        if recipients >= settings.NOTIFICATION_BACKGROUND_THRESHOLD:
+            background_tasks.add_task(
+                deliver_broadcast, broadcast_id, tenant_id, title, message, user_ids, unit_ids, roles, exclude_roles
+            )
+            return SendResult(broadcast_id, recipients, True)
+
+    notified = await insert_notifications(db, broadcast_id, tenant_id, title, message, targets)
+    await db.commit()
+    UnreadCounter.increment(tenant_id, notified)
+    return SendResult(broadcast_id, len(notified), False)
+
+
+async def create_broadcast(
+    db: AsyncSession,
+    tenant_id: str,
+    title: str,
+    message: str,
+    audience_role: Optional[str],
+    created_by: Optional[str] = None
+) -> SendResult:
+    """
+    Store a tenant-wide notice once. Each user's read state lives in
+    broadcast_reads, created only when the user reads or deletes it.
+    """
+    broadcast = Broadcast(
+        title=title,
+        message=message,
+        audience_role=audience_role,
+        created_by=created_by,
+        tenant_id=tenant_id
+    )
+    db.add(broadcast)
+
+    audience = select(func.count()).select_from(User).where(User.tenant_id == tenant_id)
+    if audience_role:
+        audience = audience.where(User.role == audience_role)
+    recipients = (await db.execute(audience)).scalar()
+
+    await db.commit()
+    # Every counter of the tenant now misses and is recomputed on demand
+    UnreadCounter.bump_version(tenant_id)
+    return SendResult(broadcast.id, recipients, False)
+
+
+def visible_broadcasts(user: User):
+    """Broadcasts of the user's tenant addressed to them, sent after they joined"""
+    conditions = [
+        Broadcast.tenant_id == user.tenant_id,
+        or_(Broadcast.audience_role.is_(None), Broadcast.audience_role == user.role),
+    ]
+    if user.created_at is not None:
+        conditions.append(Broadcast.created_at >= user.created_at)
+    return and_(*conditions)
+
+
+def inbox_query(user: User, page, unread: Optional[bool] = None):
+    """
+    The user's personal notifications merged with the broadcasts they can
+    see, newest first. Each branch is paginated on its own index before the
+    UNION ALL, so a page reads at most 2 * (limit + 1) rows.
+    """
+    personal = select(
+        Notification.id,
+        Notification.title,
+        Notification.message,
+        Notification.is_read,
+        Notification.created_at,
+        Notification.user_id,
+        Notification.tenant_id,
+        Notification.broadcast_id
+    ).where(Notification.user_id == user.id)
+
+    is_read = BroadcastRead.read_at.is_not(None)
+    broadcasts = select(
+        Broadcast.id,
+        Broadcast.title,
+        Broadcast.message,
+        is_read.label("is_read"),
+        Broadcast.created_at,
+        literal(user.id).label("user_id"),
+        Broadcast.tenant_id,
+        Broadcast.id.label("broadcast_id")
+    ).outerjoin(
+        BroadcastRead,
+        and_(BroadcastRead.broadcast_id == Broadcast.id, BroadcastRead.user_id == user.id)
+    ).where(visible_broadcasts(user), BroadcastRead.deleted_at.is_(None))
+
+    if unread is not None:
+        personal = personal.where(Notification.is_read == (not unread))
+        broadcasts = broadcasts.where(BroadcastRead.read_at.is_(None) if unread else is_read)
+
+    merged = union_all(
+        page.apply(personal, Notification.created_at, Notification.id),
+        page.apply(broadcasts, Broadcast.created_at, Broadcast.id)
+    ).subquery("inbox")
+
+    return page.apply(select(merged), merged.c.created_at, merged.c.id)
+
+
+async def get_visible_broadcast(db: AsyncSession, user: User, broadcast_id: str):
+    result = await db.execute(
+        select(Broadcast).where(Broadcast.id == broadcast_id, visible_broadcasts(user))
+    )
+    return result.scalars().first()
+
+
+async def set_broadcast_state(db: AsyncSession, broadcast: Broadcast, user_id: str, **state) -> dict:
+    """Upsert the user's read_at/deleted_at for a broadcast; returns the inbox item"""
+    now = datetime.now(timezone.utc)
+    values = {field: now for field in state if state[field]}
+    statement = insert(BroadcastRead).values(broadcast_id=broadcast.id, user_id=user_id, **values)
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["broadcast_id", "user_id"],
+            set_={field: func.coalesce(getattr(BroadcastRead, field), statement.excluded[field]) for field in values}
+        )
+    )
+    await db.commit()
+    UnreadCounter.invalidate(broadcast.tenant_id, user_id)
+
+    return {
+        "id": broadcast.id,
+        "title": broadcast.title,
+        "message": broadcast.message,
+        "is_read": True,
+        "created_at": broadcast.created_at,
+        "user_id": user_id,
+        "tenant_id": broadcast.tenant_id,
+        "broadcast_id": broadcast.id,
+    }
+
+
+def unread_count_query(user: User):
+    """Unread personal notifications plus unread, not deleted broadcasts"""
+    personal = select(func.count()).select_from(Notification).where(
+        Notification.user_id == user.id,
+        Notification.is_read == False
+    )
+    broadcasts = select(func.count()).select_from(Broadcast).outerjoin(
+        BroadcastRead,
+        and_(BroadcastRead.broadcast_id == Broadcast.id, BroadcastRead.user_id == user.id)
+    ).where(visible_broadcasts(user), BroadcastRead.read_at.is_(None), BroadcastRead.deleted_at.is_(None))
+
+    return select(personal.scalar_subquery() + broadcasts.scalar_subquery())
+
+
+def mark_all_read_query(user: User):
+    """
+    One statement marking everything read: an UPDATE of the personal
+    notifications and an upsert of read_at for the unread broadcasts, as
+    data-modifying CTEs; returns how many items were marked.
+    """
+    personal = update(Notification).where(
+        Notification.user_id == user.id,
+        Notification.is_read == False
+    ).values(is_read=True).returning(Notification.id).cte("read_personal")
+
+    unread_broadcasts = select(Broadcast.id, literal(user.id), func.now()).outerjoin(
+        BroadcastRead,
+        and_(BroadcastRead.broadcast_id == Broadcast.id, BroadcastRead.user_id == user.id)
+    ).where(visible_broadcasts(user), BroadcastRead.read_at.is_(None), BroadcastRead.deleted_at.is_(None))
+
+    statement = insert(BroadcastRead).from_select(["broadcast_id", "user_id", "read_at"], unread_broadcasts)
+    broadcasts = statement.on_conflict_do_update(
+        index_elements=["broadcast_id", "user_id"],
+        set_={"read_at": statement.excluded.read_at}
+    ).returning(BroadcastRead.broadcast_id).cte("read_broadcasts")
+
+    return select(
+        select(func.count()).select_from(personal).scalar_subquery()
+        + select(func.count()).select_from(broadcasts).scalar_subquery()
+    )
+
+
+async def mark_all_read(db: AsyncSession, user: User) -> int:
+    result = await db.execute(mark_all_read_query(user))
+    updated = result.scalar()
+    await db.commit()
+    UnreadCounter.set(user.tenant_id, user.id, 0)
+    return updated
@@ -1,51 +1,467 @@
-import google.generativeai as genai
+import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from app.models.document import DocumentChunk
 from app.core.config import settings
+from app.core.metrics import track_stage
+from app.services.cache_service import CacheService
+from app.services.conversation_service import ConversationService
+from app.services.embedding_versions import EmbeddingVersion, get_embedding_version, get_tenant_read_version
+from app.services.llm_provider import get_provider
+from app.services.llm_resilience import GENERATION, QUERY_EMBEDDING, LLMUnavailableError, call_llm
+from app.services.llm_scheduler import INTERACTIVE
+from app.services.usage_service import UsageService
 import logging
+from collections import defaultdict, namedtuple
 from typing import List
 
 logger = logging.getLogger(__name__)
 
-genai.configure(api_key=settings.GOOGLE_API_KEY)
+NO_DOCUMENTS_ANSWER = "Não encontrei documentos relevantes para responder sua pergunta. Por favor, verifique se os documentos do condomínio foram carregados."
+
+DEGRADED_ANSWER_HEADER = "O assistente está temporariamente indisponível. Estes são os trechos dos documentos mais relevantes para sua pergunta:"
+
+# Trechos exibidos na resposta degradada
+DEGRADED_MAX_CHUNKS = 3
+DEGRADED_EXCERPT_CHARS = 400
+
+
+def build_filter_sql(
+    filters: dict | None,
+    document_column: str | None = None,
+    type_column: str | None = None,
+    date_column: str | None = None,
+    page_column: str | None = None
+) -> tuple[str, dict]:
+    """
+    Monta as condições SQL dos filtros de metadados do chat
+
+    Args:
+        filters: document_ids, document_type, uploaded_after,
+            uploaded_before, page_from e page_to (todos opcionais)
+        *_column: Coluna da tabela consultada para cada filtro
+            (filtros sem coluna são ignorados)
+
+    Returns:
+        Fragmento " AND ..." e os parâmetros da query
+    """
+    filters = filters or {}
+    clauses = []
+    params = {}
+
+    if document_column and filters.get("document_ids"):
+        clauses.append(f"{document_column} = ANY(:filter_document_ids)")
+        params["filter_document_ids"] = list(filters["document_ids"])
+    if type_column and filters.get("document_type"):
+        clauses.append(f"{type_column} = :filter_document_type")
+        params["filter_document_type"] = filters["document_type"]
+    if date_column and filters.get("uploaded_after"):
+        clauses.append(f"{date_column} >= :filter_uploaded_after")
+        params["filter_uploaded_after"] = filters["uploaded_after"]
+    if date_column and filters.get("uploaded_before"):
+        clauses.append(f"{date_column} <= :filter_uploaded_before")
+        params["filter_uploaded_before"] = filters["uploaded_before"]
+    if page_column and filters.get("page_from") is not None:
+        clauses.append(f"{page_column} >= :filter_page_from")
+        params["filter_page_from"] = filters["page_from"]
+    if page_column and filters.get("page_to") is not None:
+        clauses.append(f"{page_column} <= :filter_page_to")
+        params["filter_page_to"] = filters["page_to"]
+
+    return "".join(f" AND {clause}" for clause in clauses), params
+
+
+def tenant_chunks_source(column: str, filter_sql: str = "", exact: bool = False) -> tuple[str, str]:
+    """
+    Origem dos chunks de uma busca vetorial: a tabela (pelo índice HNSW)
+    ou, na busca exata, uma CTE materializada com os chunks do tenant que
+    passam nos filtros, que o planner ordena sem o índice
+
+    Returns:
+        Prefixo WITH da query (vazio sem busca exata) e a tabela do FROM
+    """
+    if not exact:
+        return "", "document_chunks"
+
+    cte_sql = f"""WITH tenant_chunks AS MATERIALIZED (
+                SELECT dc.id, dc.chunk_text, dc.page_number, dc.document_id, dc.tenant_id,
+                       dc.document_type, dc.document_date, dc.{column}
+                FROM document_chunks dc
+                WHERE dc.tenant_id = :tenant_id
+                  AND dc.{column} IS NOT NULL{filter_sql}
+            )
+            """
+    return cte_sql, "tenant_chunks"
+
+
+# Trecho enviado ao LLM: um chunk encontrado na busca com os vizinhos
+Passage = namedtuple("Passage", ["id", "chunk_text", "page_number", "filename", "similarity"])
+
+
+def to_passage(hit) -> Passage:
+    return Passage(hit.id, hit.chunk_text, hit.page_number, hit.filename, hit.similarity)
+
+
+def trim_overlap(previous: str, text: str, max_overlap: int | None = None) -> str:
+    """
+    Remove do começo de text o trecho que repete o fim de previous
+
+    O splitter da ingestão repete até RAG_CHUNK_OVERLAP caracteres do fim
+    de um chunk no começo do seguinte, sempre em fronteira de palavra; o
+    maior trecho assim é removido. Sem overlap, text volta inteiro.
+    """
+    if max_overlap is None:
+        max_overlap = settings.RAG_CHUNK_OVERLAP
+
+    for size in range(min(max_overlap, len(previous), len(text)), 0, -1):
+        if not previous.endswith(text[:size]):
+            continue
+        starts_at_boundary = size == len(previous) or not previous[-size - 1].isalnum()
+        ends_at_boundary = size == len(text) or not text[size].isalnum()
+        if starts_at_boundary and ends_at_boundary:
+            return text[size:]
+    return text
+
+
+def join_chunk_texts(texts: List[str]) -> str:
+    """Junta chunks consecutivos de um documento sem repetir o overlap"""
+    joined = texts[0]
+    for previous, text in zip(texts, texts[1:]):
+        remainder = trim_overlap(previous, text)
+        # Com overlap o restante já começa no separador original
+        joined += remainder if remainder != text else f"\n{text}"
+    return joined
+
+
+def merge_neighbor_chunks(hits: List[tuple], neighbors: List[tuple]) -> List[Passage]:
+    """
+    Junta cada chunk encontrado aos seus vizinhos em trechos contínuos
+
+    Args:
+        hits: Resultado da busca (id, chunk_text, page_number, filename, similarity)
+        neighbors: Chunks da janela de cada hit
+            (hit_id, id, document_id, chunk_index, chunk_text, page_number)
+
+    Returns:
+        Trechos ordenados por similaridade. Hits vizinhos (janelas que se
+        tocam) viram um único trecho com a similaridade e a página do
+        melhor deles, sem repetir texto no prompt (nem o overlap entre
+        chunks consecutivos, ver trim_overlap).
+    """
+    hits_by_id = {hit.id: hit for hit in hits}
+    chunks_by_document = defaultdict(dict)
+    hit_positions = defaultdict(list)
+
+    for row in neighbors:
+        if row.hit_id not in hits_by_id:
+            continue
+        chunks_by_document[row.document_id][row.chunk_index] = row
+        if row.id == row.hit_id:
+            hit_positions[(row.document_id, row.chunk_index)].append(hits_by_id[row.hit_id])
+
+    passages = []
+    expanded = set()
+
+    for document_id, chunks in chunks_by_document.items():
+        runs = []
+        for chunk_index in sorted(chunks):
+            if runs and chunk_index == runs[-1][-1] + 1:
+                runs[-1].append(chunk_index)
+            else:
+                runs.append([chunk_index])
+
+        for run in runs:
+            run_hits = [hit for idx in run for hit in hit_positions.get((document_id, idx), [])]
+            if not run_hits:
+                continue
+
+            best = max(run_hits, key=lambda hit: hit.similarity)
+            expanded.update(hit.id for hit in run_hits)
+            passages.append(Passage(
+                id=best.id,
+                chunk_text=join_chunk_texts([chunks[idx].chunk_text for idx in run]),
+                page_number=best.page_number,
+                filename=best.filename,
+                similarity=best.similarity
+            ))
+
+    # Hits sem vizinhos retornados seguem como estão
+    passages += [to_passage(hit) for hit in hits if hit.id not in expanded]
+
+    return sorted(passages, key=lambda passage: passage.similarity, reverse=True)
 
 
 class RAGService:
-    def __init__(self):
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
-
-    async def generate_query_embedding(self, query: str) -> List[float]:
-        """Gera embedding para a pergunta do usuário"""
-        result = genai.embed_content(
-            model="models/text-embedding-004",
-            content=query,
-            task_type="retrieval_query"
+    def __init__(self, provider=None, embedding_cache: bool = True):
+        self.provider = provider or get_provider()
+        self.embedding_cache = embedding_cache
+
+    async def generate_query_embedding(
+        self,
+        query: str,
+        tenant_id: str = "",
+        priority: str = INTERACTIVE,
+        version: EmbeddingVersion | None = None
+    ) -> List[float]:
+        """Gera embedding para a pergunta do usuário (com cache no Redis)"""
+        embeddings = await self.generate_query_embeddings([query], tenant_id, priority, version)
+        return embeddings[0]
+
+    async def generate_query_embeddings(
+        self,
+        queries: List[str],
+        tenant_id: str = "",
+        priority: str = INTERACTIVE,
+        version: EmbeddingVersion | None = None
+    ) -> List[List[float]]:
+        """
+        Gera embeddings para várias perguntas
+
+        Perguntas já em cache não são reenviadas; as demais são embedadas
+        em uma única chamada batch ao provedor, na vez do tenant na fila
+        do llm_scheduler (com prazo, circuit breaker e hedging opcional).
+        O modelo é o da versão de embedding lida pelo tenant.
+        """
+        version = version or get_embedding_version()
+        model = version.model or self.provider.embedding_model
+
+        if self.embedding_cache:
+            embeddings = [CacheService.get_cached_embedding(query, model) for query in queries]
+        else:
+            embeddings = [None] * len(queries)
+
+        missing = [idx for idx, embedding in enumerate(embeddings) if not embedding]
+        if not missing:
+            return embeddings
+
+        generated = await call_llm(
+            QUERY_EMBEDDING,
+            lambda: self.provider.embed(
+                [queries[idx] for idx in missing],
+                task_type="retrieval_query",
+                model=version.model,
+                dimensions=version.dimensions
+            ),
+            tenant_id,
+            priority
         )
-        return result['embedding']
+
+        UsageService.record_embedding(tenant_id, [queries[idx] for idx in missing])
+
+        for idx, embedding in zip(missing, generated):
+            embeddings[idx] = embedding
+            if self.embedding_cache:
+                CacheService.cache_embedding(queries[idx], model, embedding)
+
+        return embeddings
 
     async def search_similar_chunks(
         self,
         db: AsyncSession,
         query_embedding: List[float],
         tenant_id: str,
-        max_results: int = 5
+        max_results: int = 5,
+        filters: dict | None = None,
+        version: EmbeddingVersion | None = None
     ) -> List[tuple]:
-        """Busca chunks similares usando pgvector"""
+        """
+        Busca chunks similares usando pgvector
+
+        Com RAG_HIERARCHICAL_RETRIEVAL a busca é feita em estágios
+        (documentos -> páginas -> chunks); se nenhum documento do tenant tiver
+        embeddings de resumo, volta para a busca em todos os chunks.
+
+        Filtros de metadados (ver build_filter_sql) são aplicados dentro da
+        própria busca vetorial.
+        """
+        await self.widen_index_scan(db)
+
+        if settings.RAG_HIERARCHICAL_RETRIEVAL:
+            chunks = await self.search_chunks_hierarchical(
+                db, query_embedding, tenant_id, max_results, filters, version
+            )
+            if chunks:
+                return chunks
+
+        return await self.search_all_chunks(db, query_embedding, tenant_id, max_results, filters, version)
+
+    async def widen_index_scan(self, db: AsyncSession):
+        """
+        Amplia a busca no índice HNSW para consultas por tenant
+
+        O índice é único para todos os tenants e devolve hnsw.ef_search
+        candidatos antes do WHERE: para um tenant pequeno (ou com filtros
+        seletivos) sobrariam menos de max_results. Vale só para a transação.
+        """
+        await db.execute(
+            text("SELECT set_config('hnsw.ef_search', :ef_search, true)"),
+            {"ef_search": str(settings.RAG_FILTERED_EF_SEARCH)}
+        )
+        if settings.RAG_HNSW_ITERATIVE_SCAN:
+            await db.execute(
+                text("SELECT set_config('hnsw.iterative_scan', :mode, true)"),
+                {"mode": settings.RAG_HNSW_ITERATIVE_SCAN}
+            )
+
+    async def search_all_chunks(
+        self,
+        db: AsyncSession,
+        query_embedding: List[float],
+        tenant_id: str,
+        max_results: int = 5,
+        filters: dict | None = None,
+        version: EmbeddingVersion | None = None,
+        exact: bool = False
+    ) -> List[tuple]:
+        """
+        Busca em todos os chunks do tenant
+
+        Se o índice HNSW (compartilhado entre os tenants) devolver menos de
+        max_results chunks, refaz a busca de forma exata sobre os chunks do
+        tenant. Isso só acontece quando o tenant (ou o recorte dos filtros)
+        é pequeno, então a busca exata é barata.
+        """
+        column = (version or get_embedding_version()).chunk_column
+        filter_sql, filter_params = build_filter_sql(
+            filters, "dc.document_id", "dc.document_type", "dc.document_date", "dc.page_number"
+        )
+        cte_sql, source = tenant_chunks_source(column, filter_sql, exact)
 
         # Query SQL com cosine similarity
-        query = text("""
+        query = text(f"""
+            {cte_sql}SELECT
+                dc.id,
+                dc.chunk_text,
+                dc.page_number,
+                d.filename,
+                1 - (dc.{column} <=> CAST(:query_embedding AS vector)) as similarity
+            FROM {source} dc
+            JOIN documents d ON dc.document_id = d.id
+            WHERE dc.tenant_id = :tenant_id
+              AND dc.{column} IS NOT NULL{filter_sql}
+            ORDER BY dc.{column} <=> CAST(:query_embedding AS vector)
+            LIMIT :max_results
+        """)
+
+        result = await db.execute(
+            query,
+            {
+                "query_embedding": str(query_embedding),
+                "tenant_id": tenant_id,
+                "max_results": max_results,
+                **filter_params
+            }
+        )
+        chunks = result.fetchall()
+
+        if not exact and len(chunks) < max_results:
+            return await self.search_all_chunks(
+                db, query_embedding, tenant_id, max_results, filters, version, exact=True
+            )
+        return chunks
+
+    async def search_chunks_hierarchical(
+        self,
+        db: AsyncSession,
+        query_embedding: List[float],
+        tenant_id: str,
+        max_results: int = 5,
+        filters: dict | None = None,
+        version: EmbeddingVersion | None = None
+    ) -> List[tuple]:
+        """
+        Busca em dois estágios sobre os embeddings de resumo
+
+        1. Os RAG_TOP_DOCUMENTS documentos mais próximos da pergunta
+        2. As RAG_TOP_PAGES páginas mais próximas dentro desses documentos
+        3. Os chunks mais próximos apenas dessas páginas
+
+        Os chunks das páginas escolhidas são ordenados de forma exata (CTE
+        materializada): pelo índice HNSW, que é de todos os tenants, os
+        candidatos seriam filtrados só depois e poderiam faltar.
+        """
+        version = version or get_embedding_version()
+        document_filter_sql, filter_params = build_filter_sql(
+            filters, "d.id", "d.document_type", "d.upload_date"
+        )
+        page_filter_sql, page_params = build_filter_sql(filters, page_column="dp.page_number")
+        filter_params.update(page_params)
+
+        query = text(f"""
+            WITH top_documents AS (
+                SELECT d.id
+                FROM documents d
+                WHERE d.tenant_id = :tenant_id
+                  AND d.{version.document_column} IS NOT NULL{document_filter_sql}
+                ORDER BY d.{version.document_column} <=> CAST(:query_embedding AS vector)
+                LIMIT :top_documents
+            ),
+            top_pages AS (
+                SELECT dp.document_id, dp.page_number
+                FROM document_pages dp
+                WHERE dp.document_id IN (SELECT id FROM top_documents){page_filter_sql}
+                ORDER BY dp.{version.page_column} <=> CAST(:query_embedding AS vector)
+                LIMIT :top_pages
+            ),
+            page_chunks AS MATERIALIZED (
+                SELECT dc.id, dc.chunk_text, dc.page_number, dc.document_id, dc.{version.chunk_column}
+                FROM document_chunks dc
+                JOIN top_pages tp
+                  ON tp.document_id = dc.document_id
+                 AND tp.page_number = dc.page_number
+                WHERE dc.{version.chunk_column} IS NOT NULL
+            )
+            SELECT
+                pc.id,
+                pc.chunk_text,
+                pc.page_number,
+                d.filename,
+                1 - (pc.{version.chunk_column} <=> CAST(:query_embedding AS vector)) as similarity
+            FROM page_chunks pc
+            JOIN documents d ON pc.document_id = d.id
+            ORDER BY pc.{version.chunk_column} <=> CAST(:query_embedding AS vector)
+            LIMIT :max_results
+        """)
+
+        result = await db.execute(
+            query,
+            {
+                "query_embedding": str(query_embedding),
+                "tenant_id": tenant_id,
+                "top_documents": settings.RAG_TOP_DOCUMENTS,
+                "top_pages": settings.RAG_TOP_PAGES,
+                "max_results": max_results,
+                **filter_params
+            }
+        )
+
+        return result.fetchall()
+
+    async def get_chunks_by_ids(
+        self,
+        db: AsyncSession,
+        chunk_ids: List[str],
+        query_embedding: List[float],
+        tenant_id: str,
+        version: EmbeddingVersion | None = None
+    ) -> List[tuple]:
+        """Chunks já recuperados na conversa, reordenados pela nova pergunta"""
+        if not chunk_ids:
+            return []
+
+        column = (version or get_embedding_version()).chunk_column
+        query = text(f"""
             SELECT
                 dc.id,
                 dc.chunk_text,
                 dc.page_number,
                 d.filename,
-                1 - (dc.embedding <=> CAST(:query_embedding AS vector)) as similarity
+                1 - (dc.{column} <=> CAST(:query_embedding AS vector)) as similarity
             FROM document_chunks dc
             JOIN documents d ON dc.document_id = d.id
             WHERE dc.tenant_id = :tenant_id
-            ORDER BY dc.embedding <=> CAST(:query_embedding AS vector)
-            LIMIT :max_results
+              AND dc.id = ANY(:chunk_ids)
+            ORDER BY dc.{column} <=> CAST(:query_embedding AS vector)
         """)
 
         result = await db.execute(
@@ -53,16 +469,167 @@ class RAGService:
             {
                 "query_embedding": str(query_embedding),
                 "tenant_id": tenant_id,
-                "max_results": max_results
+                "chunk_ids": list(chunk_ids)
             }
         )
 
         return result.fetchall()
 
+    async def retrieve_for_conversation(
+        self,
+        db: AsyncSession,
+        query_embedding: List[float],
+        tenant_id: str,
+        max_chunks: int,
+        previous_chunk_ids: List[str],
+        filters: dict | None = None,
+        version: EmbeddingVersion | None = None
+    ) -> List[tuple]:
+        """
+        Recuperação para perguntas de acompanhamento
+
+        Se o melhor chunk já recuperado na conversa ainda for próximo da
+        pergunta (CONVERSATION_REUSE_MIN_SIMILARITY), responde só com eles,
+        sem nova busca; senão a busca normal estende o contexto anterior.
+        """
+        previous = await self.get_chunks_by_ids(db, previous_chunk_ids, query_embedding, tenant_id, version)
+
+        if previous and previous[0].similarity >= settings.CONVERSATION_REUSE_MIN_SIMILARITY:
+            return previous[:max_chunks]
+
+        found = await self.search_similar_chunks(db, query_embedding, tenant_id, max_chunks, filters, version)
+
+        merged = {chunk.id: chunk for chunk in [*previous, *found]}
+        return sorted(merged.values(), key=lambda chunk: chunk.similarity, reverse=True)[:max_chunks]
+
+    async def expand_with_neighbors(
+        self,
+        db: AsyncSession,
+        hits_per_query: List[List[tuple]]
+    ) -> List[List[Passage]]:
+        """
+        Expande os chunks encontrados com RAG_NEIGHBOR_WINDOW vizinhos de
+        cada lado (mesmo documento, chunk_index adjacente)
+
+        Chunks menores melhoram a precisão da busca; a expansão recupera o
+        texto ao redor quando uma regra atravessa a fronteira entre chunks.
+        Uma única query para todas as buscas: cada janela é uma leitura de
+        intervalo no índice (document_id, chunk_index).
+        """
+        window = settings.RAG_NEIGHBOR_WINDOW
+        hit_ids = list({hit.id for hits in hits_per_query for hit in hits})
+        if window <= 0 or not hit_ids:
+            return [[to_passage(hit) for hit in hits] for hits in hits_per_query]
+
+        query = text("""
+            SELECT
+                hit.id AS hit_id,
+                dc.id,
+                dc.document_id,
+                dc.chunk_index,
+                dc.chunk_text,
+                dc.page_number
+            FROM document_chunks hit
+            JOIN document_chunks dc
+              ON dc.document_id = hit.document_id
+             AND dc.chunk_index BETWEEN hit.chunk_index - :window AND hit.chunk_index + :window
+            WHERE hit.id = ANY(:hit_ids)
+        """)
+
+        result = await db.execute(query, {"hit_ids": hit_ids, "window": window})
+        neighbors = result.fetchall()
+
+        return [merge_neighbor_chunks(hits, neighbors) for hits in hits_per_query]
+
+    async def search_similar_chunks_batch(
+        self,
+        db: AsyncSession,
+        query_embeddings: List[List[float]],
+        tenant_id: str,
+        max_results: int = 5,
+        version: EmbeddingVersion | None = None
+    ) -> List[List[tuple]]:
+        """
+        Busca chunks similares para várias perguntas em uma única query
+
+        Uma AsyncSession não executa queries concorrentes na mesma conexão,
+        então as buscas rodam lado a lado no servidor via LATERAL JOIN.
+        Perguntas com menos de max_results chunks (o índice HNSW é
+        compartilhado entre os tenants) são refeitas de forma exata.
+        """
+        await self.widen_index_scan(db)
+        chunks_per_query = await self._search_batch(db, query_embeddings, tenant_id, max_results, version)
+
+        short = [idx for idx, chunks in enumerate(chunks_per_query) if len(chunks) < max_results]
+        if short:
+            exact = await self._search_batch(
+                db, [query_embeddings[idx] for idx in short], tenant_id, max_results, version, exact=True
+            )
+            for idx, chunks in zip(short, exact):
+                chunks_per_query[idx] = chunks
+
+        return chunks_per_query
+
+    async def _search_batch(
+        self,
+        db: AsyncSession,
+        query_embeddings: List[List[float]],
+        tenant_id: str,
+        max_results: int,
+        version: EmbeddingVersion | None = None,
+        exact: bool = False
+    ) -> List[List[tuple]]:
+        column = (version or get_embedding_version()).chunk_column
+        cte_sql, source = tenant_chunks_source(column, "", exact)
+
+        query = text(f"""
+            {cte_sql}SELECT
+                q.ord,
+                c.id,
+                c.chunk_text,
+                c.page_number,
+                c.filename,
+                c.similarity
+            FROM unnest(CAST(:query_embeddings AS text[])) WITH ORDINALITY AS q(embedding, ord)
+            CROSS JOIN LATERAL (
+                SELECT
+                    dc.id,
+                    dc.chunk_text,
+                    dc.page_number,
+                    d.filename,
+                    1 - (dc.{column} <=> CAST(q.embedding AS vector)) as similarity
+                FROM {source} dc
+                JOIN documents d ON dc.document_id = d.id
+                WHERE dc.tenant_id = :tenant_id
+                  AND dc.{column} IS NOT NULL
+                ORDER BY dc.{column} <=> CAST(q.embedding AS vector)
+                LIMIT :max_results
+            ) c
+            ORDER BY q.ord, c.similarity DESC
+        """)
+
+        result = await db.execute(
+            query,
+            {
+                "query_embeddings": [str(embedding) for embedding in query_embeddings],
+                "tenant_id": tenant_id,
+                "max_results": max_results
+            }
+        )
+
+        chunks_per_query = [[] for _ in query_embeddings]
+        for row in result.fetchall():
+            chunks_per_query[row.ord - 1].append(row)
+
+        return chunks_per_query
+
     async def generate_answer(
         self,
         question: str,
-        context_chunks: List[tuple]
+        context_chunks: List[tuple],
+        tenant_id: str = "",
+        priority: str = INTERACTIVE,
+        history: str = ""
     ) -> dict:
         """Gera resposta usando Gemini com contexto"""
 
@@ -72,13 +639,16 @@ class RAGService:
             for chunk in context_chunks
         ])
 
+        # Conversa anterior (perguntas de acompanhamento)
+        history_section = f"HISTÓRICO DA CONVERSA:\n{history}\n\n" if history else ""
+
         # Prompt engineering
         prompt = f"""Você é um assistente virtual de um condomínio. Sua função é responder perguntas sobre o regimento interno e documentos do condomínio.
 
 CONTEXTO DOS DOCUMENTOS:
 {context}
 
-PERGUNTA DO USUÁRIO:
+{history_section}PERGUNTA DO USUÁRIO:
 {question}
 
 INSTRUÇÕES:
@@ -91,7 +661,13 @@ INSTRUÇÕES:
 RESPOSTA:"""
 
         try:
-            response = self.model.generate_content(prompt)
+            response = await call_llm(
+                GENERATION,
+                lambda: self.provider.generate(prompt),
+                tenant_id,
+                priority
+            )
+            UsageService.record_generation(tenant_id, response.prompt_tokens, response.output_tokens)
 
             # Extrair fontes
             sources = [
@@ -112,30 +688,146 @@ RESPOSTA:"""
             logger.error(f"Error generating answer: {e}")
             raise
 
+    def build_degraded_answer(self, context_chunks: List[tuple]) -> dict:
+        """
+        Resposta sem síntese do LLM: os trechos mais relevantes encontrados,
+        usada quando o provedor está lento ou com o circuito aberto
+        """
+        chunks = context_chunks[:DEGRADED_MAX_CHUNKS]
+        excerpts = "\n\n".join([
+            f"[Documento: {chunk.filename}, Página: {chunk.page_number}]\n{chunk.chunk_text[:DEGRADED_EXCERPT_CHARS]}"
+            for chunk in chunks
+        ])
+
+        return {
+            "answer": f"{DEGRADED_ANSWER_HEADER}\n\n{excerpts}",
+            "sources": [
+                {
+                    "document": chunk.filename,
+                    "page": chunk.page_number,
+                    "similarity": float(chunk.similarity)
+                }
+                for chunk in chunks
+            ],
+            "degraded": True
+        }
+
     async def chat(
         self,
         db: AsyncSession,
         question: str,
         tenant_id: str,
-        max_chunks: int = 5
+        max_chunks: int = 5,
+        priority: str = INTERACTIVE,
+        filters: dict | None = None,
+        session: dict | None = None
     ) -> dict:
-        """Pipeline completo de RAG"""
+        """
+        Pipeline completo de RAG
+
+        Com uma sessão de conversa (ConversationService), a busca usa a
+        pergunta anterior como contexto, reaproveita os chunks já
+        recuperados e o histórico recente vai no prompt.
+        """
+
+        version = await get_tenant_read_version(db, tenant_id)
 
         # 1. Gerar embedding da pergunta
-        query_embedding = await self.generate_query_embedding(question)
+        retrieval_query = ConversationService.retrieval_query(session, question)
+        with track_stage("embedding", tenant_id):
+            query_embedding = await self.generate_query_embedding(
+                retrieval_query, tenant_id, priority, version
+            )
 
         # 2. Buscar chunks similares
-        similar_chunks = await self.search_similar_chunks(
-            db, query_embedding, tenant_id, max_chunks
-        )
+        previous_chunk_ids = ConversationService.reusable_chunk_ids(session, filters)
+        with track_stage("search", tenant_id):
+            if previous_chunk_ids:
+                similar_chunks = await self.retrieve_for_conversation(
+                    db, query_embedding, tenant_id, max_chunks, previous_chunk_ids, filters, version
+                )
+            else:
+                similar_chunks = await self.search_similar_chunks(
+                    db, query_embedding, tenant_id, max_chunks, filters, version
+                )
+            [similar_chunks] = await self.expand_with_neighbors(db, [similar_chunks])
 
         if not similar_chunks:
             return {
-                "answer": "Não encontrei documentos relevantes para responder sua pergunta. Por favor, verifique se os documentos do condomínio foram carregados.",
-                "sources": []
+                "answer": NO_DOCUMENTS_ANSWER,
+                "sources": [],
+                "chunk_ids": []
             }
 
-        # 3. Gerar resposta
-        result = await self.generate_answer(question, similar_chunks)
+        # 3. Gerar resposta (ou degradar para os trechos encontrados)
+        history = ConversationService.format_history(session)
+        with track_stage("generation", tenant_id):
+            try:
+                result = await self.generate_answer(question, similar_chunks, tenant_id, priority, history)
+            except LLMUnavailableError as e:
+                logger.warning(f"Serving degraded answer: {e}")
+                result = self.build_degraded_answer(similar_chunks)
 
+        result["chunk_ids"] = [chunk.id for chunk in similar_chunks]
         return result
+
+    async def chat_batch(
+        self,
+        db: AsyncSession,
+        questions: List[str],
+        tenant_id: str,
+        max_chunks: int = 5,
+        max_concurrency: int = 4,
+        priority: str = INTERACTIVE
+    ) -> List[dict]:
+        """
+        Pipeline de RAG para várias perguntas
+
+        Embeddings em uma chamada batch, buscas em uma única query e
+        respostas geradas em paralelo (no máximo max_concurrency por vez).
+        Erros de geração são reportados por pergunta, sem abortar o lote.
+        """
+
+        version = await get_tenant_read_version(db, tenant_id)
+
+        # 1. Embeddings de todas as perguntas
+        with track_stage("embedding", tenant_id) as embedding_timer:
+            query_embeddings = await self.generate_query_embeddings(
+                questions, tenant_id, priority, version
+            )
+
+        # 2. Buscas vetoriais
+        with track_stage("search", tenant_id) as search_timer:
+            chunks_per_question = await self.search_similar_chunks_batch(
+                db, query_embeddings, tenant_id, max_chunks, version
+            )
+            chunks_per_question = await self.expand_with_neighbors(db, chunks_per_question)
+
+        # 3. Respostas com paralelismo limitado
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def answer(question: str, chunks: List[tuple]) -> dict:
+            async with semaphore:
+                with track_stage("generation", tenant_id) as generation_timer:
+                    if not chunks:
+                        result = {"answer": NO_DOCUMENTS_ANSWER, "sources": []}
+                    else:
+                        try:
+                            result = await self.generate_answer(question, chunks, tenant_id, priority)
+                        except LLMUnavailableError:
+                            result = self.build_degraded_answer(chunks)
+                        except Exception as e:
+                            result = {"answer": None, "sources": [], "error": str(e)}
+
+                result["question"] = question
+                result["timings_ms"] = {
+                    "embedding": embedding_timer.elapsed_ms,
+                    "search": search_timer.elapsed_ms,
+                    "generation": generation_timer.elapsed_ms
+                }
+                return result
+
+        return await asyncio.gather(*[
+            answer(question, chunks)
+            for question, chunks in zip(questions, chunks_per_question)
+        ])
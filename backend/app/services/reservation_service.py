@@ -1,41 +1,134 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.future import select
-from sqlalchemy import and_
-from datetime import datetime
-from typing import Optional
+from sqlalchemy import DateTime, Integer, and_, column, exists, func, literal, values
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Optional
+from zoneinfo import ZoneInfo
 
-from app.models.base import Reservation
+from app.core.config import settings
+from app.models.base import Reservation, RESERVATION_OVERLAP_CONSTRAINT, generate_uuid
 
-async def check_reservation_conflict(
-    db: AsyncSession,
+# SQLSTATE for exclusion constraint violations
+EXCLUSION_VIOLATION = "23P01"
+
+# Rendered inline (not as a bound parameter) so the planner can match the
+# partial predicate of the exclusion constraint (WHERE status = 'confirmed')
+CONFIRMED = literal("confirmed", literal_execute=True)
+
+
+class ReservationAvailability(NamedTuple):
+    has_conflict: bool
+    limit_exceeded: bool
+
+
+class Occurrence(NamedTuple):
+    start_time: datetime
+    end_time: datetime
+
+
+# Per-occurrence outcome of a recurring series
+CREATED = "created"
+CONFLICT = "conflict"
+LIMIT_EXCEEDED = "limit_exceeded"
+
+
+def overlaps(start_time: datetime, end_time: datetime):
+    """
+    Reservation.period overlaps [start_time, end_time).
+    Uses the same operator (&&) as the exclusion constraint, so the lookup
+    is served by its GiST index.
+    """
+    return Reservation.period.op("&&")(func.tstzrange(start_time, end_time, "[)"))
+
+
+def _conflict_query(
     common_area_id: str,
     start_time: datetime,
     end_time: datetime,
     tenant_id: str,
     exclude_reservation_id: Optional[str] = None
-) -> bool:
-    """
-    Check if there's a time conflict for a reservation.
-    Returns True if conflict exists, False otherwise.
-    """
-    query = select(Reservation).where(
+):
+    query = select(Reservation.id).where(
         and_(
             Reservation.common_area_id == common_area_id,
             Reservation.tenant_id == tenant_id,
-            Reservation.status == "confirmed",
-            # Check for time overlap
-            Reservation.start_time < end_time,
-            Reservation.end_time > start_time
+            Reservation.status == CONFIRMED,
+            overlaps(start_time, end_time)
         )
     )
-    
+
     if exclude_reservation_id:
         query = query.where(Reservation.id != exclude_reservation_id)
-    
-    result = await db.execute(query)
-    conflicts = result.scalars().all()
-    
-    return len(conflicts) > 0
+
+    return query
+
+
+def _unit_count_query(unit_id: str, start_time: datetime, end_time: datetime, tenant_id: str):
+    return select(func.count()).select_from(Reservation).where(
+        and_(
+            Reservation.unit_id == unit_id,
+            Reservation.tenant_id == tenant_id,
+            Reservation.status == CONFIRMED,
+            overlaps(start_time, end_time)
+        )
+    )
+
+
+async def check_reservation_availability(
+    db: AsyncSession,
+    common_area_id: str,
+    unit_id: Optional[str],
+    start_time: datetime,
+    end_time: datetime,
+    tenant_id: str,
+    max_reservations: int = 2
+) -> ReservationAvailability:
+    """
+    Check the time conflict and the unit limit in a single query.
+
+    This is a fast pre-check for friendly error messages; concurrent
+    bookings of the same slot are rejected by the exclusion constraint.
+    """
+    has_conflict = _conflict_query(common_area_id, start_time, end_time, tenant_id).exists()
+    unit_reservations = (
+        _unit_count_query(unit_id, start_time, end_time, tenant_id).scalar_subquery()
+        if unit_id else literal(0)
+    )
+
+    result = await db.execute(select(has_conflict, unit_reservations))
+    conflict, count = result.one()
+
+    return ReservationAvailability(
+        has_conflict=bool(conflict),
+        limit_exceeded=count >= max_reservations
+    )
+
+
+def is_overlap_violation(error: IntegrityError) -> bool:
+    """True if the IntegrityError comes from the reservation overlap constraint"""
+    orig = error.orig
+    sqlstate = getattr(orig, "sqlstate", None) or getattr(getattr(orig, "__cause__", None), "sqlstate", None)
+    return sqlstate == EXCLUSION_VIOLATION or RESERVATION_OVERLAP_CONSTRAINT in str(orig)
+
+
+async def check_reservation_conflict(
+    db: AsyncSession,
+    common_area_id: str,
+    start_time: datetime,
+    end_time: datetime,
+    tenant_id: str,
+    exclude_reservation_id: Optional[str] = None
+) -> bool:
+    """
+    Check if there's a time conflict for a reservation.
+    Returns True if conflict exists, False otherwise.
+    """
+    query = _conflict_query(common_area_id, start_time, end_time, tenant_id, exclude_reservation_id)
+
+    result = await db.execute(select(query.exists()))
+    return bool(result.scalar())
 
 async def check_unit_limit(
     db: AsyncSession,
@@ -49,18 +142,172 @@ async def check_unit_limit(
     Check if unit has exceeded reservation limit for the time period.
     Returns True if limit exceeded, False otherwise.
     """
-    query = select(Reservation).where(
+    result = await db.execute(_unit_count_query(unit_id, start_time, end_time, tenant_id))
+    return result.scalar() >= max_reservations
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def expand_series(
+    start_time: datetime,
+    end_time: datetime,
+    frequency: str,
+    interval: int = 1,
+    count: Optional[int] = None,
+    until: Optional[datetime] = None,
+    by_weekday: Optional[List[int]] = None
+) -> List[Occurrence]:
+    """
+    Expand an RRULE-like recurrence into its occurrences.
+
+    `frequency` is "daily" or "weekly" (every `interval` days/weeks), bounded
+    by `count` occurrences and/or `until` (inclusive start). For weekly
+    series, `by_weekday` (0 = Monday) picks the days of each week; the first
+    occurrence defines the time of day. Occurrences keep the local wall-clock
+    time (RESERVATION_TIMEZONE) across DST changes, and are capped at
+    RESERVATION_SERIES_MAX_OCCURRENCES.
+    """
+    tz = ZoneInfo(settings.RESERVATION_TIMEZONE)
+    local_start = _aware(start_time).astimezone(tz)
+    until = _aware(until) if until else None
+    duration = end_time - start_time
+    wall_start = local_start.replace(tzinfo=None)
+    limit = min(count or settings.RESERVATION_SERIES_MAX_OCCURRENCES, settings.RESERVATION_SERIES_MAX_OCCURRENCES)
+
+    if frequency == "daily":
+        offsets = [0]
+        period = timedelta(days=interval)
+    else:
+        # Days of the week counted from the first occurrence's weekday
+        weekdays = sorted(set(by_weekday or [local_start.weekday()]))
+        offsets = sorted((day - local_start.weekday()) % 7 for day in weekdays)
+        period = timedelta(weeks=interval)
+
+    occurrences = []
+    base = wall_start
+    while len(occurrences) < limit:
+        for offset in offsets:
+            start = (base + timedelta(days=offset)).replace(tzinfo=tz)
+            if until and start > until:
+                return occurrences
+            occurrences.append(Occurrence(start, start + duration))
+            if len(occurrences) >= limit:
+                break
+        base += period
+
+    return occurrences
+
+
+async def check_series_availability(
+    db: AsyncSession,
+    common_area_id: str,
+    unit_id: Optional[str],
+    occurrences: List[Occurrence],
+    tenant_id: str,
+    max_reservations: int = 2
+) -> List[ReservationAvailability]:
+    """
+    Conflict and unit limit checks for every occurrence in one set-based
+    query: the occurrences are a VALUES list probed against the GiST index.
+    """
+    occurrence_rows = values(
+        column("idx", Integer),
+        column("start_time", DateTime(timezone=True)),
+        column("end_time", DateTime(timezone=True)),
+        name="occurrences"
+    ).data([(idx, occ.start_time, occ.end_time) for idx, occ in enumerate(occurrences)])
+
+    occurrence_period = func.tstzrange(occurrence_rows.c.start_time, occurrence_rows.c.end_time, "[)")
+
+    has_conflict = exists().where(
         and_(
-            Reservation.unit_id == unit_id,
+            Reservation.common_area_id == common_area_id,
             Reservation.tenant_id == tenant_id,
-            Reservation.status == "confirmed",
-            # Check for overlapping time period
-            Reservation.start_time < end_time,
-            Reservation.end_time > start_time
+            Reservation.status == CONFIRMED,
+            Reservation.period.op("&&")(occurrence_period)
         )
     )
-    
-    result = await db.execute(query)
-    reservations = result.scalars().all()
-    
-    return len(reservations) >= max_reservations
+    unit_reservations = (
+        select(func.count()).select_from(Reservation).where(
+            and_(
+                Reservation.unit_id == unit_id,
+                Reservation.tenant_id == tenant_id,
+                Reservation.status == CONFIRMED,
+                Reservation.period.op("&&")(occurrence_period)
+            )
+        ).scalar_subquery()
+        if unit_id else literal(0)
+    )
+
+    result = await db.execute(
+        select(occurrence_rows.c.idx, has_conflict, unit_reservations).order_by(occurrence_rows.c.idx)
+    )
+
+    return [
+        ReservationAvailability(has_conflict=bool(conflict), limit_exceeded=count >= max_reservations)
+        for _, conflict, count in result.all()
+    ]
+
+
+async def create_series(
+    db: AsyncSession,
+    common_area_id: str,
+    user_id: str,
+    unit_id: str,
+    tenant_id: str,
+    occurrences: List[Occurrence]
+) -> tuple[str, List[dict]]:
+    """
+    Book the occurrences of a recurring series.
+
+    Occurrences that pass the batch check are inserted in a single
+    INSERT ... ON CONFLICT DO NOTHING: one taken by a concurrent booking in
+    the meantime is skipped by the exclusion constraint instead of failing
+    the whole series. Returns the series id and a result per occurrence.
+    """
+    series_id = generate_uuid()
+    checks = await check_series_availability(db, common_area_id, unit_id, occurrences, tenant_id)
+
+    results = []
+    rows = []
+    for occ, check in zip(occurrences, checks):
+        result = {"start_time": occ.start_time, "end_time": occ.end_time, "reservation_id": None}
+        if check.has_conflict:
+            result["status"] = CONFLICT
+        elif check.limit_exceeded:
+            result["status"] = LIMIT_EXCEEDED
+        else:
+            result["reservation_id"] = generate_uuid()
+            rows.append({
+                "id": result["reservation_id"],
+                "start_time": occ.start_time,
+                "end_time": occ.end_time,
+                "status": "confirmed",
+                "series_id": series_id,
+                "common_area_id": common_area_id,
+                "user_id": user_id,
+                "unit_id": unit_id,
+                "tenant_id": tenant_id,
+            })
+        results.append(result)
+
+    inserted = set()
+    if rows:
+        inserted_rows = await db.execute(
+            insert(Reservation).values(rows).on_conflict_do_nothing().returning(Reservation.id)
+        )
+        inserted = set(inserted_rows.scalars().all())
+        await db.commit()
+
+    for result in results:
+        if result["reservation_id"] is None:
+            continue
+        if result["reservation_id"] in inserted:
+            result["status"] = CREATED
+        else:
+            result["status"] = CONFLICT
+            result["reservation_id"] = None
+
+    return series_id, results
@@ -0,0 +1,206 @@
+from redis import Redis
+from app.core.config import settings
+from app.services.cache_service import CacheService
+from app.utils.text import normalize_query, trigrams
+import logging
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+# Candidatos lidos do índice de prefixos (ordem lexicográfica) antes de ordenar por frequência
+PREFIX_CANDIDATES = 50
+
+
+class SuggestService:
+    """
+    Autocompletar perguntas a partir das perguntas já respondidas do tenant
+
+    Índices por tenant no Redis (chaves ai_suggest:{tenant_id}:*):
+        prefix:   ZSET com score 0 e as perguntas normalizadas como membros
+                  (ZRANGEBYLEX faz a busca por prefixo)
+        freq:     ZSET pergunta normalizada -> vezes que foi feita
+        text:     HASH pergunta normalizada -> texto exibido
+        tri:{tg}: SET das perguntas que contêm o trigrama tg (erros de
+                  digitação e palavras do meio da pergunta)
+
+    Só são sugeridas perguntas cuja resposta ainda está no cache; as que
+    expiraram são removidas dos índices na consulta.
+    """
+
+    @staticmethod
+    def _key(tenant_id: str, name: str) -> str:
+        return f"ai_suggest:{tenant_id}:{name}"
+
+    @staticmethod
+    def record_question(question: str, tenant_id: str, increment: int = 1) -> bool:
+        """
+        Registra uma pergunta respondida (e em cache) no índice do tenant
+
+        Args:
+            question: Pergunta como o morador digitou
+            tenant_id: ID do tenant
+            increment: Quanto somar à frequência (0 para respostas
+                pré-calculadas, que ninguém perguntou ainda)
+
+        Returns:
+            True se registrada, False caso contrário
+        """
+        normalized = normalize_query(question)
+        if not normalized:
+            return False
+
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.zadd(SuggestService._key(tenant_id, "prefix"), {normalized: 0})
+            pipe.zincrby(SuggestService._key(tenant_id, "freq"), increment, normalized)
+            pipe.hset(SuggestService._key(tenant_id, "text"), normalized, question.strip())
+            for gram in trigrams(normalized):
+                pipe.sadd(SuggestService._key(tenant_id, f"tri:{gram}"), normalized)
+            pipe.execute()
+            return True
+
+        except Exception as e:
+            logger.error(f"Error recording question for suggestions: {e}")
+            return False
+
+    @staticmethod
+    def remove_questions(normalized_questions: List[str], tenant_id: str):
+        """Remove perguntas (já normalizadas) de todos os índices do tenant"""
+        if not normalized_questions:
+            return
+
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zrem(SuggestService._key(tenant_id, "prefix"), *normalized_questions)
+        pipe.zrem(SuggestService._key(tenant_id, "freq"), *normalized_questions)
+        pipe.hdel(SuggestService._key(tenant_id, "text"), *normalized_questions)
+        for normalized in normalized_questions:
+            for gram in trigrams(normalized):
+                pipe.srem(SuggestService._key(tenant_id, f"tri:{gram}"), normalized)
+        pipe.execute()
+
+    @staticmethod
+    def top_questions(tenant_id: str, limit: int) -> List[str]:
+        """Perguntas mais frequentes do tenant (texto exibido)"""
+        try:
+            normalized = redis_client.zrevrange(SuggestService._key(tenant_id, "freq"), 0, limit - 1)
+            if not normalized:
+                return []
+
+            texts = redis_client.hmget(SuggestService._key(tenant_id, "text"), normalized)
+            return [text or question for question, text in zip(normalized, texts)]
+
+        except Exception as e:
+            logger.error(f"Error reading top questions: {e}")
+            return []
+
+    @staticmethod
+    def _prefix_matches(prefix: str, tenant_id: str) -> List[str]:
+        return redis_client.zrangebylex(
+            SuggestService._key(tenant_id, "prefix"),
+            f"[{prefix}",
+            f"[{prefix}\xff",
+            start=0,
+            num=PREFIX_CANDIDATES
+        )
+
+    @staticmethod
+    def _trigram_matches(text: str, tenant_id: str) -> List[str]:
+        """
+        Perguntas que compartilham ao menos SUGGEST_MIN_TRIGRAM_SIMILARITY dos trigramas
+
+        Os candidatos vêm só dos SETs com até SUGGEST_MAX_TRIGRAM_POSTINGS
+        perguntas: trigramas comuns ("  q", "ual", " da"...) aparecem em
+        quase todas as perguntas do tenant e fariam cada tecla ler o índice
+        inteiro. A similaridade de cada candidato é calculada localmente,
+        com os trigramas da própria pergunta normalizada (o membro do SET).
+        """
+        grams = trigrams(text)
+        if not grams:
+            return []
+
+        keys = [SuggestService._key(tenant_id, f"tri:{gram}") for gram in sorted(grams)]
+
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.scard(key)
+        selective = [
+            key for key, size in zip(keys, pipe.execute())
+            if 0 < size <= settings.SUGGEST_MAX_TRIGRAM_POSTINGS
+        ]
+        if not selective:
+            return []
+
+        pipe = redis_client.pipeline(transaction=False)
+        for key in selective:
+            pipe.smembers(key)
+        candidates = set().union(*pipe.execute())
+
+        minimum = len(grams) * settings.SUGGEST_MIN_TRIGRAM_SIMILARITY
+        return sorted(
+            candidate for candidate in candidates
+            if len(grams & trigrams(candidate)) >= minimum
+        )
+
+    @staticmethod
+    def suggest(query: str, tenant_id: str, limit: int = 5) -> List[dict]:
+        """
+        Sugestões para o que o morador está digitando
+
+        Perguntas que começam com o texto digitado vêm primeiro; as
+        encontradas por trigramas completam a lista. Dentro de cada grupo a
+        ordem é pela frequência.
+
+        Returns:
+            Lista de dicts com question e count
+        """
+        normalized = normalize_query(query)
+        if not normalized:
+            return []
+
+        try:
+            prefix_matches = SuggestService._prefix_matches(normalized, tenant_id)
+            candidates = list(prefix_matches)
+            if len(candidates) < limit:
+                candidates += [
+                    member
+                    for member in SuggestService._trigram_matches(normalized, tenant_id)
+                    if member not in prefix_matches
+                ]
+            if not candidates:
+                return []
+
+            version = CacheService.get_document_set_version(tenant_id)
+
+            pipe = redis_client.pipeline(transaction=False)
+            for candidate in candidates:
+                pipe.zscore(SuggestService._key(tenant_id, "freq"), candidate)
+            pipe.hmget(SuggestService._key(tenant_id, "text"), candidates)
+            for candidate in candidates:
+                pipe.exists(CacheService.get_cache_key(candidate, tenant_id, version=version))
+            replies = pipe.execute()
+
+            counts = replies[:len(candidates)]
+            texts = replies[len(candidates)]
+            cached = replies[len(candidates) + 1:]
+
+            expired = [c for c, is_cached in zip(candidates, cached) if not is_cached]
+            SuggestService.remove_questions(expired, tenant_id)
+
+            ranked = sorted(
+                (
+                    (candidate not in prefix_matches, -int(count or 0), text or candidate)
+                    for candidate, count, text, is_cached in zip(candidates, counts, texts, cached)
+                    if is_cached
+                )
+            )
+
+            return [
+                {"question": text, "count": -negative_count}
+                for _, negative_count, text in ranked[:limit]
+            ]
+
+        except Exception as e:
+            logger.error(f"Error getting suggestions: {e}")
+            return []
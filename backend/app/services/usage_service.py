@@ -0,0 +1,265 @@
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta, timezone
+from prometheus_client import Counter
+from redis import Redis
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.usage import AIUsageDaily
+import logging
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+LLM_TOKENS = Counter(
+    "sindicoai_llm_tokens_total",
+    "Tokens consumidos em chamadas ao LLM",
+    ["kind", "tenant"],
+)
+
+USAGE_FIELDS = ("prompt_tokens", "output_tokens", "embedding_tokens", "requests")
+
+# Chamadas fora de uma requisição de usuário (ex.: scripts de manutenção)
+SYSTEM_USER = "system"
+
+# A API de embeddings não devolve o consumo: estimado pelo tamanho do texto
+CHARS_PER_TOKEN = 4
+
+# Usuário da requisição atual, a quem o consumo das chamadas é atribuído
+_usage_user: ContextVar[str] = ContextVar("ai_usage_user", default=SYSTEM_USER)
+
+
+def set_usage_user(user_id: str) -> object:
+    """Atribui as chamadas ao LLM da requisição atual a um usuário; retorna o token"""
+    return _usage_user.set(user_id)
+
+
+def estimate_tokens(texts: List[str]) -> int:
+    return sum(max(1, len(text) // CHARS_PER_TOKEN) for text in texts)
+
+
+def usage_cost(usage: dict) -> float:
+    """Custo estimado em USD a partir dos preços por milhão de tokens"""
+    return round(
+        (
+            int(usage.get("prompt_tokens", 0)) * settings.AI_PRICE_PROMPT_PER_MTOK
+            + int(usage.get("output_tokens", 0)) * settings.AI_PRICE_OUTPUT_PER_MTOK
+            + int(usage.get("embedding_tokens", 0)) * settings.AI_PRICE_EMBEDDING_PER_MTOK
+        ) / 1_000_000,
+        6
+    )
+
+
+def get_tenant_budget(tenant_id: str) -> float:
+    """Orçamento mensal do tenant em USD (0 = sem limite)"""
+    return settings.AI_TENANT_MONTHLY_BUDGETS_USD.get(tenant_id, settings.AI_MONTHLY_BUDGET_USD)
+
+
+class UsageService:
+    """
+    Consumo de tokens do LLM por tenant, usuário e dia
+
+    Contadores no Redis (HASHes com os campos de USAGE_FIELDS):
+        ai_usage:{tenant}:day:{YYYYMMDD}              total do tenant no dia
+        ai_usage:{tenant}:month:{YYYYMM}              total do mês (orçamento)
+        ai_usage:{tenant}:user:{user}:day:{YYYYMMDD}  total do usuário no dia
+    e SETs com os usuários (ai_usage:{tenant}:users:{dia}) e os tenants
+    (ai_usage:tenants:{dia}) com consumo no dia, usados pelo rollup diário
+    para a tabela ai_usage_daily (scripts/rollup_ai_usage.py).
+    """
+
+    @staticmethod
+    def _day(day: date | None = None) -> str:
+        return (day or datetime.now(timezone.utc).date()).strftime("%Y%m%d")
+
+    @staticmethod
+    def _month(day: date | None = None) -> str:
+        return (day or datetime.now(timezone.utc).date()).strftime("%Y%m")
+
+    @staticmethod
+    def day_key(tenant_id: str, day: date | None = None) -> str:
+        return f"ai_usage:{tenant_id}:day:{UsageService._day(day)}"
+
+    @staticmethod
+    def month_key(tenant_id: str, day: date | None = None) -> str:
+        return f"ai_usage:{tenant_id}:month:{UsageService._month(day)}"
+
+    @staticmethod
+    def user_day_key(tenant_id: str, user_id: str, day: date | None = None) -> str:
+        return f"ai_usage:{tenant_id}:user:{user_id}:day:{UsageService._day(day)}"
+
+    @staticmethod
+    def users_key(tenant_id: str, day: date | None = None) -> str:
+        return f"ai_usage:{tenant_id}:users:{UsageService._day(day)}"
+
+    @staticmethod
+    def tenants_key(day: date | None = None) -> str:
+        return f"ai_usage:tenants:{UsageService._day(day)}"
+
+    @staticmethod
+    def record(tenant_id: str, user_id: str | None = None, **tokens: int) -> bool:
+        """
+        Soma tokens ao consumo do tenant e do usuário no dia e no mês
+
+        Args:
+            tenant_id: ID do tenant
+            user_id: Usuário (padrão: o da requisição atual)
+            **tokens: Campos de USAGE_FIELDS a incrementar
+
+        Returns:
+            True se registrado, False caso contrário
+        """
+        if not tenant_id:
+            return False
+
+        user_id = user_id or _usage_user.get()
+        day_ttl = settings.AI_USAGE_RETENTION_DAYS * 86400
+
+        for field, value in tokens.items():
+            if field != "requests" and value:
+                LLM_TOKENS.labels(kind=field, tenant=tenant_id).inc(value)
+
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for key, ttl in (
+                (UsageService.day_key(tenant_id), day_ttl),
+                (UsageService.month_key(tenant_id), day_ttl + 31 * 86400),
+                (UsageService.user_day_key(tenant_id, user_id), day_ttl),
+            ):
+                for field, value in tokens.items():
+                    pipe.hincrby(key, field, value)
+                pipe.expire(key, ttl)
+            pipe.sadd(UsageService.users_key(tenant_id), user_id)
+            pipe.expire(UsageService.users_key(tenant_id), day_ttl)
+            pipe.sadd(UsageService.tenants_key(), tenant_id)
+            pipe.expire(UsageService.tenants_key(), day_ttl)
+            pipe.execute()
+            return True
+
+        except Exception as e:
+            logger.error(f"Error recording AI usage: {e}")
+            return False
+
+    @staticmethod
+    def record_generation(tenant_id: str, prompt_tokens: int, output_tokens: int) -> bool:
+        """Consumo informado pelo usage_metadata de uma geração"""
+        return UsageService.record(
+            tenant_id,
+            prompt_tokens=prompt_tokens,
+            output_tokens=output_tokens,
+            requests=1
+        )
+
+    @staticmethod
+    def record_embedding(tenant_id: str, texts: List[str]) -> bool:
+        """Consumo estimado de uma chamada de embeddings"""
+        return UsageService.record(tenant_id, embedding_tokens=estimate_tokens(texts))
+
+    @staticmethod
+    def _parse(values: dict) -> dict:
+        usage = {field: int(values.get(field, 0) or 0) for field in USAGE_FIELDS}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["output_tokens"] + usage["embedding_tokens"]
+        usage["cost_usd"] = usage_cost(usage)
+        return usage
+
+    @staticmethod
+    def get_month_usage(tenant_id: str) -> dict:
+        """Consumo do tenant no mês corrente (UTC)"""
+        return UsageService._parse(redis_client.hgetall(UsageService.month_key(tenant_id)))
+
+    @staticmethod
+    def get_tenant_usage(tenant_id: str, days: int = 30) -> dict:
+        """
+        Consumo do tenant para o painel administrativo
+
+        Returns:
+            dict com o mês corrente e o orçamento, a série diária dos
+            últimos `days` dias e o consumo por usuário no período
+        """
+        today = datetime.now(timezone.utc).date()
+        period = [today - timedelta(days=offset) for offset in range(days)]
+
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hgetall(UsageService.month_key(tenant_id))
+        for day in period:
+            pipe.hgetall(UsageService.day_key(tenant_id, day))
+            pipe.smembers(UsageService.users_key(tenant_id, day))
+        replies = pipe.execute()
+
+        month = UsageService._parse(replies[0])
+        daily = []
+        user_days = []
+        for idx, day in enumerate(period):
+            daily.append({"day": day, **UsageService._parse(replies[1 + 2 * idx])})
+            user_days += [(user_id, day) for user_id in replies[2 + 2 * idx]]
+
+        pipe = redis_client.pipeline(transaction=False)
+        for user_id, day in user_days:
+            pipe.hgetall(UsageService.user_day_key(tenant_id, user_id, day))
+
+        users: dict[str, dict] = {}
+        for (user_id, _), values in zip(user_days, pipe.execute()):
+            totals = users.setdefault(user_id, dict.fromkeys(USAGE_FIELDS, 0))
+            for field in USAGE_FIELDS:
+                totals[field] += int(values.get(field, 0) or 0)
+
+        by_user = sorted(
+            ({"user_id": user_id, **UsageService._parse(totals)} for user_id, totals in users.items()),
+            key=lambda usage: usage["cost_usd"],
+            reverse=True
+        )
+
+        budget = get_tenant_budget(tenant_id)
+
+        return {
+            "month": month,
+            "budget_usd": budget,
+            "budget_used": round(month["cost_usd"] / budget, 4) if budget else None,
+            "daily": daily,
+            "users": by_user,
+        }
+
+    @staticmethod
+    async def rollup_day(db: AsyncSession, day: date) -> int:
+        """
+        Grava o consumo do dia (por tenant e usuário) em ai_usage_daily
+
+        Os contadores do Redis são totais, então o upsert pode rodar várias
+        vezes no mesmo dia. Retorna o número de linhas gravadas.
+        """
+        rows = []
+        for tenant_id in redis_client.smembers(UsageService.tenants_key(day)):
+            user_ids = list(redis_client.smembers(UsageService.users_key(tenant_id, day)))
+            pipe = redis_client.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.hgetall(UsageService.user_day_key(tenant_id, user_id, day))
+
+            for user_id, values in zip(user_ids, pipe.execute()):
+                usage = UsageService._parse(values)
+                rows.append({
+                    "tenant_id": tenant_id,
+                    "user_id": user_id,
+                    "day": day,
+                    **{field: usage[field] for field in USAGE_FIELDS},
+                    "cost_usd": usage["cost_usd"],
+                })
+
+        if not rows:
+            return 0
+
+        statement = insert(AIUsageDaily).values(rows)
+        await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["tenant_id", "user_id", "day"],
+                set_={
+                    **{field: statement.excluded[field] for field in USAGE_FIELDS},
+                    "cost_usd": statement.excluded.cost_usd,
+                    "updated_at": func.now(),
+                }
+            )
+        )
+        await db.commit()
+        return len(rows)
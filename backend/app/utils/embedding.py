@@ -0,0 +1,15 @@
+import struct
+from typing import List
+
+# Little-endian IEEE 754 half precision ("e"): 2 bytes por dimensão
+_HALF_FORMAT = "<{}e"
+
+
+def pack_embedding(embedding: List[float]) -> bytes:
+    """Serializa um embedding em float16 (768 dimensões -> 1536 bytes)"""
+    return struct.pack(_HALF_FORMAT.format(len(embedding)), *embedding)
+
+
+def unpack_embedding(data: bytes) -> List[float]:
+    """Desserializa um embedding gravado por pack_embedding"""
+    return list(struct.unpack(_HALF_FORMAT.format(len(data) // 2), data))
@@ -0,0 +1,38 @@
+import re
+import unicodedata
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]|_")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def fold_accents(text: str) -> str:
+    """Remove acentos e cedilha ("açaí" -> "acai")"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normaliza uma pergunta para uso em chaves de cache
+
+    "Qual o horário da PISCINA?" e "qual o horario da piscina" geram a
+    mesma forma normalizada: acentos removidos, casefold, pontuação
+    substituída por espaço e espaços colapsados.
+    """
+    text = fold_accents(text).casefold()
+    text = _PUNCTUATION_RE.sub(" ", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    Trigramas de um texto já normalizado, no estilo do pg_trgm
+
+    Cada palavra recebe dois espaços antes e um depois ("sal" ->
+    "  s", " sa", "sal", "al "), então prefixos curtos também casam.
+    """
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[idx:idx + 3] for idx in range(len(padded) - 2))
+    return grams
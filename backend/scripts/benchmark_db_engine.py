@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga do engine do banco: perfil antigo x perfil de produção.
+
+Simula requisições concorrentes do tipo mais comum da API (busca do usuário
+autenticado + listagem de reservas do tenant), cada uma com sua sessão,
+como o get_db faz. Compara:
+
+- legacy:   echo=True e pool padrão (5 + 10), sem pre-ping
+- settings: perfil de Settings (DB_POOL_SIZE, DB_MAX_OVERFLOW,
+            DB_POOL_PRE_PING, DB_STATEMENT_CACHE_SIZE, DB_ECHO)
+
+Requer o banco populado (scripts/seed_database.py).
+
+Exemplo:
+    python scripts/benchmark_db_engine.py --requests 2000 --concurrency 40
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import DATABASE_URL, create_engine_from_settings
+
+PROFILES = {
+    "legacy": {"echo": True, "pool_size": 5, "max_overflow": 10, "pool_pre_ping": False, "pool_recycle": -1},
+    "settings": {},
+}
+
+
+def percentile(values: list, p: float) -> float:
+    """Percentil com interpolação linear (p entre 0 e 100)"""
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+async def pick_user(session_factory) -> tuple:
+    async with session_factory() as db:
+        result = await db.execute(text("SELECT id, tenant_id FROM users ORDER BY id LIMIT 1"))
+        row = result.first()
+        if not row:
+            raise SystemExit("Banco vazio: rode scripts/seed_database.py antes")
+        return row.id, row.tenant_id
+
+
+async def run_profile(name: str, total_requests: int, concurrency: int) -> dict:
+    engine = create_engine_from_settings(DATABASE_URL, label=f"benchmark_{name}", **PROFILES[name])
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    # echo=True escreve cada statement; descartado para não poluir a saída,
+    # mas a formatação e o log continuam acontecendo
+    for handler in logging.getLogger("sqlalchemy.engine.Engine").handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(open(os.devnull, "w"))
+
+    user_id, tenant_id = await pick_user(session_factory)
+    latencies = []
+    checkouts = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one():
+        async with semaphore:
+            start = time.perf_counter()
+            async with session_factory() as db:
+                await db.connection()
+                checkouts.append((time.perf_counter() - start) * 1000)
+
+                await db.execute(text("SELECT * FROM users WHERE id = :id"), {"id": user_id})
+                await db.execute(
+                    text("""
+                        SELECT * FROM reservations
+                        WHERE tenant_id = :tenant_id
+                        ORDER BY start_time DESC
+                        LIMIT 50
+                    """),
+                    {"tenant_id": tenant_id}
+                )
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    # Aquecimento: conexões abertas e statements preparados
+    await asyncio.gather(*(run_one() for _ in range(concurrency)))
+    latencies.clear()
+    checkouts.clear()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_one() for _ in range(total_requests)))
+    elapsed = time.perf_counter() - start
+
+    await engine.dispose()
+
+    return {
+        "throughput_rps": round(total_requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "checkout_p95_ms": round(percentile(checkouts, 95), 2),
+    }
+
+
+async def benchmark(args):
+    print("=" * 70)
+    print(f" BENCHMARK DO ENGINE: {args.requests} requisições, concorrência {args.concurrency}")
+    print(f" Perfil settings: pool {settings.DB_POOL_SIZE}+{settings.DB_MAX_OVERFLOW}, "
+          f"pre_ping={settings.DB_POOL_PRE_PING}, statement_cache={settings.DB_STATEMENT_CACHE_SIZE}, "
+          f"echo={settings.DB_ECHO}")
+    print("=" * 70)
+
+    for name in args.profiles:
+        result = await run_profile(name, args.requests, args.concurrency)
+        print(f"\n {name}")
+        for key, value in result.items():
+            print(f"   {key:>16}: {value}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de carga do engine do banco")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark(parse_args()))
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Relatório de espaço das notificações: tabelas notifications, broadcasts e
+broadcast_reads, e quanto os avisos gerais ocupariam no modelo antigo (uma
+cópia de título/mensagem por morador).
+
+Com --compact, converte os envios antigos para todos os moradores (linhas
+de notifications com o mesmo broadcast_id, uma por morador do tenant) em
+um broadcast com o estado de leitura em broadcast_reads, e mostra o antes
+e o depois.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal
+
+TABLES = ("notifications", "broadcasts", "broadcast_reads")
+
+# Envios em que cada morador do tenant (na data do envio) recebeu uma cópia
+COMPACTABLE_GROUPS = """
+    SELECT n.broadcast_id, n.tenant_id, min(n.title) AS title, min(n.message) AS message,
+           min(n.created_at) AS created_at, count(*) AS recipients
+    FROM notifications n
+    JOIN users u ON u.id = n.user_id
+    WHERE n.broadcast_id IS NOT NULL
+    GROUP BY n.broadcast_id, n.tenant_id
+    HAVING count(*) >= :min_recipients
+       AND count(DISTINCT n.title) = 1
+       AND count(DISTINCT n.message) = 1
+       AND count(*) = count(*) FILTER (WHERE u.role = 'resident')
+       AND count(*) = (
+           SELECT count(*) FROM users r
+           WHERE r.tenant_id = n.tenant_id AND r.role = 'resident' AND r.created_at <= min(n.created_at)
+       )
+"""
+
+
+async def table_sizes(db) -> dict:
+    sizes = {}
+    for table in TABLES:
+        result = await db.execute(
+            text(f"SELECT pg_total_relation_size('{table}'), (SELECT count(*) FROM {table})")
+        )
+        sizes[table] = result.one()
+    return sizes
+
+
+async def per_recipient_estimate(db) -> tuple:
+    """Linhas e bytes que os broadcasts ocupariam como uma notificação por morador"""
+    result = await db.execute(text("""
+        SELECT coalesce(sum(audience.users), 0) AS rows,
+               coalesce((SELECT pg_total_relation_size('notifications') / greatest(count(*), 1) FROM notifications), 0) AS row_bytes
+        FROM broadcasts b
+        CROSS JOIN LATERAL (
+            SELECT count(*) AS users FROM users u
+            WHERE u.tenant_id = b.tenant_id
+              AND (b.audience_role IS NULL OR u.role = b.audience_role)
+              AND u.created_at <= b.created_at
+        ) audience
+    """))
+    rows, row_bytes = result.one()
+    return rows, rows * row_bytes
+
+
+def print_sizes(label: str, sizes: dict):
+    print(f"\n {label}")
+    total = 0
+    for table, (size, rows) in sizes.items():
+        total += size
+        print(f"   {table:<16} {rows:>10} linhas  {size / 1024 / 1024:>9.2f} MB")
+    print(f"   {'total':<16} {'':>10}        {total / 1024 / 1024:>9.2f} MB")
+
+
+async def compact(db, min_recipients: int) -> int:
+    """Converte os envios para todos os moradores em broadcasts; retorna quantos"""
+    groups = (await db.execute(text(COMPACTABLE_GROUPS), {"min_recipients": min_recipients})).fetchall()
+
+    for group in groups:
+        await db.execute(
+            text("""
+                INSERT INTO broadcasts (id, title, message, audience_role, created_at, tenant_id)
+                VALUES (:broadcast_id, :title, :message, 'resident', :created_at, :tenant_id)
+                ON CONFLICT (id) DO NOTHING
+            """),
+            {
+                "broadcast_id": group.broadcast_id,
+                "title": group.title,
+                "message": group.message,
+                "created_at": group.created_at,
+                "tenant_id": group.tenant_id,
+            }
+        )
+        await db.execute(
+            text("""
+                INSERT INTO broadcast_reads (broadcast_id, user_id, read_at)
+                SELECT broadcast_id, user_id, now()
+                FROM notifications
+                WHERE broadcast_id = :broadcast_id AND is_read
+                ON CONFLICT DO NOTHING
+            """),
+            {"broadcast_id": group.broadcast_id}
+        )
+        await db.execute(
+            text("DELETE FROM notifications WHERE broadcast_id = :broadcast_id"),
+            {"broadcast_id": group.broadcast_id}
+        )
+        await db.commit()
+        print(f"   ✓ {group.broadcast_id}: {group.recipients} cópias → 1 broadcast")
+
+    return len(groups)
+
+
+async def report(args):
+    print("=" * 70)
+    print(" ESPAÇO DAS NOTIFICAÇÕES")
+    print("=" * 70)
+
+    async with AsyncSessionLocal() as db:
+        before = await table_sizes(db)
+        print_sizes("Atual", before)
+
+        if args.compact:
+            print("\n Compactando envios para todos os moradores...")
+            converted = await compact(db, args.min_recipients)
+            # VACUUM não roda dentro de transação: o espaço é reaproveitado
+            # por novas linhas; VACUUM FULL notifications devolve ao disco
+            print(f"   ✅ {converted} envios convertidos")
+            print_sizes("Depois", await table_sizes(db))
+
+        rows, size = await per_recipient_estimate(db)
+        print(f"\n Os broadcasts atuais no modelo antigo: {rows} linhas em notifications (~{size / 1024 / 1024:.2f} MB)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Relatório de espaço das notificações")
+    parser.add_argument("--compact", action="store_true",
+                        help="Converte envios antigos para todos os moradores em broadcasts")
+    parser.add_argument("--min-recipients", type=int, default=20,
+                        help="Mínimo de destinatários para converter um envio")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(report(parse_args()))
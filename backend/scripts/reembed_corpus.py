@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Script para gerar os embeddings de uma nova versão (ex.: v2) para o corpus
+já processado, sem parar o chat.
+
+Processa tenant a tenant, em lotes de chunks com a coluna da versão ainda
+vazia. Cada lote é commitado, então o script pode ser interrompido e
+executado de novo: continua de onde parou. As chamadas passam pelo
+llm_scheduler com prioridade BACKGROUND e há uma pausa entre lotes.
+
+Migração de modelo:
+1. EMBEDDING_WRITE_VERSIONS=["v1","v2"] (uploads novos gravam as duas)
+2. python scripts/reembed_corpus.py --version v2
+3. python scripts/reembed_corpus.py --version v2 --tenant <id> --cutover
+   (o tenant passa a buscar na v2; voltar: --version v1 --cutover)
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, text
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.document import Document
+from app.services.cache_service import CacheService
+from app.services.document_service import DocumentProcessor
+from app.services.embedding_versions import EmbeddingVersion, get_embedding_version
+
+
+async def get_tenant_ids(tenant_id: str | None) -> list:
+    if tenant_id:
+        return [tenant_id]
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(text("SELECT id FROM tenants ORDER BY id"))
+        return [row.id for row in result.fetchall()]
+
+
+async def reembed_tenant(
+    processor: DocumentProcessor,
+    version: EmbeddingVersion,
+    tenant_id: str,
+    batch_size: int,
+    pause: float
+) -> int:
+    """Preenche a coluna da versão para os chunks do tenant; retorna quantos"""
+    column = version.chunk_column
+    total = 0
+
+    while True:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                text(f"""
+                    SELECT id, chunk_text
+                    FROM document_chunks
+                    WHERE tenant_id = :tenant_id AND {column} IS NULL
+                    ORDER BY id
+                    LIMIT :batch_size
+                """),
+                {"tenant_id": tenant_id, "batch_size": batch_size}
+            )
+            rows = result.fetchall()
+            if not rows:
+                break
+
+            start = time.perf_counter()
+            embeddings = await processor.generate_embeddings(
+                [row.chunk_text for row in rows],
+                tenant_id,
+                version
+            )
+
+            await db.execute(
+                text(f"UPDATE document_chunks SET {column} = CAST(:embedding AS vector) WHERE id = :id"),
+                [
+                    {"id": row.id, "embedding": str(embedding)}
+                    for row, embedding in zip(rows, embeddings)
+                ]
+            )
+            await db.commit()
+
+        total += len(rows)
+        print(f"   ✓ {total} chunks ({len(rows)} em {time.perf_counter() - start:.1f}s)")
+
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+    # Resumos da busca hierárquica com os novos vetores
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Document).where(Document.tenant_id == tenant_id))
+        for document in result.scalars().all():
+            await processor.build_summary_embeddings(db, document)
+        await db.commit()
+
+    return total
+
+
+async def set_tenant_version(tenant_id: str, version: EmbeddingVersion):
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            text("UPDATE tenants SET embedding_version = :version WHERE id = :tenant_id"),
+            {"version": version.name, "tenant_id": tenant_id}
+        )
+        await db.commit()
+
+    # Respostas em cache foram geradas com os chunks da busca antiga
+    CacheService.bump_document_set_version(tenant_id)
+
+
+async def reembed(args):
+    version = get_embedding_version(args.version)
+    processor = DocumentProcessor()
+
+    print("=" * 70)
+    print(f" RE-EMBED DO CORPUS: versão {version.name} ({version.model or processor.provider.embedding_model})")
+    print("=" * 70)
+
+    for tenant_id in await get_tenant_ids(args.tenant):
+        print(f"\n Tenant {tenant_id}")
+        total = await reembed_tenant(processor, version, tenant_id, args.batch_size, args.pause)
+        print(f"   ✅ {total} chunks atualizados")
+
+        if args.cutover:
+            await set_tenant_version(tenant_id, version)
+            print(f"   🔀 Busca do tenant agora usa a versão {version.name}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Gera embeddings de uma nova versão para o corpus")
+    parser.add_argument("--version", required=True, help="Versão de embedding (ex.: v2)")
+    parser.add_argument("--tenant", default=None, help="Apenas este tenant (padrão: todos)")
+    parser.add_argument("--batch-size", type=int, default=settings.REEMBED_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=settings.REEMBED_PAUSE_SECONDS,
+                        help="Segundos de pausa entre lotes")
+    parser.add_argument("--cutover", action="store_true",
+                        help="Ao terminar cada tenant, passa a busca dele para esta versão")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(reembed(parse_args()))
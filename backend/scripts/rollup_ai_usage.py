@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Script para gravar no Postgres (tabela ai_usage_daily) o consumo de tokens
+do LLM acumulado no Redis pelo UsageService.
+
+Os contadores do Redis expiram após AI_USAGE_RETENTION_DAYS; o rollup guarda
+o histórico por tenant, usuário e dia. É idempotente (upsert dos totais),
+então pode rodar periodicamente, por exemplo a cada hora via cron:
+
+    0 * * * * cd /app && python scripts/rollup_ai_usage.py
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import AsyncSessionLocal
+from app.services.usage_service import UsageService
+
+
+async def rollup(args):
+    today = datetime.now(timezone.utc).date()
+
+    print("=" * 70)
+    print(f" ROLLUP DO CONSUMO DE IA: últimos {args.days} dia(s)")
+    print("=" * 70)
+
+    async with AsyncSessionLocal() as db:
+        for offset in range(args.days):
+            day = today - timedelta(days=offset)
+            rows = await UsageService.rollup_day(db, day)
+            print(f"   ✓ {day.isoformat()}: {rows} linha(s)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Grava o consumo de tokens do Redis no Postgres")
+    parser.add_argument("--days", type=int, default=2,
+                        help="Dias a consolidar, a partir de hoje (padrão: hoje e ontem)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(rollup(parse_args()))
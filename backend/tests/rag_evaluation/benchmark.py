@@ -0,0 +1,269 @@
+"""
+Benchmark de desempenho do RAG
+
+Mede latência por etapa (p50/p95/p99), throughput e recall@k da busca
+vetorial em relação à busca exata. Com --provider fake roda sem acesso à
+API do Gemini, usando embeddings e respostas determinísticas locais com
+latência configurável.
+
+Exemplo:
+    python tests/rag_evaluation/benchmark.py --provider fake --seed \\
+        --embedding-latency-ms 30 --generation-latency-ms 800 \\
+        --concurrency 8 --requests 200
+
+Com --provider gemini e LLM_CASSETTE_MODE=replay, as respostas gravadas em
+LLM_CASSETTE_PATH são reproduzidas offline (LLM_REPLAY_LATENCY_MS ou
+LLM_REPLAY_USE_RECORDED_LATENCY controlam a latência simulada).
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Adicionar o diretório raiz ao PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import delete
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import start_server_timing, stop_server_timing
+from app.core.security import get_password_hash
+from app.models.base import Tenant, User
+from app.models.document import Document, DocumentChunk, DocumentPage
+from app.services.document_service import DocumentProcessor
+from app.services.llm_provider import FakeProvider, get_provider
+from app.services.rag_service import RAGService
+
+BENCHMARK_TENANT_ID = "benchmark-tenant"
+BENCHMARK_USER_ID = "benchmark-user"
+DATASET_PATH = Path(__file__).parent / "test_dataset.json"
+RESULTS_PATH = Path(__file__).parent.parent / "benchmark_results.json"
+
+FILLER_WORDS = (
+    "condômino assembleia síndico portaria garagem vaga elevador mudança obra "
+    "taxa rateio fundo reserva conselho fiscal ata edital convocação quórum "
+    "fachada interfone correspondência encomenda limpeza manutenção jardim "
+    "bicicletário academia brinquedoteca churrasqueira salão visitante"
+).split()
+
+
+def percentile(values: list, p: float) -> float:
+    """Percentil com interpolação linear (p entre 0 e 100)"""
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values: list) -> dict:
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 2) if values else 0.0,
+        "p50_ms": round(percentile(values, 50), 2),
+        "p95_ms": round(percentile(values, 95), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+    }
+
+
+async def seed_corpus(provider, test_cases: list, filler_chunks: int):
+    """Recria o tenant de benchmark com um documento sintético"""
+    rng = random.Random(7)
+    texts = [case["expected_answer"] for case in test_cases]
+    for idx in range(filler_chunks):
+        words = " ".join(rng.choice(FILLER_WORDS) for _ in range(60))
+        texts.append(f"Artigo {idx + 1}. {words}.")
+
+    embeddings = await provider.embed(texts, task_type="retrieval_document")
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(DocumentChunk).where(DocumentChunk.tenant_id == BENCHMARK_TENANT_ID))
+        await db.execute(delete(DocumentPage).where(DocumentPage.tenant_id == BENCHMARK_TENANT_ID))
+        await db.execute(delete(Document).where(Document.tenant_id == BENCHMARK_TENANT_ID))
+
+        if not await db.get(Tenant, BENCHMARK_TENANT_ID):
+            db.add(Tenant(id=BENCHMARK_TENANT_ID, name="Benchmark"))
+            await db.flush()
+        if not await db.get(User, BENCHMARK_USER_ID):
+            db.add(User(
+                id=BENCHMARK_USER_ID,
+                email="benchmark@sindicoai.local",
+                hashed_password=get_password_hash("benchmark"),
+                role="admin",
+                tenant_id=BENCHMARK_TENANT_ID
+            ))
+            await db.flush()
+
+        document = Document(
+            filename="regimento_benchmark.pdf",
+            file_size=sum(len(t) for t in texts),
+            status="completed",
+            tenant_id=BENCHMARK_TENANT_ID,
+            uploaded_by=BENCHMARK_USER_ID
+        )
+        db.add(document)
+        await db.flush()
+
+        db.add_all([
+            DocumentChunk(
+                chunk_text=chunk_text,
+                chunk_index=idx,
+                page_number=idx // 5 + 1,
+                embedding=embedding,
+                document_id=document.id,
+                tenant_id=BENCHMARK_TENANT_ID
+            )
+            for idx, (chunk_text, embedding) in enumerate(zip(texts, embeddings))
+        ])
+        await db.flush()
+        await DocumentProcessor(provider=provider).build_summary_embeddings(db, document)
+        await db.commit()
+
+    print(f"🌱 Corpus criado: {len(texts)} chunks no tenant {BENCHMARK_TENANT_ID}")
+
+
+async def measure_recall(rag: RAGService, tenant_id: str, questions: list, k: int) -> float:
+    """
+    Recall@k da busca usada pelo chat (índices e estágios hierárquicos) em
+    relação à busca exata em todos os chunks do tenant (sem o índice HNSW)
+    """
+    embeddings = await rag.generate_query_embeddings(questions, tenant_id)
+    recalls = []
+
+    async with AsyncSessionLocal() as db:
+        for embedding in embeddings:
+            approximate = await rag.search_similar_chunks(db, embedding, tenant_id, k)
+
+            exact = await rag.search_all_chunks(db, embedding, tenant_id, k, exact=True)
+
+            exact_ids = {row.id for row in exact}
+            if exact_ids:
+                found = len(exact_ids & {row.id for row in approximate})
+                recalls.append(found / len(exact_ids))
+
+    return sum(recalls) / len(recalls) if recalls else 0.0
+
+
+async def run_load(rag: RAGService, tenant_id: str, questions: list, total_requests: int,
+                   concurrency: int, k: int) -> dict:
+    """Executa total_requests perguntas com no máximo concurrency em paralelo"""
+    stage_samples = defaultdict(list)
+    errors = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(question: str):
+        async with semaphore:
+            timings, token = start_server_timing()
+            start = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    await rag.chat(db=db, question=question, tenant_id=tenant_id, max_chunks=k)
+            except Exception as e:
+                errors.append(str(e))
+                return
+            finally:
+                stop_server_timing(token)
+
+            stage_samples["total"].append((time.perf_counter() - start) * 1000)
+            for stage, elapsed_ms in timings:
+                stage_samples[stage].append(elapsed_ms)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        run_one(questions[idx % len(questions)])
+        for idx in range(total_requests)
+    ])
+    wall_seconds = time.perf_counter() - start
+
+    return {
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(stage_samples["total"]) / wall_seconds, 2) if wall_seconds else 0.0,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "stages": {stage: summarize(values) for stage, values in stage_samples.items()},
+    }
+
+
+async def benchmark(args):
+    with open(DATASET_PATH, "r", encoding="utf-8") as f:
+        test_cases = json.load(f)
+    questions = [case["question"] for case in test_cases]
+
+    if args.provider == "fake":
+        provider = FakeProvider(
+            embedding_latency_ms=args.embedding_latency_ms,
+            generation_latency_ms=args.generation_latency_ms,
+            jitter_ms=args.jitter_ms
+        )
+    else:
+        provider = get_provider(args.provider)
+
+    # Sem cache de embeddings: cada requisição mede a etapa de embedding
+    rag = RAGService(provider=provider, embedding_cache=False)
+    tenant_id = args.tenant_id or BENCHMARK_TENANT_ID
+
+    print("=" * 80)
+    print("⏱️  BENCHMARK DO SISTEMA RAG")
+    print("=" * 80)
+    print(f"Provedor: {args.provider} | Concorrência: {args.concurrency} | Requisições: {args.requests} | k: {args.k}")
+
+    if args.seed:
+        await seed_corpus(provider, test_cases, args.filler_chunks)
+
+    recall = await measure_recall(rag, tenant_id, questions, args.k)
+    load = await run_load(rag, tenant_id, questions, args.requests, args.concurrency, args.k)
+
+    results = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "provider": args.provider,
+            "tenant_id": tenant_id,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "k": args.k,
+            "embedding_latency_ms": args.embedding_latency_ms,
+            "generation_latency_ms": args.generation_latency_ms,
+            "jitter_ms": args.jitter_ms,
+        },
+        f"recall_at_{args.k}": round(recall, 4),
+        **load,
+    }
+
+    print(f"\n📈 Throughput: {results['throughput_rps']} req/s ({results['errors']} erros)")
+    print(f"🎯 Recall@{args.k} vs busca exata: {recall:.1%}")
+    for stage, summary in results["stages"].items():
+        print(f"   - {stage:<12} p50={summary['p50_ms']:>9.2f}ms  p95={summary['p95_ms']:>9.2f}ms  p99={summary['p99_ms']:>9.2f}ms")
+
+    output = Path(args.output)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+    print(f"\n💾 Resultados salvos em: {output}")
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de desempenho do RAG")
+    parser.add_argument("--provider", choices=["fake", "gemini"], default="fake")
+    parser.add_argument("--tenant-id", default=None, help="Tenant a consultar (padrão: tenant de benchmark)")
+    parser.add_argument("--seed", action="store_true", help="Recria o corpus sintético do tenant de benchmark")
+    parser.add_argument("--filler-chunks", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--embedding-latency-ms", type=float, default=0)
+    parser.add_argument("--generation-latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--output", default=str(RESULTS_PATH))
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark(parse_args()))
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.middleware.rate_limit import check_ai_budget
+from app.services.usage_service import UsageService, estimate_tokens, usage_cost
+
+
+def test_usage_cost_uses_per_million_token_prices(monkeypatch):
+    """Test that the estimated cost weights each token kind by its price"""
+    monkeypatch.setattr(settings, "AI_PRICE_PROMPT_PER_MTOK", 0.30)
+    monkeypatch.setattr(settings, "AI_PRICE_OUTPUT_PER_MTOK", 2.50)
+    monkeypatch.setattr(settings, "AI_PRICE_EMBEDDING_PER_MTOK", 0.15)
+
+    cost = usage_cost({"prompt_tokens": 1_000_000, "output_tokens": 200_000, "embedding_tokens": 2_000_000})
+
+    assert cost == pytest.approx(0.30 + 0.50 + 0.30)
+
+
+def test_estimate_tokens_counts_every_text():
+    """Test that embedding usage is estimated from the text length"""
+    assert estimate_tokens(["a" * 400, "ok"]) == 101
+
+
+def test_budget_blocks_tenant_over_monthly_limit(monkeypatch):
+    """Test that a tenant whose monthly spend reached its budget gets a 429"""
+    monkeypatch.setattr(settings, "AI_MONTHLY_BUDGET_USD", 0)
+    monkeypatch.setattr(settings, "AI_TENANT_MONTHLY_BUDGETS_USD", {"tenant-1": 5.0})
+    monkeypatch.setattr(UsageService, "get_month_usage", staticmethod(
+        lambda tenant_id: {"cost_usd": 5.2 if tenant_id == "tenant-1" else 100.0}
+    ))
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(check_ai_budget("tenant-1"))
+    assert exc_info.value.status_code == 429
+
+    # Sem orçamento configurado não há limite
+    asyncio.run(check_ai_budget("tenant-2"))
+
+
+def test_budget_check_fails_open_when_redis_is_down(monkeypatch):
+    """Test that a Redis failure does not block AI requests"""
+    monkeypatch.setattr(settings, "AI_MONTHLY_BUDGET_USD", 1.0)
+
+    def broken(tenant_id):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(UsageService, "get_month_usage", staticmethod(broken))
+
+    asyncio.run(check_ai_budget("tenant-1"))
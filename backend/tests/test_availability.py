@@ -0,0 +1,151 @@
+import asyncio
+import inspect
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from app.api.routes.common_areas import get_common_area_availability
+from app.core.database import get_db
+from app.services import availability_service
+from app.services.availability_service import AvailabilityService, day_window, free_intervals, split_slots
+
+TZ = ZoneInfo("America/Sao_Paulo")
+DAY = date(2030, 5, 10)
+
+
+def at(hour: int, minute: int = 0, day: date = DAY) -> datetime:
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=TZ)
+
+
+def make_area(opening="08:00", closing="22:00"):
+    return SimpleNamespace(id="area-1", tenant_id="t1", opening_time=opening, closing_time=closing, is_active=True)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.ttls.pop(key, None)
+
+    def pipeline(self, transaction=False):
+        return self
+
+    def execute(self):
+        pass
+
+
+class FakeDB:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    async def execute(self, query):
+        self.queries += 1
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+def test_free_intervals_sweeps_overlapping_and_out_of_window_reservations():
+    """Test that the sweep merges overlapping bookings and clips to the window"""
+    busy = [
+        (at(10), at(12)),
+        (at(7), at(9)),      # starts before opening
+        (at(11), at(13)),    # overlaps the first one
+        (at(21), at(23)),    # ends after closing
+    ]
+
+    assert free_intervals((at(8), at(22)), busy) == [(at(9), at(10)), (at(13), at(21))]
+    assert free_intervals((at(8), at(22)), []) == [(at(8), at(22))]
+    assert free_intervals((at(8), at(22)), [(at(6), at(23))]) == []
+
+
+def test_day_window_handles_overnight_and_missing_hours():
+    """Test that areas closing after midnight or without hours get the right window"""
+    assert day_window(make_area("18:00", "02:00"), DAY, TZ) == (at(18), at(2, day=DAY + timedelta(days=1)))
+    assert day_window(make_area(None, None), DAY, TZ) == (at(0), at(0, day=DAY + timedelta(days=1)))
+
+
+def test_split_slots_aligns_to_opening_time():
+    """Test that slots follow the opening-time grid and fit in the free time"""
+    slots = split_slots([(at(9, 30), at(12))], at(8), timedelta(hours=1))
+
+    assert slots == [(at(10), at(11)), (at(11), at(12))]
+
+
+def test_cached_days_skip_the_database(monkeypatch):
+    """Test that a second request for the same days is served from the cache"""
+    redis = FakeRedis()
+    monkeypatch.setattr(availability_service, "redis_client", redis)
+    db = FakeDB([(at(10), at(12))])
+    area = make_area()
+
+    first = asyncio.run(AvailabilityService.get_free_intervals(db, area, [DAY, DAY + timedelta(days=1)]))
+    second = asyncio.run(AvailabilityService.get_free_intervals(db, area, [DAY]))
+
+    assert db.queries == 1
+    assert first[DAY] == second[DAY] == [(at(8), at(10)), (at(12), at(22))]
+
+
+def test_each_cached_day_has_its_own_key_and_ttl(monkeypatch):
+    """Test that every (area, day) is cached under its own key with the configured TTL"""
+    redis = FakeRedis()
+    monkeypatch.setattr(availability_service, "redis_client", redis)
+    monkeypatch.setattr(availability_service.settings, "AVAILABILITY_CACHE_TTL", 300)
+    days = [DAY, DAY + timedelta(days=1)]
+
+    asyncio.run(AvailabilityService.get_free_intervals(FakeDB([]), make_area(), days))
+
+    assert redis.ttls == {AvailabilityService.cache_key("area-1", 0, day): 300 for day in days}
+
+
+def test_reservation_invalidates_its_days(monkeypatch):
+    """Test that booking drops the cached days the reservation touches"""
+    redis = FakeRedis()
+    monkeypatch.setattr(availability_service, "redis_client", redis)
+    for offset in range(-2, 3):
+        redis.set(AvailabilityService.cache_key("area-1", 0, DAY + timedelta(days=offset)), "[]", ex=300)
+
+    AvailabilityService.invalidate("area-1", at(23), at(1, day=DAY + timedelta(days=1)))
+
+    assert sorted(redis.values) == [
+        AvailabilityService.cache_key("area-1", 0, DAY - timedelta(days=2)),
+        AvailabilityService.cache_key("area-1", 0, DAY + timedelta(days=2)),
+    ]
+
+
+def test_area_update_orphans_every_cached_day(monkeypatch):
+    """Test that invalidating the area makes every cached day miss"""
+    redis = FakeRedis()
+    monkeypatch.setattr(availability_service, "redis_client", redis)
+    db = FakeDB([])
+    area = make_area()
+
+    asyncio.run(AvailabilityService.get_free_intervals(db, area, [DAY]))
+    AvailabilityService.invalidate_area("area-1")
+    asyncio.run(AvailabilityService.get_free_intervals(db, area, [DAY]))
+
+    assert db.queries == 2
+    assert AvailabilityService.cache_key("area-1", 1, DAY) in redis.values
+
+
+def test_availability_misses_are_computed_on_the_primary():
+    """Test that cached availability is never computed from the read replica"""
+    db_dependency = inspect.signature(get_common_area_availability).parameters["db"].default
+
+    assert db_dependency.dependency is get_db
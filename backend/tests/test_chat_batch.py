@@ -0,0 +1,150 @@
+import asyncio
+from collections import namedtuple
+from types import SimpleNamespace
+
+from app.api.routes import ai
+from app.schemas.document import BatchChatRequest
+from app.services import rag_service as rag_module
+from app.services.embedding_versions import get_embedding_version
+from app.services.llm_provider import FakeProvider
+from app.services.llm_resilience import LLMUnavailableError
+from app.services.llm_scheduler import BACKGROUND
+from app.services.rag_service import NO_DOCUMENTS_ANSWER, RAGService
+
+Chunk = namedtuple("Chunk", ["id", "chunk_text", "page_number", "filename", "similarity"])
+
+ADMIN = SimpleNamespace(id="admin-1", tenant_id="tenant-1")
+
+
+def _rag_with_chunks(monkeypatch, chunks_per_question):
+    """RAGService com busca e expansão substituídas por resultados fixos"""
+    rag = RAGService(provider=FakeProvider(), embedding_cache=False)
+
+    async def get_tenant_read_version(db, tenant_id):
+        return get_embedding_version("v1")
+
+    async def search_similar_chunks_batch(db, query_embeddings, tenant_id, max_results, version):
+        assert len(query_embeddings) == len(chunks_per_question)
+        return chunks_per_question
+
+    async def expand_with_neighbors(db, hits_per_query):
+        return hits_per_query
+
+    monkeypatch.setattr(rag_module, "get_tenant_read_version", get_tenant_read_version)
+    rag.search_similar_chunks_batch = search_similar_chunks_batch
+    rag.expand_with_neighbors = expand_with_neighbors
+    return rag
+
+
+def test_chat_batch_keeps_question_order(monkeypatch):
+    """Test that results follow the question order even when answers finish out of order"""
+    questions = ["piscina", "garagem", "mudança", "salão"]
+    chunks = [[Chunk(f"c{idx}", question, 1, "regimento.pdf", 0.9)] for idx, question in enumerate(questions)]
+    chunks[2] = []
+    rag = _rag_with_chunks(monkeypatch, chunks)
+
+    async def generate_answer(question, context_chunks, tenant_id, priority):
+        # A primeira pergunta termina por último
+        await asyncio.sleep(0.01 * (len(questions) - questions.index(question)))
+        if question == "salão":
+            raise LLMUnavailableError("circuit open")
+        return {"answer": f"resposta {question}", "sources": [{"filename": "regimento.pdf"}]}
+
+    rag.generate_answer = generate_answer
+
+    results = asyncio.run(rag.chat_batch(None, questions, "tenant-1", max_concurrency=4))
+
+    assert [result["question"] for result in results] == questions
+    assert results[0]["answer"] == "resposta piscina"
+    assert results[1]["answer"] == "resposta garagem"
+    assert results[2]["answer"] == NO_DOCUMENTS_ANSWER
+    assert results[3]["degraded"] is True
+    assert set(results[0]["timings_ms"]) == {"embedding", "search", "generation"}
+
+
+def test_chat_batch_respects_max_concurrency(monkeypatch):
+    """Test that no more than max_concurrency answers are generated at the same time"""
+    questions = [f"pergunta {idx}" for idx in range(7)]
+    rag = _rag_with_chunks(monkeypatch, [[Chunk(f"c{idx}", "texto", 1, "a.pdf", 0.9)] for idx in range(7)])
+    running = {"now": 0, "peak": 0}
+
+    async def generate_answer(question, context_chunks, tenant_id, priority):
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+        return {"answer": question, "sources": []}
+
+    rag.generate_answer = generate_answer
+
+    results = asyncio.run(rag.chat_batch(None, questions, "tenant-1", max_concurrency=2))
+
+    assert running["peak"] == 2
+    assert [result["answer"] for result in results] == questions
+
+
+def test_batch_route_mixes_cached_and_generated_answers(monkeypatch):
+    """Test that cached questions skip the pipeline and every result lands at its question index"""
+    questions = ["cacheada 1", "nova 1", "cacheada 2", "nova 2", "nova 3"]
+    cached_writes = []
+    batches = []
+
+    def get_cached_response(question, tenant_id, version=None):
+        if question.startswith("cacheada"):
+            return {"answer": f"cache {question}", "sources": []}
+        return None
+
+    def cache_response(question, tenant_id, response, ttl=3600, version=None):
+        cached_writes.append(question)
+
+    async def check_ai_budget(tenant_id):
+        pass
+
+    async def chat_batch(db, questions, tenant_id, max_chunks, max_concurrency, priority):
+        batches.append((questions, max_concurrency, priority))
+        return [
+            {"question": question, "answer": f"gerada {question}", "sources": [], "degraded": question == "nova 3"}
+            for question in questions
+        ]
+
+    monkeypatch.setattr(ai.CacheService, "get_document_set_version", staticmethod(lambda tenant_id: 1))
+    monkeypatch.setattr(ai.CacheService, "get_cached_response", staticmethod(get_cached_response))
+    monkeypatch.setattr(ai.CacheService, "cache_response", staticmethod(cache_response))
+    monkeypatch.setattr(ai, "check_ai_budget", check_ai_budget)
+    monkeypatch.setattr(ai.rag_service, "chat_batch", chat_batch)
+
+    request = BatchChatRequest(questions=questions, max_concurrency=3)
+    response = asyncio.run(ai.chat_batch(request, db=None, current_user=ADMIN))
+
+    assert batches == [(["nova 1", "nova 2", "nova 3"], 3, BACKGROUND)]
+    assert [result.question for result in response.results] == questions
+    assert [result.cached for result in response.results] == [True, False, True, False, False]
+    assert response.results[0].answer == "cache cacheada 1"
+    assert response.results[3].answer == "gerada nova 2"
+    # Respostas degradadas não vão para o cache
+    assert cached_writes == ["nova 1", "nova 2"]
+
+
+def test_batch_route_skips_pipeline_when_all_cached(monkeypatch):
+    """Test that a fully cached batch neither checks the AI budget nor calls the pipeline"""
+    calls = []
+
+    async def check_ai_budget(tenant_id):
+        calls.append("budget")
+
+    async def chat_batch(*args, **kwargs):
+        calls.append("pipeline")
+        return []
+
+    monkeypatch.setattr(ai.CacheService, "get_document_set_version", staticmethod(lambda tenant_id: 1))
+    monkeypatch.setattr(
+        ai.CacheService, "get_cached_response",
+        staticmethod(lambda question, tenant_id, version=None: {"answer": "ok", "sources": []})
+    )
+    monkeypatch.setattr(ai, "check_ai_budget", check_ai_budget)
+    monkeypatch.setattr(ai.rag_service, "chat_batch", chat_batch)
+
+    response = asyncio.run(ai.chat_batch(BatchChatRequest(questions=["a", "b"]), db=None, current_user=ADMIN))
+
+    assert calls == []
+    assert all(result.cached for result in response.results)
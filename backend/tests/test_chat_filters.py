@@ -0,0 +1,140 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.schemas.document import ChatFilters, ChatRequest
+from app.services.cache_service import CacheService
+from app.services.embedding_versions import get_embedding_version
+from app.services.llm_provider import FakeProvider
+from app.services.rag_service import RAGService, build_filter_sql
+
+
+def test_build_filter_sql_chunk_columns():
+    """Test that every filter becomes a bound condition on the chunk columns"""
+    after = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    sql, params = build_filter_sql(
+        {"document_ids": ["doc-1"], "document_type": "ata", "uploaded_after": after, "page_from": 2, "page_to": 4},
+        "dc.document_id", "dc.document_type", "dc.document_date", "dc.page_number"
+    )
+
+    assert sql == (
+        " AND dc.document_id = ANY(:filter_document_ids)"
+        " AND dc.document_type = :filter_document_type"
+        " AND dc.document_date >= :filter_uploaded_after"
+        " AND dc.page_number >= :filter_page_from"
+        " AND dc.page_number <= :filter_page_to"
+    )
+    assert params == {
+        "filter_document_ids": ["doc-1"],
+        "filter_document_type": "ata",
+        "filter_uploaded_after": after,
+        "filter_page_from": 2,
+        "filter_page_to": 4,
+    }
+
+
+def test_build_filter_sql_skips_filters_without_column():
+    """Test that filters are ignored when the queried table has no matching column"""
+    sql, params = build_filter_sql({"document_type": "ata", "page_from": 3}, page_column="dp.page_number")
+
+    assert sql == " AND dp.page_number >= :filter_page_from"
+    assert params == {"filter_page_from": 3}
+    assert build_filter_sql(None, "dc.document_id") == ("", {})
+
+
+def test_chat_filters_validation():
+    """Test that invalid filter ranges and document types are rejected"""
+    with pytest.raises(ValidationError):
+        ChatFilters(page_from=5, page_to=2)
+    with pytest.raises(ValidationError):
+        ChatFilters(document_type="boleto")
+
+    request = ChatRequest(question="Qual o horário da piscina?", filters={"document_type": "regimento"})
+    assert request.filters.model_dump(exclude_none=True) == {"document_type": "regimento"}
+
+
+def test_cache_key_includes_filters():
+    """Test that filtered and unfiltered answers never share a cache entry"""
+    question = "Qual o horário da piscina?"
+
+    plain = CacheService.get_cache_key(question, "tenant-1")
+    filtered = CacheService.get_cache_key(question, "tenant-1", {"document_type": "ata"})
+
+    assert plain != filtered
+    assert plain == CacheService.get_cache_key(question, "tenant-1", {})
+    assert filtered == CacheService.get_cache_key(question, "tenant-1", {"document_type": "ata"})
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeDB:
+    """Sessão que devolve as linhas de cada execute em sequência"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        return FakeResult(self.results.pop(0) if self.results else [])
+
+
+def test_index_scan_widened_without_filters(monkeypatch):
+    """Test that plain chat searches also widen the HNSW scan shared by all tenants"""
+    monkeypatch.setattr(settings, "RAG_HIERARCHICAL_RETRIEVAL", False)
+    db = FakeDB()
+    rag = RAGService(provider=FakeProvider(), embedding_cache=False)
+
+    async def search_all_chunks(*args):
+        return []
+
+    rag.search_all_chunks = search_all_chunks
+    asyncio.run(rag.search_similar_chunks(db, [0.0], "tenant-1", 5))
+
+    assert "hnsw.ef_search" in db.statements[0]
+
+
+def test_short_approximate_search_falls_back_to_exact():
+    """Test that fewer than max_results chunks from the shared index triggers an exact search"""
+    exact_rows = [f"chunk-{idx}" for idx in range(3)]
+    db = FakeDB(["chunk-0"], exact_rows)
+    rag = RAGService(provider=FakeProvider(), embedding_cache=False)
+
+    chunks = asyncio.run(rag.search_all_chunks(db, [0.0], "tenant-1", 3))
+
+    assert chunks == exact_rows
+    assert "MATERIALIZED" not in db.statements[0]
+    assert "tenant_chunks AS MATERIALIZED" in db.statements[1]
+
+
+def test_full_approximate_search_is_kept():
+    """Test that the exact search does not run when the index returns max_results chunks"""
+    db = FakeDB(["chunk-0", "chunk-1"])
+    rag = RAGService(provider=FakeProvider(), embedding_cache=False)
+
+    chunks = asyncio.run(rag.search_all_chunks(db, [0.0], "tenant-1", 2))
+
+    assert chunks == ["chunk-0", "chunk-1"]
+    assert len(db.statements) == 1
+
+
+def test_index_searches_skip_chunks_without_the_version_vector():
+    """Test that flat and batch searches on v2 never rank chunks missing embedding_v2 (NULL similarity)"""
+    db = FakeDB(["chunk-0"])
+    rag = RAGService(provider=FakeProvider(), embedding_cache=False)
+    v2 = get_embedding_version("v2")
+
+    asyncio.run(rag.search_all_chunks(db, [0.0], "tenant-1", 1, version=v2))
+    asyncio.run(rag._search_batch(db, [[0.0]], "tenant-1", 1, v2))
+
+    assert len(db.statements) == 2
+    assert all("dc.embedding_v2 IS NOT NULL" in statement for statement in db.statements)
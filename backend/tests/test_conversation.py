@@ -0,0 +1,83 @@
+import asyncio
+from collections import namedtuple
+
+from app.services.conversation_service import ConversationService
+from app.services.llm_provider import FakeProvider
+from app.services.rag_service import RAGService
+
+Chunk = namedtuple("Chunk", ["id", "chunk_text", "page_number", "filename", "similarity"])
+
+
+def _session_with_turns(count: int) -> dict:
+    session = ConversationService.create_session("tenant-1", "user-1")
+    for idx in range(count):
+        ConversationService.add_turn(session, f"pergunta {idx}", f"resposta {idx}", [f"chunk-{idx}"])
+    return session
+
+
+def test_add_turn_keeps_rolling_window():
+    """Test that only the most recent turns and chunk ids are kept"""
+    session = _session_with_turns(20)
+
+    assert len(session["turns"]) == 6
+    assert session["turns"][-1]["question"] == "pergunta 19"
+    assert session["chunk_ids"][0] == "chunk-19"
+    assert len(session["chunk_ids"]) == 10
+
+
+def test_format_history_respects_token_cap():
+    """Test that the history keeps the newest turns that fit in the budget"""
+    session = _session_with_turns(3)
+
+    full = ConversationService.format_history(session, max_tokens=1000)
+    assert full.startswith("Morador: pergunta 0")
+
+    short = ConversationService.format_history(session, max_tokens=12)
+    assert short == "Morador: pergunta 2\nAssistente: resposta 2"
+    assert ConversationService.format_history(None) == ""
+
+
+def test_chunks_not_reused_when_filters_change():
+    """Test that previously retrieved chunks are only reused under the same filters"""
+    session = _session_with_turns(1)
+
+    assert ConversationService.reusable_chunk_ids(session) == ["chunk-0"]
+    assert ConversationService.reusable_chunk_ids(session, {"document_type": "ata"}) == []
+    assert ConversationService.retrieval_query(session, "e aos domingos?") == "pergunta 0 e aos domingos?"
+
+
+def test_follow_up_reuses_close_chunks_without_search():
+    """Test that a follow-up close to the previous context skips the vector search"""
+    rag = RAGService(provider=FakeProvider(), embedding_cache=False)
+    searches = []
+
+    async def get_chunks_by_ids(*args):
+        return [Chunk("a", "piscina", 1, "regimento.pdf", 0.9)]
+
+    async def search_similar_chunks(*args, **kwargs):
+        searches.append(args)
+        return [Chunk("b", "domingos", 2, "regimento.pdf", 0.8)]
+
+    rag.get_chunks_by_ids = get_chunks_by_ids
+    rag.search_similar_chunks = search_similar_chunks
+
+    chunks = asyncio.run(rag.retrieve_for_conversation(None, [0.0], "tenant-1", 5, ["a"]))
+    assert [chunk.id for chunk in chunks] == ["a"]
+    assert searches == []
+
+
+def test_follow_up_extends_distant_context():
+    """Test that a distant follow-up merges new search results with the previous chunks"""
+    rag = RAGService(provider=FakeProvider(), embedding_cache=False)
+
+    async def get_chunks_by_ids(*args):
+        return [Chunk("a", "piscina", 1, "regimento.pdf", 0.3)]
+
+    async def search_similar_chunks(*args, **kwargs):
+        return [Chunk("b", "garagem", 4, "regimento.pdf", 0.8), Chunk("a", "piscina", 1, "regimento.pdf", 0.3)]
+
+    rag.get_chunks_by_ids = get_chunks_by_ids
+    rag.search_similar_chunks = search_similar_chunks
+
+    chunks = asyncio.run(rag.retrieve_for_conversation(None, [0.0], "tenant-1", 5, ["a"]))
+    assert [chunk.id for chunk in chunks] == ["b", "a"]
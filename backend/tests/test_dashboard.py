@@ -0,0 +1,57 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.api.routes.dashboard import get_dashboard_metrics, metrics_queries
+
+ADMIN = SimpleNamespace(id="admin-1", tenant_id="tenant-1", role="admin")
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def one(self):
+        return SimpleNamespace(_mapping=self.row)
+
+
+class FakeDB:
+    def __init__(self, *rows):
+        self.rows = list(rows)
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.rows.pop(0))
+
+
+def test_metrics_are_counted_in_the_database():
+    """Test that dashboard totals are aggregate queries scoped to the tenant"""
+    queries = metrics_queries("tenant-1", datetime(2025, 6, 8, tzinfo=timezone.utc))
+    compiled = [str(query.compile(dialect=postgresql.dialect())) for query in queries]
+
+    assert all("count(*)" in sql for sql in compiled)
+    assert all("tenant_id = %(tenant_id_1)s" in sql for sql in compiled)
+    assert "FILTER (WHERE users.role = " in compiled[0]
+    assert "FILTER (WHERE users.created_at > " in compiled[0]
+    assert "FILTER (WHERE reservations.status IN " in compiled[1]
+    assert all("LIMIT" not in sql for sql in compiled)
+
+
+def test_metrics_route_merges_the_counts():
+    """Test that the route returns the counts of the three tables as one response"""
+    db = FakeDB(
+        {"total_users": 120, "total_residents": 100, "total_staff": 15, "total_admins": 5, "recent_users": 3},
+        {"total_reservations": 340, "active_reservations": 42},
+        {"total_areas": 6},
+    )
+
+    metrics = asyncio.run(get_dashboard_metrics(db=db, current_user=ADMIN))
+
+    assert metrics.total_users == 120
+    assert metrics.total_residents == 100
+    assert metrics.active_reservations == 42
+    assert metrics.total_areas == 6
+    assert len(db.statements) == 3
@@ -0,0 +1,22 @@
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.core.database import DATABASE_URL, InstrumentedPool, create_engine_from_settings, engine
+
+
+def test_engine_uses_settings_profile():
+    """Test that the application engine is built from the DB_* settings"""
+    pool = engine.sync_engine.pool
+
+    assert isinstance(pool, InstrumentedPool)
+    assert pool.size() == settings.DB_POOL_SIZE
+    assert pool._pre_ping == settings.DB_POOL_PRE_PING
+    assert engine.echo == settings.DB_ECHO
+
+
+def test_engine_exports_pool_capacity_metric():
+    """Test that each engine reports its pool capacity under its own label"""
+    create_engine_from_settings(DATABASE_URL, label="test_engine", pool_size=3, max_overflow=2)
+
+    assert REGISTRY.get_sample_value("sindicoai_db_pool_capacity", {"engine": "test_engine"}) == 5
+    assert REGISTRY.get_sample_value("sindicoai_db_pool_connections_in_use", {"engine": "test_engine"}) == 0
@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services import document_service
+from app.services.document_service import DocumentProcessor
+from app.services.embedding_versions import EMBEDDING_VERSIONS, get_embedding_version
+from app.services.llm_provider import FakeProvider
+
+
+def test_versions_use_distinct_columns():
+    """Test that each embedding version writes to its own columns"""
+    for attribute in ("chunk_column", "document_column", "page_column"):
+        columns = [getattr(version, attribute) for version in EMBEDDING_VERSIONS.values()]
+        assert len(set(columns)) == len(columns)
+
+    assert get_embedding_version().name == "v1"
+    with pytest.raises(ValueError):
+        get_embedding_version("v9")
+
+
+def test_fake_provider_models_have_separate_spaces():
+    """Test that another embedding model yields different vectors for the same text"""
+    provider = FakeProvider()
+    text = ["Qual o horário da piscina?"]
+
+    default = asyncio.run(provider.embed(text, task_type="retrieval_query"))
+    same = asyncio.run(provider.embed(text, task_type="retrieval_query", model=provider.embedding_model))
+    other = asyncio.run(provider.embed(text, task_type="retrieval_query", model="models/gemini-embedding-001"))
+
+    assert default == same
+    assert default != other
+
+
+class FakeSession:
+    def __init__(self):
+        self.added = []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def commit(self):
+        pass
+
+    async def flush(self):
+        pass
+
+
+def test_ingestion_embeds_all_chunks_in_one_call_per_version(monkeypatch):
+    """Test that process_document embeds every chunk with a single batched call per write version"""
+    monkeypatch.setattr(settings, "EMBEDDING_WRITE_VERSIONS", ["v1", "v2"])
+    monkeypatch.setattr(document_service.CacheService, "bump_document_set_version", staticmethod(lambda tenant_id: 1))
+    processor = DocumentProcessor(provider=FakeProvider())
+    calls = []
+
+    async def extract_text_from_pdf(pdf_path):
+        return {1: "Horário da piscina. " * 40, 2: "Vagas da garagem. " * 40}
+
+    async def generate_embeddings(texts, tenant_id, version):
+        calls.append((len(texts), version.name))
+        return [[float(idx)] for idx in range(len(texts))]
+
+    async def build_summary_embeddings(db, document):
+        pass
+
+    processor.extract_text_from_pdf = extract_text_from_pdf
+    processor.generate_embeddings = generate_embeddings
+    processor.build_summary_embeddings = build_summary_embeddings
+
+    db = FakeSession()
+    document = SimpleNamespace(
+        id="doc-1", tenant_id="tenant-1", document_type="regimento", upload_date=None, status="processing"
+    )
+    asyncio.run(processor.process_document(db, document, "regimento.pdf"))
+
+    chunks = db.added
+    assert document.status == "completed"
+    assert len(chunks) > 2
+    assert calls == [(len(chunks), "v1"), (len(chunks), "v2")]
+    assert [chunk.embedding for chunk in chunks] == [[float(idx)] for idx in range(len(chunks))]
+    assert chunks[-1].embedding_v2 == [float(len(chunks) - 1)]
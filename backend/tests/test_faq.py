@@ -0,0 +1,94 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.api.routes import ai
+from app.services import cache_service
+from app.services.cache_service import CacheService
+from app.services.faq_service import FAQService
+from app.services.suggest_service import SuggestService
+
+
+def test_cache_key_changes_with_document_set_version():
+    """Test that a new document set version makes previous answers unreachable"""
+    question = "Qual o horário da piscina?"
+
+    assert CacheService.get_cache_key(question, "tenant-1", version=1) != \
+        CacheService.get_cache_key(question, "tenant-1", version=2)
+    assert CacheService.get_cache_key(question, "tenant-1") == \
+        CacheService.get_cache_key(question, "tenant-1", version=0)
+
+
+def test_faq_questions_merge_configured_and_frequent(monkeypatch):
+    """Test that configured FAQ questions come first and duplicates are dropped"""
+    monkeypatch.setattr(FAQService, "get_faq", staticmethod(lambda tenant_id: [
+        {"question": "Qual o horário da piscina?", "expected_answer": "8h às 22h", "context_should_contain": []},
+        {"question": "Posso ter animais de estimação?"},
+    ]))
+    monkeypatch.setattr(SuggestService, "top_questions", staticmethod(lambda tenant_id, limit: [
+        "qual o horario da piscina",
+        "Quanto custa o salão de festas?",
+    ]))
+
+    assert FAQService.get_questions("tenant-1") == [
+        "Qual o horário da piscina?",
+        "Posso ter animais de estimação?",
+        "Quanto custa o salão de festas?",
+    ]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+        self.ttls = {}
+
+    def pipeline(self, transaction=False):
+        return self
+
+    def execute(self):
+        pass
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return int(self.values[key])
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def expire(self, key, ttl, nx=False, gt=False):
+        if (nx and key not in self.ttls) or (gt and ttl > self.ttls.get(key, 0)):
+            self.ttls[key] = ttl
+
+    def delete(self, *keys):
+        deleted = 0
+        for key in keys:
+            deleted += int(self.values.pop(key, None) is not None or self.sets.pop(key, None) is not None)
+        return deleted
+
+
+def test_invalidate_cache_reports_deleted_entries(monkeypatch):
+    """Test that invalidating deletes the current version's answers and the route reports how many"""
+    redis = FakeRedis()
+    monkeypatch.setattr(cache_service, "redis_client", redis)
+    answer = {"answer": "8h às 22h", "sources": []}
+
+    CacheService.cache_response("Qual o horário da piscina?", "tenant-1", answer, ttl=3600)
+    CacheService.cache_response("Posso ter pets?", "tenant-1", answer, ttl=86400)
+    CacheService.cache_response("Qual o horário da piscina?", "tenant-2", answer)
+    assert redis.ttls[CacheService.get_entries_key("tenant-1", 0)] == 86400
+
+    response = asyncio.run(ai.invalidate_cache(current_user=SimpleNamespace(tenant_id="tenant-1")))
+
+    assert response["deleted_entries"] == 2
+    assert response["document_set_version"] == 1
+    assert CacheService.get_cached_response("Posso ter pets?", "tenant-1") is None
+    assert CacheService.get_cached_response("Qual o horário da piscina?", "tenant-2") == answer
@@ -0,0 +1,62 @@
+import asyncio
+from collections import namedtuple
+
+from app.core.config import settings
+from app.services.llm_provider import FakeProvider
+from app.services.rag_service import RAGService
+
+Chunk = namedtuple("Chunk", ["id", "chunk_text", "page_number", "filename", "similarity"])
+
+
+def _rag_with_searches(hierarchical_result):
+    """RAGService com as duas buscas substituídas; registra quais rodaram"""
+    rag = RAGService(provider=FakeProvider(), embedding_cache=False)
+    calls = []
+
+    async def widen_index_scan(db):
+        pass
+
+    async def search_chunks_hierarchical(*args):
+        calls.append("hierarchical")
+        return hierarchical_result
+
+    async def search_all_chunks(*args):
+        calls.append("flat")
+        return [Chunk("flat", "texto", 1, "a.pdf", 0.5)]
+
+    rag.widen_index_scan = widen_index_scan
+    rag.search_chunks_hierarchical = search_chunks_hierarchical
+    rag.search_all_chunks = search_all_chunks
+    return rag, calls
+
+
+def test_falls_back_to_flat_search_without_summaries(monkeypatch):
+    """Test that an empty hierarchical search (no summary embeddings) falls back to the flat search"""
+    monkeypatch.setattr(settings, "RAG_HIERARCHICAL_RETRIEVAL", True)
+    rag, calls = _rag_with_searches([])
+
+    chunks = asyncio.run(rag.search_similar_chunks(None, [0.0], "tenant-1", 5))
+
+    assert calls == ["hierarchical", "flat"]
+    assert [chunk.id for chunk in chunks] == ["flat"]
+
+
+def test_hierarchical_results_skip_flat_search(monkeypatch):
+    """Test that the flat search does not run when the hierarchical search finds chunks"""
+    monkeypatch.setattr(settings, "RAG_HIERARCHICAL_RETRIEVAL", True)
+    rag, calls = _rag_with_searches([Chunk("page-hit", "texto", 2, "a.pdf", 0.8)])
+
+    chunks = asyncio.run(rag.search_similar_chunks(None, [0.0], "tenant-1", 5))
+
+    assert calls == ["hierarchical"]
+    assert [chunk.id for chunk in chunks] == ["page-hit"]
+
+
+def test_flat_search_when_hierarchical_disabled(monkeypatch):
+    """Test that RAG_HIERARCHICAL_RETRIEVAL=False goes straight to the flat search"""
+    monkeypatch.setattr(settings, "RAG_HIERARCHICAL_RETRIEVAL", False)
+    rag, calls = _rag_with_searches([Chunk("page-hit", "texto", 2, "a.pdf", 0.8)])
+
+    asyncio.run(rag.search_similar_chunks(None, [0.0], "tenant-1", 5))
+
+    assert calls == ["flat"]
@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.llm_cassette import CassetteMissError, CassetteProvider
+from app.services.llm_provider import FakeProvider
+
+
+def _offline_provider() -> FakeProvider:
+    """Fake provider whose calls fail, to prove replay never reaches it"""
+    provider = FakeProvider()
+
+    async def unavailable(*args, **kwargs):
+        raise AssertionError("provider called during replay")
+
+    provider.embed = unavailable
+    provider.generate = unavailable
+    return provider
+
+
+def test_record_then_replay_offline(tmp_path):
+    """Test that recorded calls replay identically without the real provider"""
+    path = tmp_path / "cassette.json"
+    recorder = CassetteProvider(FakeProvider(), str(path), mode="record")
+
+    embeddings = asyncio.run(recorder.embed(["piscina", "salão"], task_type="retrieval_query"))
+    answer = asyncio.run(recorder.generate("Qual o horário da piscina?"))
+
+    player = CassetteProvider(_offline_provider(), str(path), mode="replay")
+
+    # Lotes diferentes da gravação: embeddings são gravados por texto
+    assert asyncio.run(player.embed(["salão"], task_type="retrieval_query")) == embeddings[1:]
+    assert asyncio.run(player.embed(["piscina", "salão"], task_type="retrieval_query")) == embeddings
+    assert asyncio.run(player.generate("Qual o horário da piscina?")) == answer
+
+
+def test_replay_miss_raises(tmp_path):
+    """Test that unrecorded calls fail loudly in replay mode"""
+    path = tmp_path / "cassette.json"
+    recorder = CassetteProvider(FakeProvider(), str(path), mode="record")
+    asyncio.run(recorder.generate("pergunta gravada"))
+
+    player = CassetteProvider(_offline_provider(), str(path), mode="replay")
+
+    with pytest.raises(CassetteMissError):
+        asyncio.run(player.generate("pergunta nova"))
+    with pytest.raises(CassetteMissError):
+        asyncio.run(player.embed(["pergunta nova"], task_type="retrieval_query"))
+
+
+def test_auto_mode_records_only_misses(tmp_path):
+    """Test that auto mode calls the provider only for unrecorded requests"""
+    path = tmp_path / "cassette.json"
+    provider = FakeProvider()
+    calls = []
+    original_embed = provider.embed
+
+    async def counting_embed(texts, task_type, **kwargs):
+        calls.append(list(texts))
+        return await original_embed(texts, task_type, **kwargs)
+
+    provider.embed = counting_embed
+    cassette = CassetteProvider(provider, str(path), mode="auto")
+
+    asyncio.run(cassette.embed(["a", "b"], task_type="retrieval_query"))
+    asyncio.run(cassette.embed(["a", "b", "c"], task_type="retrieval_query"))
+
+    assert calls == [["a", "b"], ["c"]]
+
+
+def test_replay_simulated_latency(tmp_path):
+    """Test that replay applies the configured latency"""
+    path = tmp_path / "cassette.json"
+    asyncio.run(CassetteProvider(FakeProvider(), str(path), mode="record").generate("oi"))
+
+    player = CassetteProvider(_offline_provider(), str(path), mode="replay", replay_latency_ms=50)
+
+    start = time.perf_counter()
+    asyncio.run(player.generate("oi"))
+    assert time.perf_counter() - start >= 0.05
+
+
+def test_replay_requires_existing_cassette(tmp_path):
+    """Test that replay mode refuses to start without a cassette"""
+    with pytest.raises(FileNotFoundError):
+        CassetteProvider(None, str(tmp_path / "missing.json"), mode="replay")
@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+from app.services.llm_provider import FakeProvider
+
+
+def _cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def test_fake_embeddings_are_deterministic_and_normalized():
+    """Test that the fake provider returns stable unit vectors"""
+    first = FakeProvider().embed_text("Qual o horário da piscina?")
+    second = FakeProvider().embed_text("Qual o horário da piscina?")
+
+    assert first == second
+    assert len(first) == 768
+    assert abs(_cosine(first, first) - 1.0) < 1e-9
+
+
+def test_fake_embeddings_rank_related_text_higher():
+    """Test that overlapping vocabulary yields higher similarity"""
+    provider = FakeProvider()
+    query = provider.embed_text("horário da piscina")
+    related = provider.embed_text("A piscina funciona das 8h às 22h, horário de verão")
+    unrelated = provider.embed_text("Multa por barulho na garagem")
+
+    assert _cosine(query, related) > _cosine(query, unrelated)
+
+
+def test_fake_generation_uses_context_and_reports_usage():
+    """Test that the fake answer comes from the prompt context"""
+    provider = FakeProvider()
+    prompt = "CONTEXTO DOS DOCUMENTOS:\nA piscina abre às 8h.\n\nPERGUNTA DO USUÁRIO:\nQuando abre?"
+
+    result = asyncio.run(provider.generate(prompt))
+
+    assert "A piscina abre às 8h." in result.text
+    assert result.prompt_tokens > 0
+    assert result.output_tokens > 0
+
+
+def test_fake_provider_simulates_latency():
+    """Test that configured latency is applied per call"""
+    provider = FakeProvider(embedding_latency_ms=50)
+
+    start = time.perf_counter()
+    asyncio.run(provider.embed(["a", "b", "c"], task_type="retrieval_query"))
+
+    assert time.perf_counter() - start >= 0.05
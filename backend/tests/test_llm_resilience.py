@@ -0,0 +1,175 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services import llm_resilience
+from app.services.llm_resilience import (
+    GENERATION,
+    CircuitBreaker,
+    LLMQueueTimeoutError,
+    LLMTimeoutError,
+    call_llm,
+    hedged,
+)
+from app.services.llm_scheduler import LLMScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_circuit_opens_after_consecutive_failures():
+    """Test that the breaker rejects calls after the failure threshold"""
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30, clock=FakeClock())
+
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "closed"
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_success_resets_failure_count():
+    """Test that a success between failures keeps the circuit closed"""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30, clock=FakeClock())
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == "closed"
+
+
+def test_half_open_allows_single_probe():
+    """Test that after the reset timeout only one probe call goes through"""
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 31
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_failed_probe_reopens_circuit():
+    """Test that a failing probe keeps the provider marked unhealthy"""
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 31
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_hedged_returns_fast_second_attempt():
+    """Test that a slow first attempt is overtaken by the hedge"""
+    delays = [1.0, 0.01]
+
+    async def call():
+        delay = delays.pop(0)
+        await asyncio.sleep(delay)
+        return delay
+
+    start = time.perf_counter()
+    result = asyncio.run(hedged(call, delay=0.02))
+
+    assert result == 0.01
+    assert time.perf_counter() - start < 0.5
+
+
+def test_hedged_retries_fast_failure():
+    """Test that an attempt failing before the hedge delay is retried"""
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("transient")
+        return "ok"
+
+    assert asyncio.run(hedged(call, delay=1.0)) == "ok"
+    assert len(attempts) == 2
+
+
+def test_hedged_raises_when_all_attempts_fail():
+    """Test that the last error is raised when every attempt fails"""
+    async def call():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(hedged(call, delay=0.01))
+
+
+def _isolated_call_llm(monkeypatch, deadline: float):
+    """call_llm com um scheduler de uma vaga e um breaker próprios"""
+    scheduler = LLMScheduler(max_concurrency=1)
+    breaker = CircuitBreaker("generation", failure_threshold=1, reset_timeout=30)
+    monkeypatch.setattr(llm_resilience, "llm_scheduler", scheduler)
+    monkeypatch.setitem(llm_resilience._breakers, "generation", breaker)
+    monkeypatch.setitem(llm_resilience._deadlines, GENERATION, deadline)
+    return scheduler, breaker
+
+
+def test_deadline_covers_waiting_for_a_slot(monkeypatch):
+    """Test that the call deadline also bounds the wait for a scheduler slot"""
+    scheduler, breaker = _isolated_call_llm(monkeypatch, deadline=0.05)
+    calls = []
+
+    async def fn():
+        calls.append("called")
+        return "ok"
+
+    async def run():
+        await scheduler.acquire("tenant-1")  # Ocupa a única vaga
+        start = time.perf_counter()
+        with pytest.raises(LLMQueueTimeoutError):
+            await call_llm(GENERATION, fn, "tenant-2")
+        elapsed = time.perf_counter() - start
+        scheduler.release()
+        return elapsed
+
+    elapsed = asyncio.run(run())
+
+    assert elapsed < 0.5
+    assert calls == []
+    # Fila cheia não é falha do provedor, e a vaga não fica presa
+    assert breaker.state == "closed"
+    assert scheduler.stats()["in_flight"] == 0
+
+
+def test_deadline_counts_queue_wait_and_provider_time(monkeypatch):
+    """Test that time spent queued is deducted from the provider call deadline"""
+    scheduler, breaker = _isolated_call_llm(monkeypatch, deadline=0.1)
+
+    async def slow():
+        await asyncio.sleep(0.08)
+        return "ok"
+
+    async def run():
+        await scheduler.acquire("tenant-1")
+        asyncio.get_running_loop().call_later(0.05, scheduler.release)
+        with pytest.raises(LLMTimeoutError) as error:
+            await call_llm(GENERATION, slow, "tenant-2")
+        return error.value
+
+    error = asyncio.run(run())
+
+    assert not isinstance(error, LLMQueueTimeoutError)
+    assert breaker.state == "open"
+    assert scheduler.stats()["in_flight"] == 0
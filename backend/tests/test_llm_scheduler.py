@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from app.services.llm_scheduler import BACKGROUND, INTERACTIVE, LLMScheduler
+
+
+async def _run(scheduler, jobs):
+    """Run (tenant, priority) jobs and return the order they were admitted"""
+    admitted = []
+    gate = asyncio.Event()
+
+    async def blocker():
+        async with scheduler.slot("blocker"):
+            await gate.wait()
+
+    async def job(tenant_id, priority, label):
+        async with scheduler.slot(tenant_id, priority):
+            admitted.append(label)
+            await asyncio.sleep(0)
+
+    # Ocupa a única vaga para que todos os jobs entrem na fila
+    holder = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+
+    tasks = []
+    for tenant_id, priority, label in jobs:
+        tasks.append(asyncio.create_task(job(tenant_id, priority, label)))
+        await asyncio.sleep(0)
+
+    gate.set()
+    await asyncio.gather(holder, *tasks)
+    return admitted
+
+
+def test_global_concurrency_cap():
+    """Test that no more than max_concurrency calls run at once"""
+    scheduler = LLMScheduler(max_concurrency=3)
+    running = 0
+    peak = 0
+
+    async def job(idx):
+        nonlocal running, peak
+        async with scheduler.slot(f"tenant-{idx % 2}"):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    async def main():
+        await asyncio.gather(*[job(idx) for idx in range(12)])
+
+    asyncio.run(main())
+    assert peak == 3
+    assert scheduler.stats()["in_flight"] == 0
+
+
+def test_fair_queuing_across_tenants():
+    """Test that a tenant with a backlog does not starve another tenant"""
+    scheduler = LLMScheduler(max_concurrency=1)
+    jobs = [("noisy", INTERACTIVE, f"noisy-{idx}") for idx in range(6)]
+    jobs += [("quiet", INTERACTIVE, "quiet-0"), ("quiet", INTERACTIVE, "quiet-1")]
+
+    admitted = asyncio.run(_run(scheduler, jobs))
+
+    assert admitted.index("quiet-0") <= 1
+    assert admitted.index("quiet-1") <= 3
+
+
+def test_tenant_weights():
+    """Test that a heavier tenant gets proportionally more turns"""
+    scheduler = LLMScheduler(max_concurrency=1, tenant_weights={"premium": 2.0})
+    jobs = [("basic", INTERACTIVE, f"basic-{idx}") for idx in range(4)]
+    jobs += [("premium", INTERACTIVE, f"premium-{idx}") for idx in range(4)]
+
+    admitted = asyncio.run(_run(scheduler, jobs))
+
+    assert sum(label.startswith("premium") for label in admitted[:6]) == 4
+
+
+def test_interactive_before_background():
+    """Test that chat calls are admitted ahead of queued ingestion"""
+    scheduler = LLMScheduler(max_concurrency=1)
+    jobs = [("tenant-a", BACKGROUND, f"ingest-{idx}") for idx in range(3)]
+    jobs += [("tenant-b", INTERACTIVE, "chat")]
+
+    admitted = asyncio.run(_run(scheduler, jobs))
+
+    assert admitted[0] == "chat"
+
+
+def test_cancelled_waiter_releases_queue():
+    """Test that a cancelled waiter neither holds a slot nor blocks the queue"""
+    scheduler = LLMScheduler(max_concurrency=1)
+
+    async def main():
+        await scheduler.acquire("tenant-a")
+        waiter = asyncio.create_task(scheduler.acquire("tenant-b"))
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queued"] == 1
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        scheduler.release()
+        await asyncio.wait_for(scheduler.acquire("tenant-c"), timeout=1)
+        scheduler.release()
+        return scheduler.stats()
+
+    stats = asyncio.run(main())
+    assert stats["in_flight"] == 0
+    assert stats["queued"] == 0
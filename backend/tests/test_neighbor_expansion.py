@@ -0,0 +1,85 @@
+from collections import namedtuple
+
+from app.services.document_service import DocumentProcessor
+from app.services.llm_provider import FakeProvider
+from app.services.rag_service import merge_neighbor_chunks, trim_overlap
+
+Hit = namedtuple("Hit", ["id", "chunk_text", "page_number", "filename", "similarity"])
+Neighbor = namedtuple("Neighbor", ["hit_id", "id", "document_id", "chunk_index", "chunk_text", "page_number"])
+
+
+def _window(hit_id: str, document_id: str, center: int, indexes: range) -> list:
+    return [
+        Neighbor(hit_id, f"{document_id}-{idx}" if idx != center else hit_id, document_id, idx, f"texto {idx}", 1)
+        for idx in indexes
+    ]
+
+
+def test_hit_is_expanded_with_neighbors():
+    """Test that a hit becomes a passage with the chunks around it"""
+    hits = [Hit("h1", "texto 5", 1, "regimento.pdf", 0.9)]
+    neighbors = _window("h1", "doc", 5, range(4, 7))
+
+    [passage] = merge_neighbor_chunks(hits, neighbors)
+
+    assert passage.id == "h1"
+    assert passage.chunk_text == "texto 4\ntexto 5\ntexto 6"
+    assert passage.similarity == 0.9
+
+
+def test_adjacent_hits_are_merged_without_repeating_text():
+    """Test that overlapping windows become one passage scored by the best hit"""
+    hits = [
+        Hit("h1", "texto 5", 1, "regimento.pdf", 0.7),
+        Hit("h2", "texto 6", 2, "regimento.pdf", 0.9),
+        Hit("h3", "texto 20", 4, "regimento.pdf", 0.8),
+    ]
+    neighbors = (
+        _window("h1", "doc", 5, range(4, 7))
+        + _window("h2", "doc", 6, range(5, 8))
+        + _window("h3", "doc", 20, range(19, 22))
+    )
+
+    passages = merge_neighbor_chunks(hits, neighbors)
+
+    assert [passage.id for passage in passages] == ["h2", "h3"]
+    assert passages[0].chunk_text == "texto 4\ntexto 5\ntexto 6\ntexto 7"
+    assert passages[0].page_number == 2
+
+
+def test_hits_without_neighbor_rows_are_kept():
+    """Test that hits missing from the neighbor query are passed through"""
+    hits = [Hit("h1", "texto", 3, "ata.pdf", 0.5)]
+
+    [passage] = merge_neighbor_chunks(hits, [])
+
+    assert passage == ("h1", "texto", 3, "ata.pdf", 0.5)
+
+
+def test_overlap_is_trimmed_only_at_word_boundaries():
+    """Test that the repeated end of the previous chunk is removed, but not partial-word coincidences"""
+    previous = "Proibido som alto após as 22h. Visitantes se identificam na portaria"
+    text = "se identificam na portaria e aguardam o morador"
+
+    assert trim_overlap(previous, text, 50) == " e aguardam o morador"
+    assert trim_overlap("vagas da garagem", "gem nova", 50) == "gem nova"
+    assert trim_overlap("texto 4", "texto 5", 50) == "texto 5"
+
+
+def test_merged_passage_does_not_repeat_splitter_overlap():
+    """Test that a passage built from consecutive chunks contains the page text once"""
+    page = " ".join(f"item {idx} do regimento sobre piscina e garagem" for idx in range(40))
+    chunks = DocumentProcessor(provider=FakeProvider()).chunk_text({1: page})
+    assert len(chunks) > 2
+    assert trim_overlap(chunks[0]["text"], chunks[1]["text"]) != chunks[1]["text"]
+
+    hits = [Hit("h0", chunks[1]["text"], 1, "regimento.pdf", 0.9)]
+    neighbors = [
+        Neighbor("h0", "h0" if idx == 1 else f"c{idx}", "doc", idx, chunk["text"], 1)
+        for idx, chunk in enumerate(chunks[:3])
+    ]
+
+    [passage] = merge_neighbor_chunks(hits, neighbors)
+
+    expected = page[:page.index(chunks[2]["text"]) + len(chunks[2]["text"])]
+    assert " ".join(passage.chunk_text.split()) == " ".join(expected.split())
@@ -0,0 +1,119 @@
+import asyncio
+import inspect
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi import BackgroundTasks
+from sqlalchemy.dialects import postgresql
+
+from app.api.routes.notifications import get_unread_count
+from app.core.config import settings
+from app.core.database import get_db
+from app.dependencies.pagination import KeysetPage, encode_cursor
+from app.services.notification_service import (
+    create_broadcast,
+    deliver_broadcast,
+    inbox_query,
+    send_notifications,
+    target_users_query,
+)
+
+
+class FakeDB:
+    def __init__(self, count=0, notified=()):
+        self.count = count
+        self.notified = list(notified)
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(
+            scalar=lambda: self.count,
+            scalars=lambda: SimpleNamespace(all=lambda: self.notified)
+        )
+
+    async def commit(self):
+        self.commits += 1
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_targets_are_resolved_in_sql_within_the_tenant():
+    """Test that explicit ids, units and roles become one tenant-scoped query"""
+    sql = compile_sql(target_users_query("tenant-1", user_ids=["u1"], unit_ids=["unit-1"], roles=["resident"]))
+
+    assert "SELECT DISTINCT users.id" in sql
+    assert "users.tenant_id = %(tenant_id_1)s" in sql
+    assert "users.id IN" in sql and "users.unit_id IN" in sql and "users.role IN" in sql
+    assert target_users_query("tenant-1") is None
+
+
+def test_small_send_is_one_insert_select(monkeypatch):
+    """Test that a send below the threshold is a single INSERT ... SELECT ... RETURNING"""
+    monkeypatch.setattr(settings, "NOTIFICATION_BACKGROUND_THRESHOLD", 500)
+    db = FakeDB(count=3, notified=["u1", "u2", "u3"])
+    tasks = BackgroundTasks()
+
+    broadcast = asyncio.run(send_notifications(
+        db, "tenant-1", "Aviso", "Manutenção", roles=["resident"], background_tasks=tasks
+    ))
+
+    insert_sql = compile_sql(db.statements[-1])
+    assert len(db.statements) == 2  # count + insert
+    assert insert_sql.startswith("INSERT INTO notifications (id, title, message, user_id, tenant_id, broadcast_id")
+    assert "SELECT CAST(gen_random_uuid() AS VARCHAR)" in insert_sql
+    assert "RETURNING notifications.user_id" in insert_sql
+    assert (broadcast.recipients, broadcast.queued, db.commits) == (3, False, 1)
+    assert not tasks.tasks
+
+
+def test_large_broadcast_is_queued(monkeypatch):
+    """Test that a broadcast above the threshold returns a broadcast id and runs in background"""
+    monkeypatch.setattr(settings, "NOTIFICATION_BACKGROUND_THRESHOLD", 500)
+    db = FakeDB(count=1500)
+    tasks = BackgroundTasks()
+
+    broadcast = asyncio.run(send_notifications(
+        db, "tenant-1", "Aviso", "Assembleia", roles=["resident"], background_tasks=tasks
+    ))
+
+    assert (broadcast.recipients, broadcast.queued) == (1500, True)
+    assert len(db.statements) == 1 and db.commits == 0
+    assert tasks.tasks[0].func is deliver_broadcast
+    assert tasks.tasks[0].args[0] == broadcast.broadcast_id
+
+
+def test_inbox_merges_personal_and_broadcast_pages():
+    """Test that the inbox paginates each source on its own before the UNION ALL"""
+    user = SimpleNamespace(id="u1", tenant_id="tenant-1", role="resident", created_at=None)
+    page = KeysetPage(cursor=encode_cursor(datetime(2025, 2, 1, tzinfo=timezone.utc), "n-1"), limit=20)
+
+    sql = compile_sql(inbox_query(user, page, unread=True))
+
+    assert "UNION ALL" in sql
+    assert sql.count("LIMIT") == 3
+    assert "LEFT OUTER JOIN broadcast_reads ON broadcast_reads.broadcast_id = broadcasts.id" in sql
+    assert "broadcast_reads.deleted_at IS NULL AND broadcast_reads.read_at IS NULL" in sql
+    assert "(broadcasts.audience_role IS NULL OR broadcasts.audience_role = " in sql
+
+
+def test_send_to_all_stores_one_broadcast():
+    """Test that a notice to all residents is one row, not one per resident"""
+    db = FakeDB(count=1500)
+    added = []
+    db.add = added.append
+
+    sent = asyncio.run(create_broadcast(db, "tenant-1", "Aviso", "Assembleia", audience_role="resident"))
+
+    assert len(added) == 1 and added[0].audience_role == "resident"
+    assert (sent.recipients, sent.queued, db.commits) == (1500, False, 1)
+
+
+def test_unread_count_is_recounted_on_the_primary():
+    """Test that the cached unread count is never recomputed from the read replica"""
+    db_dependency = inspect.signature(get_unread_count).parameters["db"].default
+
+    assert db_dependency.dependency is get_db
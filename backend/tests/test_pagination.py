@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.dependencies.pagination import NEXT_CURSOR_HEADER, KeysetPage, decode_cursor, encode_cursor
+from app.models.base import Reservation
+
+
+def test_cursor_round_trip_keeps_microseconds_and_timezone():
+    """Test that a cursor decodes to the exact (created_at, id) it was built from"""
+    created_at = datetime(2025, 3, 9, 14, 30, 5, 123456, tzinfo=timezone.utc)
+
+    assert decode_cursor(encode_cursor(created_at, "res-1")) == (created_at, "res-1")
+
+
+def test_invalid_cursor_is_rejected():
+    """Test that a malformed cursor returns 400 instead of an unfiltered page"""
+    with pytest.raises(HTTPException) as exc_info:
+        KeysetPage(cursor="not-a-cursor", limit=10)
+    assert exc_info.value.status_code == 400
+
+
+def test_page_query_uses_keyset_condition():
+    """Test that the next page is fetched with a (created_at, id) row comparison"""
+    page = KeysetPage(cursor=encode_cursor(datetime(2025, 1, 1, tzinfo=timezone.utc), "res-1"), limit=20)
+    query = page.apply(select(Reservation), Reservation.created_at, Reservation.id)
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert "(reservations.created_at, reservations.id) < (" in sql
+    assert "ORDER BY reservations.created_at DESC, reservations.id DESC" in sql
+    assert "LIMIT" in sql and "OFFSET" not in sql
+
+
+def test_next_cursor_header_only_when_more_rows():
+    """Test that the extra row is trimmed and turned into the next cursor"""
+    rows = [
+        SimpleNamespace(id=f"r{idx}", created_at=datetime(2025, 1, 10 - idx, tzinfo=timezone.utc))
+        for idx in range(3)
+    ]
+    page = KeysetPage(cursor=None, limit=2)
+
+    response = Response()
+    assert page.finish(rows, response) == rows[:2]
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER]) == (rows[1].created_at, "r1")
+
+    last_page = Response()
+    assert page.finish(rows[:2], last_page) == rows[:2]
+    assert NEXT_CURSOR_HEADER not in last_page.headers
@@ -0,0 +1,47 @@
+from app.utils.text import fold_accents, normalize_query, trigrams
+from app.utils.embedding import pack_embedding, unpack_embedding
+
+
+def test_fold_accents_portuguese():
+    """Test that Portuguese diacritics are removed"""
+    assert fold_accents("Salão de festas é às 22h, não?") == "Salao de festas e as 22h, nao?"
+    assert fold_accents("açaí") == "acai"
+
+
+def test_normalize_query_equivalent_questions():
+    """Test that trivially different questions share the same normalized form"""
+    variants = [
+        "Qual o horário da piscina?",
+        "qual o horario da piscina",
+        "  QUAL o   horário da Piscina ?!",
+        "Qual o horário... da piscina?",
+    ]
+    normalized = {normalize_query(v) for v in variants}
+    assert normalized == {"qual o horario da piscina"}
+
+
+def test_normalize_query_keeps_numbers():
+    """Test that numbers survive normalization"""
+    assert normalize_query("Multa de R$ 200,00 após 22h?") == "multa de r 200 00 apos 22h"
+
+
+def test_embedding_float16_roundtrip():
+    """Test that embeddings survive float16 packing within half precision"""
+    embedding = [0.0123, -0.5, 0.99951171875, -0.000244140625] * 192
+    data = pack_embedding(embedding)
+
+    assert len(data) == 2 * len(embedding)
+
+    restored = unpack_embedding(data)
+    assert len(restored) == len(embedding)
+    assert all(abs(a - b) < 1e-3 for a, b in zip(embedding, restored))
+
+
+def test_trigrams_match_partial_and_misspelled_words():
+    """Test that a typed prefix or a typo shares most trigrams with the question"""
+    question = trigrams(normalize_query("Qual o horário da piscina?"))
+
+    assert {"  p", " pi", "pis", "isc"} <= question
+    typo = trigrams("pissina")
+    assert len(typo & question) / len(typo) >= 0.5
+    assert trigrams("") == set()
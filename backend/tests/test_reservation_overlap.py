@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
+from app.models.base import RESERVATION_OVERLAP_CONSTRAINT
+from app.schemas.reservation import ReservationCreate
+from app.services.reservation_service import _conflict_query, is_overlap_violation
+
+START = datetime(2025, 6, 1, 10, tzinfo=timezone.utc)
+END = datetime(2025, 6, 1, 12, tzinfo=timezone.utc)
+
+
+def test_conflict_query_matches_partial_constraint_predicate():
+    """Test that the conflict check uses the range operator and an inline status literal"""
+    sql = str(
+        select(_conflict_query("area-1", START, END, "tenant-1").exists()).compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"render_postcompile": True}
+        )
+    )
+
+    assert "reservations.period && tstzrange(" in sql
+    assert "reservations.status = 'confirmed'" in sql
+
+
+def test_overlap_violation_is_recognized():
+    """Test that only the exclusion constraint violation is mapped to a conflict"""
+    class ExclusionViolation(Exception):
+        sqlstate = "23P01"
+
+    class ForeignKeyViolation(Exception):
+        sqlstate = "23503"
+
+    assert is_overlap_violation(IntegrityError("INSERT", {}, ExclusionViolation()))
+    assert is_overlap_violation(IntegrityError(
+        "INSERT", {}, Exception(f'conflicting key value violates exclusion constraint "{RESERVATION_OVERLAP_CONSTRAINT}"')
+    ))
+    assert not is_overlap_violation(IntegrityError("INSERT", {}, ForeignKeyViolation()))
+
+
+def test_reservation_must_end_after_start():
+    """Test that empty or inverted periods are rejected before reaching the database"""
+    with pytest.raises(ValidationError):
+        ReservationCreate(start_time=END, end_time=START, common_area_id="area-1")
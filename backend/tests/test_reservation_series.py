@@ -0,0 +1,185 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql
+
+from app.api.routes import reservations
+from app.core.config import settings
+from app.schemas.reservation import ReservationSeriesCreate
+from app.services import reservation_service
+from app.services.reservation_service import (
+    CONFLICT,
+    CREATED,
+    LIMIT_EXCEEDED,
+    Occurrence,
+    ReservationAvailability,
+    check_series_availability,
+    create_series,
+    expand_series,
+)
+
+TZ = ZoneInfo("America/New_York")
+
+
+@pytest.fixture(autouse=True)
+def reservation_timezone(monkeypatch):
+    # A timezone with DST, to check that the wall-clock time is kept
+    monkeypatch.setattr(settings, "RESERVATION_TIMEZONE", "America/New_York")
+
+
+class FakeDB:
+    def __init__(self, rows=None, inserted=None):
+        self.rows = rows or []
+        self.inserted = inserted or []
+        self.statements = []
+        self.committed = False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(
+            all=lambda: self.rows,
+            scalars=lambda: SimpleNamespace(all=lambda: self.inserted)
+        )
+
+    async def commit(self):
+        self.committed = True
+
+
+def test_weekly_series_keeps_wall_clock_time_across_dst():
+    """Test that weekly occurrences keep 19:00 local time when DST starts"""
+    start = datetime(2030, 3, 4, 19, tzinfo=TZ)  # Monday, before DST
+    occurrences = expand_series(start, start + timedelta(hours=1), "weekly", count=3)
+
+    assert [occ.start_time.astimezone(TZ).hour for occ in occurrences] == [19, 19, 19]
+    assert [occ.start_time.astimezone(TZ).day for occ in occurrences] == [4, 11, 18]
+    assert all(occ.end_time - occ.start_time == timedelta(hours=1) for occ in occurrences)
+
+
+def test_weekly_series_by_weekday_and_until():
+    """Test that by_weekday picks days of each week and until bounds the series"""
+    start = datetime(2030, 6, 3, 7, tzinfo=TZ)  # Monday
+    occurrences = expand_series(
+        start, start + timedelta(hours=2), "weekly",
+        until=datetime(2030, 6, 12, 23, tzinfo=TZ), by_weekday=[0, 2]
+    )
+
+    assert [occ.start_time.day for occ in occurrences] == [3, 5, 10, 12]
+
+
+def test_series_is_capped(monkeypatch):
+    """Test that an open-ended series stops at the maximum number of occurrences"""
+    monkeypatch.setattr(settings, "RESERVATION_SERIES_MAX_OCCURRENCES", 10)
+    start = datetime(2030, 1, 1, 8, tzinfo=TZ)
+
+    assert len(expand_series(start, start + timedelta(hours=1), "daily", until=start + timedelta(days=365))) == 10
+
+
+def test_series_requires_an_end():
+    """Test that a series without count or until is rejected"""
+    with pytest.raises(ValidationError):
+        ReservationSeriesCreate(
+            common_area_id="area-1",
+            start_time=datetime(2030, 1, 1, 8, tzinfo=TZ),
+            end_time=datetime(2030, 1, 1, 9, tzinfo=TZ),
+        )
+
+
+def test_series_availability_is_one_set_based_query():
+    """Test that all occurrences are checked in a single VALUES query"""
+    start = datetime(2030, 1, 1, 8, tzinfo=TZ)
+    occurrences = expand_series(start, start + timedelta(hours=1), "daily", count=5)
+    db = FakeDB(rows=[(idx, idx == 2, 0) for idx in range(5)])
+
+    checks = asyncio.run(check_series_availability(db, "area-1", "unit-1", occurrences, "tenant-1"))
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+
+    assert len(db.statements) == 1
+    assert "FROM (VALUES" in sql
+    assert "reservations.period && tstzrange(occurrences.start_time, occurrences.end_time" in sql
+    assert [check.has_conflict for check in checks] == [False, False, True, False, False]
+
+
+def test_create_series_reports_each_occurrence(monkeypatch):
+    """Test that free occurrences are bulk-inserted and the rest are reported"""
+    start = datetime(2030, 1, 1, 8, tzinfo=TZ)
+    occurrences = [Occurrence(start + timedelta(days=day), start + timedelta(days=day, hours=1)) for day in range(4)]
+    checks = [
+        ReservationAvailability(False, False),
+        ReservationAvailability(True, False),
+        ReservationAvailability(False, True),
+        ReservationAvailability(False, False),
+    ]
+
+    async def fake_check(*args, **kwargs):
+        return checks
+
+    monkeypatch.setattr(reservation_service, "check_series_availability", fake_check)
+
+    ids = iter(f"id-{idx}" for idx in range(10))
+    monkeypatch.setattr(reservation_service, "generate_uuid", lambda: next(ids))
+
+    # id-0 is the series; the last occurrence (id-2) is taken by a
+    # concurrent booking before the insert, so only id-1 comes back
+    db = FakeDB(inserted=["id-1"])
+    series_id, results = asyncio.run(create_series(db, "area-1", "user-1", "unit-1", "tenant-1", occurrences))
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+
+    assert series_id == "id-0"
+    assert len(db.statements) == 1
+    assert "ON CONFLICT DO NOTHING RETURNING reservations.id" in sql
+    assert [result["status"] for result in results] == [CREATED, CONFLICT, LIMIT_EXCEEDED, CONFLICT]
+    assert [result["reservation_id"] for result in results] == ["id-1", None, None, None]
+    assert db.committed
+
+
+class LookupDB:
+    """Answers the common area and unit lookups of the series route, in order"""
+
+    def __init__(self, *found):
+        self.found = list(found)
+
+    async def execute(self, statement):
+        return SimpleNamespace(scalar=lambda value=self.found.pop(0): value)
+
+
+def _book_series(monkeypatch, db, user, unit_id=None):
+    calls = []
+
+    async def fake_create_series(**kwargs):
+        calls.append(kwargs)
+        return "series-1", []
+
+    monkeypatch.setattr(reservations, "create_series", fake_create_series)
+    start = datetime(2030, 1, 1, 8, tzinfo=TZ)
+    series = ReservationSeriesCreate(
+        common_area_id="area-1", start_time=start, end_time=start + timedelta(hours=1), count=2, unit_id=unit_id
+    )
+    asyncio.run(reservations.create_reservation_series(series, db=db, current_user=user))
+    return calls
+
+
+def test_admin_without_unit_must_name_one(monkeypatch):
+    """Test that an admin with no unit gets 400 instead of a NOT NULL violation on insert"""
+    admin = SimpleNamespace(id="admin-1", role="admin", unit_id=None, tenant_id="tenant-1")
+
+    with pytest.raises(HTTPException) as error:
+        _book_series(monkeypatch, LookupDB("area-1"), admin)
+
+    assert error.value.status_code == 400
+
+
+def test_admin_books_series_for_a_unit_of_the_tenant(monkeypatch):
+    """Test that the unit named in the series is checked against the tenant and booked for"""
+    admin = SimpleNamespace(id="admin-1", role="admin", unit_id=None, tenant_id="tenant-1")
+
+    calls = _book_series(monkeypatch, LookupDB("area-1", "unit-7"), admin, unit_id="unit-7")
+
+    assert calls[0]["unit_id"] == "unit-7"
+    with pytest.raises(HTTPException) as error:
+        _book_series(monkeypatch, LookupDB("area-1", None), admin, unit_id="other-tenant-unit")
+    assert error.value.status_code == 404
@@ -0,0 +1,65 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.metrics import RAG_STAGE_SECONDS, format_server_timing, track_stage
+from app.middleware.server_timing import ServerTimingMiddleware
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+
+    @app.get("/staged")
+    async def staged():
+        with track_stage("embedding", "tenant-timing"):
+            pass
+        with track_stage("search", "tenant-timing"):
+            pass
+        return {"ok": True}
+
+    @app.get("/plain")
+    async def plain():
+        return {"ok": True}
+
+    return app
+
+
+def test_format_server_timing():
+    """Test that stages are formatted as W3C Server-Timing metrics"""
+    header = format_server_timing([("embedding", 12.345), ("search", 3.0)])
+    assert header == "embedding;dur=12.3, search;dur=3.0"
+
+
+def test_server_timing_header_lists_stages():
+    """Test that stages tracked by the endpoint reach the response header"""
+    client = TestClient(_build_app())
+    response = client.get("/staged")
+
+    header = response.headers["server-timing"]
+    names = [metric.split(";")[0] for metric in header.split(", ")]
+    assert names == ["embedding", "search", "total"]
+
+
+def test_server_timing_header_absent_without_stages():
+    """Test that endpoints without tracked stages get no header"""
+    client = TestClient(_build_app())
+    response = client.get("/plain")
+
+    assert "server-timing" not in response.headers
+
+
+def test_track_stage_records_histogram():
+    """Test that stage durations are exported per stage and tenant"""
+    labels = {"stage": "generation", "tenant": "tenant-histogram"}
+
+    with track_stage("generation", "tenant-histogram") as timer:
+        sum(range(1000))
+
+    assert timer.elapsed_ms >= 0
+    count = [
+        sample.value
+        for metric in RAG_STAGE_SECONDS.collect()
+        for sample in metric.samples
+        if sample.name.endswith("_count") and sample.labels == labels
+    ]
+    assert count == [1.0]
@@ -0,0 +1,161 @@
+import pytest
+
+from app.core.config import settings
+from app.services import suggest_service
+from app.services.cache_service import CacheService
+from app.services.suggest_service import SuggestService
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return queue
+
+    def execute(self):
+        calls, self.calls = self.calls, []
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in calls]
+
+
+class FakeRedis:
+    """Subconjunto do Redis usado pelo SuggestService (ZSET, HASH, SET e chaves simples)"""
+
+    def __init__(self):
+        self.zsets = {}
+        self.hashes = {}
+        self.sets = {}
+        self.keys = set()
+        self.smembers_calls = []
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zincrby(self, key, amount, member):
+        zset = self.zsets.setdefault(key, {})
+        zset[member] = zset.get(member, 0) + amount
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.zsets.get(key, {}).pop(member, None)
+
+    def zscore(self, key, member):
+        return self.zsets.get(key, {}).get(member)
+
+    def zrangebylex(self, key, min, max, start=0, num=None):
+        low, high = min[1:], max[1:]
+        members = sorted(m for m in self.zsets.get(key, {}) if low <= m <= high)
+        return members[start:start + num if num is not None else None]
+
+    def zrevrange(self, key, start, end):
+        ranked = sorted(self.zsets.get(key, {}).items(), key=lambda item: -item[1])
+        return [member for member, _ in ranked[start:end + 1]]
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    def hmget(self, key, fields):
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member)
+
+    def srem(self, key, member):
+        self.sets.get(key, set()).discard(member)
+
+    def scard(self, key):
+        return len(self.sets.get(key, set()))
+
+    def smembers(self, key):
+        self.smembers_calls.append(key)
+        return set(self.sets.get(key, set()))
+
+    def exists(self, key):
+        return int(key in self.keys)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(suggest_service, "redis_client", fake)
+    monkeypatch.setattr(CacheService, "get_document_set_version", staticmethod(lambda tenant_id: 1))
+    return fake
+
+
+def _answered(redis, question: str, tenant_id: str = "tenant-1", times: int = 1):
+    """Registra a pergunta e deixa a resposta dela no cache"""
+    redis.keys.add(CacheService.get_cache_key(question, tenant_id, version=1))
+    SuggestService.record_question(question, tenant_id, increment=times)
+
+
+def test_prefix_matches_come_first_ranked_by_frequency(redis):
+    """Test that questions starting with the typed text come first, most asked first"""
+    _answered(redis, "Qual o horário da academia?", times=1)
+    _answered(redis, "Qual o horário da piscina?", times=5)
+    _answered(redis, "Qual o horário de silêncio?", times=3)
+    _answered(redis, "Horário de funcionamento da portaria", times=9)
+
+    suggestions = SuggestService.suggest("qual o horario", "tenant-1")
+
+    assert [s["question"] for s in suggestions][:3] == [
+        "Qual o horário da piscina?",
+        "Qual o horário de silêncio?",
+        "Qual o horário da academia?",
+    ]
+    assert suggestions[0]["count"] == 5
+
+
+def test_fuzzy_matches_tolerate_typos(redis):
+    """Test that trigram matching finds questions despite typos and mid-question words"""
+    _answered(redis, "Qual o horário da piscina?")
+    _answered(redis, "Como reservo o salão de festas?")
+
+    typo = SuggestService.suggest("horaro da pscina", "tenant-1")
+    middle = SuggestService.suggest("salao de festas", "tenant-1")
+
+    assert [s["question"] for s in typo] == ["Qual o horário da piscina?"]
+    assert [s["question"] for s in middle] == ["Como reservo o salão de festas?"]
+
+
+def test_frequent_trigrams_are_not_read(redis, monkeypatch):
+    """Test that trigram sets above SUGGEST_MAX_TRIGRAM_POSTINGS are skipped but selective ones still match"""
+    monkeypatch.setattr(settings, "SUGGEST_MAX_TRIGRAM_POSTINGS", 5)
+    for block in range(20):
+        _answered(redis, f"Qual a regra do bloco {block}?")
+    _answered(redis, "Qual a regra da piscina?")
+
+    suggestions = SuggestService.suggest("regra da piscna", "tenant-1")
+
+    assert [s["question"] for s in suggestions] == ["Qual a regra da piscina?"]
+    assert redis.smembers_calls
+    assert all(len(redis.sets[key]) <= 5 for key in redis.smembers_calls)
+
+
+def test_suggestions_are_isolated_by_tenant(redis):
+    """Test that a tenant never gets suggestions from another tenant's questions"""
+    _answered(redis, "Qual o horário da piscina?", tenant_id="tenant-1")
+
+    assert SuggestService.suggest("qual o horario", "tenant-2") == []
+    assert SuggestService.suggest("horaro da pscina", "tenant-2") == []
+    assert len(SuggestService.suggest("qual o horario", "tenant-1")) == 1
+
+
+def test_expired_answers_are_dropped_from_the_index(redis):
+    """Test that questions whose answer left the cache are not suggested and are removed"""
+    _answered(redis, "Qual o horário da piscina?")
+    SuggestService.record_question("Qual o horário da academia?", "tenant-1")
+
+    suggestions = SuggestService.suggest("qual o horario", "tenant-1")
+
+    assert [s["question"] for s in suggestions] == ["Qual o horário da piscina?"]
+    assert "qual o horario da academia" not in redis.zsets["ai_suggest:tenant-1:prefix"]
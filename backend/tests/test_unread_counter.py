@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import notification_service
+from app.services.notification_service import UnreadCounter, mark_all_read, mark_all_read_query
+
+USER = SimpleNamespace(id="u1", tenant_id="tenant-1", role="resident", created_at=None)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = str(value)
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def pipeline(self, transaction=False):
+        return self
+
+    def execute(self):
+        pass
+
+
+class FakeDB:
+    def __init__(self, count=0):
+        self.count = count
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(scalar=lambda: self.count)
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(notification_service, "redis_client", fake)
+
+    def adjust_if_exists(keys, args, client):
+        if keys[0] in fake.values:
+            fake.values[keys[0]] = str(max(0, int(fake.values[keys[0]]) + int(args[0])))
+
+    monkeypatch.setattr(notification_service, "_ADJUST_IF_EXISTS", adjust_if_exists)
+    return fake
+
+
+def test_unread_count_is_recomputed_once_then_cached(redis):
+    """Test that a miss counts in the database and later reads come from Redis"""
+    db = FakeDB(count=7)
+
+    assert asyncio.run(UnreadCounter.get(db, USER)) == 7
+    assert asyncio.run(UnreadCounter.get(db, USER)) == 7
+    assert len(db.statements) == 1
+
+
+def test_counters_follow_sends_and_reads(redis):
+    """Test that sends increment and reads decrement only existing counters"""
+    UnreadCounter.set("tenant-1", "u1", 2)
+
+    UnreadCounter.increment("tenant-1", ["u1", "u2"])
+    UnreadCounter.decrement("tenant-1", "u1")
+    UnreadCounter.decrement("tenant-1", "u1")
+    UnreadCounter.decrement("tenant-1", "u1")
+    UnreadCounter.decrement("tenant-1", "u1")
+
+    assert redis.get(UnreadCounter.key("tenant-1", "u1")) == "0"
+    # u2 had no counter: it is recomputed from the database on the next read
+    assert redis.get(UnreadCounter.key("tenant-1", "u2")) is None
+
+
+def test_new_broadcast_invalidates_the_tenant_counters(redis):
+    """Test that bumping the tenant version makes every counter miss"""
+    UnreadCounter.set("tenant-1", "u1", 3)
+    UnreadCounter.bump_version("tenant-1")
+
+    db = FakeDB(count=4)
+    assert asyncio.run(UnreadCounter.get(db, USER)) == 4
+
+
+def test_mark_all_read_is_a_single_statement(redis):
+    """Test that personal and broadcast items are marked read by one statement"""
+    sql = str(mark_all_read_query(USER).compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("WITH read_personal AS \n(UPDATE notifications SET is_read=")
+    assert "read_broadcasts AS \n(INSERT INTO broadcast_reads (broadcast_id, user_id, read_at) SELECT" in sql
+    assert "ON CONFLICT (broadcast_id, user_id) DO UPDATE SET read_at = excluded.read_at" in sql
+
+    db = FakeDB(count=12)
+    assert asyncio.run(mark_all_read(db, USER)) == 12
+    assert len(db.statements) == 1 and db.commits == 1
+    assert redis.get(UnreadCounter.key("tenant-1", "u1")) == "0"
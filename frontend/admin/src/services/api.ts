@@ -2,6 +2,8 @@ import axios from 'axios'
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000'
 const API_VERSION = '/api/v1'
+// Itens por página nas listagens (máximo aceito pelo backend: PAGE_MAX_LIMIT)
+const PAGE_LIMIT = 200
 
 const api = axios.create({
     baseURL: `${API_BASE_URL}${API_VERSION}`,
@@ -64,4 +66,27 @@ api.interceptors.response.use(
     }
 )
 
+/**
+ * Busca todas as páginas de uma listagem paginada por cursor.
+ * O backend devolve até `limit` itens por página e o cursor da próxima
+ * no header X-Next-Cursor (ausente na última página).
+ */
+export const getAllPages = async <T>(
+    url: string,
+    params: Record<string, unknown> = {}
+): Promise<T[]> => {
+    const items: T[] = []
+    let cursor: string | undefined
+
+    do {
+        const response = await api.get<T[]>(url, {
+            params: { ...params, cursor, limit: PAGE_LIMIT },
+        })
+        items.push(...response.data)
+        cursor = response.headers['x-next-cursor'] as string | undefined
+    } while (cursor)
+
+    return items
+}
+
 export default api
@@ -1,9 +1,8 @@
-import api from './api'
+import api, { getAllPages } from './api'
 import type { UserListItem, CreateUserRequest, UpdateUserRequest, ResetPasswordRequest } from '@/types/user'
 
 export const getUsers = async (): Promise<UserListItem[]> => {
-    const response = await api.get<UserListItem[]>('/users')
-    return response.data
+    return getAllPages<UserListItem>('/users')
 }
 
 export const getUserById = async (userId: string): Promise<UserListItem> => {
@@ -1,4 +1,4 @@
-import api from './api'
+import api, { getAllPages } from './api'
 import type { CommonArea } from '@/types/models'
 
 /**
@@ -10,8 +10,7 @@ import type { CommonArea } from '@/types/models'
  * Lista todas as áreas comuns do tenant
  */
 export const listCommonAreas = async (): Promise<CommonArea[]> => {
-    const response = await api.get<CommonArea[]>('/common-areas/')
-    return response.data
+    return getAllPages<CommonArea>('/common-areas/')
 }
 
 /**
@@ -1,4 +1,4 @@
-import api from './api'
+import api, { getAllPages } from './api'
 import type { Notification } from '@/types/models'
 
 /**
@@ -14,8 +14,7 @@ export const listNotifications = async (
     unread?: boolean
 ): Promise<Notification[]> => {
     const params = unread !== undefined ? { unread } : {}
-    const response = await api.get<Notification[]>('/notifications/', { params })
-    return response.data
+    return getAllPages<Notification>('/notifications/', params)
 }
 
 /**
@@ -26,6 +25,14 @@ export const markAsRead = async (id: string): Promise<Notification> => {
     return response.data
 }
 
+/**
+ * Marca todas as notificações do usuário como lidas
+ */
+export const markAllAsRead = async (): Promise<number> => {
+    const response = await api.put<{ updated: number }>('/notifications/read-all')
+    return response.data.updated
+}
+
 /**
  * Deleta uma notificação
  */
@@ -37,8 +44,8 @@ export const deleteNotification = async (id: string): Promise<void> => {
  * Busca contagem de notificações não lidas
  */
 export const getUnreadCount = async (): Promise<number> => {
-    const notifications = await listNotifications(true)
-    return notifications.length
+    const response = await api.get<{ unread: number }>('/notifications/unread-count')
+    return response.data.unread
 }
 
 /**
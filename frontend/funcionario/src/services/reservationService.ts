@@ -1,4 +1,4 @@
-import api from './api'
+import api, { getAllPages } from './api'
 import type { Reservation, ReservationCreate } from '@/types/models'
 
 /**
@@ -10,8 +10,7 @@ import type { Reservation, ReservationCreate } from '@/types/models'
  * Lista todas as reservas do tenant atual
  */
 export const listReservations = async (): Promise<Reservation[]> => {
-    const response = await api.get<Reservation[]>('/reservations/')
-    return response.data
+    return getAllPages<Reservation>('/reservations/')
 }
 
 /**
@@ -53,14 +52,14 @@ export const getMyReservations = async (): Promise<Reservation[]> => {
  * Get upcoming reservations (next 7 days)
  */
 export const getUpcomingReservations = async (): Promise<Reservation[]> => {
-    const response = await api.get<Reservation[]>('/reservations')
     const now = new Date()
     const nextWeek = new Date(now.getTime() + 7 * 24 * 60 * 60 * 1000)
+    const reservations = await getAllPages<Reservation>('/reservations/', {
+        start_from: now.toISOString(),
+        start_to: nextWeek.toISOString(),
+    })
 
-    return response.data.filter(r => {
-        const startTime = new Date(r.start_time)
-        return startTime >= now && startTime <= nextWeek
-    }).sort((a, b) => {
+    return reservations.sort((a, b) => {
         return new Date(a.start_time).getTime() - new Date(b.start_time).getTime()
     })
 }
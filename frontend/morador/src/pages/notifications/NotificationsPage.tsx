@@ -11,6 +11,7 @@ import { MainLayout, HologramCard, Button } from '@/components'
 import {
     listNotifications,
     markAsRead,
+    markAllAsRead,
     deleteNotification,
 } from '@/services/notificationService'
 import type { Notification } from '@/types/models'
@@ -74,9 +75,7 @@ const NotificationsPage = () => {
 
     const handleMarkAllAsRead = async () => {
         try {
-            // Marcar todas as não lidas
-            const unreadNotifications = notifications.filter(n => !n.is_read)
-            await Promise.all(unreadNotifications.map(n => markAsRead(n.id)))
+            await markAllAsRead()
             await fetchNotifications() // Refresh list
         } catch (err) {
             console.error('Erro ao marcar todas como lidas:', err)
@@ -1,4 +1,4 @@
-import api from './api'
+import api, { getAllPages } from './api'
 import type { Reservation, ReservationCreate } from '@/types/models'
 
 /**
@@ -10,8 +10,7 @@ import type { Reservation, ReservationCreate } from '@/types/models'
  * Lista todas as reservas do tenant atual
  */
 export const listReservations = async (): Promise<Reservation[]> => {
-    const response = await api.get<Reservation[]>('/reservations/')
-    return response.data
+    return getAllPages<Reservation>('/reservations/')
 }
 
 /**